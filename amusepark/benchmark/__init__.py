@@ -0,0 +1,26 @@
+import importlib
+
+# name -> module; imported on first access (so that `python -m amusepark.benchmark.suite` runs a fresh module)
+_BENCHMARK = {
+    'ENVS': 'amusepark.benchmark.suite',
+    'SOLVERS': 'amusepark.benchmark.suite',
+    'IMPORTS': 'amusepark.benchmark.suite',
+    'MODES': 'amusepark.benchmark.suite',
+    'bench_env': 'amusepark.benchmark.suite',
+    'bench_solver': 'amusepark.benchmark.suite',
+    'bench_import': 'amusepark.benchmark.suite',
+    'run_suite': 'amusepark.benchmark.suite',
+    'compare_results': 'amusepark.benchmark.suite',
+}
+
+__all__ = list(_BENCHMARK)
+
+def __getattr__(name: str):
+    if name in _BENCHMARK:
+        attr = getattr(importlib.import_module(_BENCHMARK[name]), name)
+        globals()[name] = attr
+        return attr
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(_BENCHMARK))
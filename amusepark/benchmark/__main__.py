@@ -0,0 +1,51 @@
+import json
+import argparse
+
+from amusepark.benchmark.suite import ENVS, SOLVERS, IMPORTS, MODES, run_suite, compare_results
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m amusepark.benchmark', description='Throughput, latency and memory benchmarks of the amusepark envs.')
+    parser.add_argument('--envs', nargs='*', default=list(ENVS), choices=list(ENVS))
+    parser.add_argument('--solvers', nargs='*', default=list(SOLVERS), choices=list(SOLVERS))
+    parser.add_argument('--imports', nargs='*', default=list(IMPORTS), help='modules whose import time is measured')
+    parser.add_argument('--modes', nargs='*', default=list(MODES), choices=list(MODES))
+    parser.add_argument('--steps', type=int, default=10000, help='env steps per mode')
+    parser.add_argument('--batch', type=int, default=16, help='number of envs in batched/vectorized modes')
+    parser.add_argument('--backend', default='thread', choices=['thread', 'process'], help='backend of the vectorized mode')
+    parser.add_argument('--out', default=None, help='save the results as JSON')
+    parser.add_argument('--compare', default=None, help='JSON results of a previous run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='relative slowdown reported as a regression')
+    args = parser.parse_args()
+
+    report = run_suite(args.envs, args.solvers, args.modes, args.steps, args.batch, args.backend, args.imports)
+
+    # summary
+    print("{:24s}|{:11s}|{:>14s}|{:>10s}|{:>10s}".format("name", "mode", "steps/sec", "p50 us", "p99 us"))
+    print("-"*73)
+    for r in report['results']:
+        if r['kind'] == 'env':
+            for mode in MODES:
+                if mode not in r: continue
+                lat = r[mode]['step_latency'] if mode == 'single' else r[mode]['batch_latency']
+                print("{:24s}|{:11s}|{:>14.1f}|{:>10.2f}|{:>10.2f}".format(r['name'], mode, r[mode]['steps_per_sec'], lat['p50_us'], lat['p99_us']))
+        else:
+            print("{:24s}|{:11s}|{:>14s}|{:>10.2f}|{:>10.2f}".format(r['name'], r['kind'], '-', r['time']['p50_us'], r['time']['p99_us']))
+
+    if args.out is not None:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        rows = compare_results(baseline, report, args.tolerance)
+        print()
+        print("{:24s}|{:11s}|{:>8s}".format("name", "mode", "ratio"))
+        print("-"*45)
+        for name, mode, _, _, ratio, regressed in rows:
+            print("{:24s}|{:11s}|{:>8.3f}{}".format(name, mode, ratio, "  REGRESSION" if regressed else ""))
+        if any(row[-1] for row in rows):
+            raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
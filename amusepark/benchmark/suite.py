@@ -0,0 +1,281 @@
+import gc
+import os
+import sys
+import time
+import platform
+import subprocess
+import tracemalloc
+from functools import partial
+
+import numpy as np
+
+MODES = ('single', 'batched', 'vectorized')
+
+###### registries ######
+## envs  : name -> env factory (picklable for the process backend)
+## solvers: name -> callable solving one instance (timed per call)
+
+def _wordle_env(cls: str='WordleEnv', **kwargs):
+    from amusepark import envs
+    from amusepark.utils.path import data_path
+    return getattr(envs, cls)(os.path.join(data_path, 'wordle-hidden.txt'), **kwargs)
+
+def _env(module: str, cls: str, **kwargs):
+    env_cls = getattr(__import__(module, fromlist=[cls]), cls)
+    return env_cls(**kwargs)
+
+ENVS = {
+    'WordleEnv': _wordle_env,
+    'WordleEnv-Word': partial(_wordle_env, action_mode='word'),
+    'MultiWordleEnv-4': partial(_wordle_env, 'MultiWordleEnv', boards=4),
+    'MoveArrowEnv': partial(_env, 'amusepark.envs.isoland', 'MoveArrowEnv'),
+    'TraverseMazeEnv': partial(_env, 'amusepark.envs.machinarium', 'TraverseMazeEnv'),
+    'CoinGameEnv': partial(_env, 'amusepark.envs.gambler', 'CoinGameEnv'),
+    'TicTacToeEnv': partial(_env, 'amusepark.envs.in_a_row', 'TicTacToeEnv'),
+    'GobbletEnv-Static': partial(_env, 'amusepark.envs.in_a_row', 'GobbletEnv', mode=0),
+    'GobbletEnv-Dynamic': partial(_env, 'amusepark.envs.in_a_row', 'GobbletEnv', mode=1),
+    'MNKGameEnv-15x15x5': partial(_env, 'amusepark.envs.in_a_row', 'MNKGameEnv', m=15, n=15, k=5),
+}
+
+def _replay_isoland():
+    from amusepark.envs.isoland import MoveArrowEnv
+    from amusepark.configs.isoland_configs import ENV_CONFIG_0, ENV_CONFIG_1, OPT_ACTIONS_0, OPT_ACTIONS_1
+    for config, actions in ((ENV_CONFIG_0, OPT_ACTIONS_0), (ENV_CONFIG_1, OPT_ACTIONS_1)):
+        env = MoveArrowEnv(config)
+        env.reset()
+        for act in actions:
+            env.step(act)
+
+def _replay_maze():
+    from amusepark.envs.machinarium import TraverseMazeEnv
+    from amusepark.configs.machinarium_configs import MAZES, OPT_ACTIONS
+    for maze_idx in range(len(MAZES)):
+        env = TraverseMazeEnv(maze_idx)
+        env.reset()
+        for act in OPT_ACTIONS[maze_idx]:
+            env.step(act)
+
+def _replay_puzzle():
+    from amusepark.games.puzzle import APuzzleADay
+    apad = APuzzleADay()
+    cal, ps = apad.calendar, apad.pieces
+    cal.place(ps[1], (0, 0))
+    cal.place(ps[2], (0, 1))
+    cal.place(ps[3], (0, 3))
+    ps[4].rotate90(counter_clockwise=False)
+    cal.place(ps[4], (1, 5))
+    cal.place(ps[5], (3, 0))
+    ps[6].flip(horizontal=False)
+    cal.place(ps[6], (3, 2))
+    cal.place(ps[7], (5, 0))
+    cal.place(ps[8], (4, 3))
+
+# the repo ships reference solutions rather than search solvers: time replaying them
+SOLVERS = {
+    'isoland-replay': _replay_isoland,
+    'maze-replay': _replay_maze,
+    'puzzle-replay': _replay_puzzle,
+}
+
+# modules whose import time is measured in fresh interpreters
+IMPORTS = (
+    'amusepark.envs',
+    'amusepark.envs.wordle',
+    'amusepark.envs.in_a_row',
+    'amusepark.vector',
+    'amusepark.benchmark',
+)
+
+###### measurements ######
+
+def _latency_stats(latencies_ns: np.ndarray) -> dict:
+    p50, p90, p99 = np.percentile(latencies_ns, [50, 90, 99]) / 1e3
+    return {
+        'mean_us': float(latencies_ns.mean() / 1e3),
+        'p50_us': float(p50),
+        'p90_us': float(p90),
+        'p99_us': float(p99),
+        'max_us': float(latencies_ns.max() / 1e3),
+    }
+
+def _sample_actions(env, num: int) -> list:
+    # sampled up front so that gym's space sampling is not timed
+    return [env.action_space.sample() for _ in range(num)]
+
+def _bench_single(env_fn, steps: int) -> dict:
+    env = env_fn()
+    actions = _sample_actions(env, steps)
+
+    # reset throughput
+    num_resets = max(steps // 10, 1)
+    t0 = time.perf_counter_ns()
+    for _ in range(num_resets):
+        env.reset()
+    reset_ns = time.perf_counter_ns() - t0
+
+    # step latency (resets after a done are not counted)
+    latencies = np.empty(steps, dtype=np.int64)
+    episodes = 0
+    env.reset()
+    for k, act in enumerate(actions):
+        t0 = time.perf_counter_ns()
+        _, _, done, _ = env.step(act)
+        latencies[k] = time.perf_counter_ns() - t0
+        if done:
+            episodes += 1
+            env.reset()
+
+    return {
+        'resets_per_sec': num_resets / reset_ns * 1e9,
+        'steps_per_sec': steps / latencies.sum() * 1e9,
+        'episodes': episodes,
+        'step_latency': _latency_stats(latencies),
+    }
+
+def _bench_batched(env_fn, steps: int, batch: int) -> dict:
+    # a Python list of envs stepped in lockstep on the calling thread
+    envs = [env_fn() for _ in range(batch)]
+    num_batches = max(steps // batch, 1)
+    actions = [_sample_actions(env, num_batches) for env in envs]
+    for env in envs:
+        env.reset()
+
+    latencies = np.empty(num_batches, dtype=np.int64)
+    for k in range(num_batches):
+        t0 = time.perf_counter_ns()
+        for env, acts in zip(envs, actions):
+            _, _, done, _ = env.step(acts[k])
+            if done:
+                env.reset()
+        latencies[k] = time.perf_counter_ns() - t0
+
+    return {
+        'batch': batch,
+        'steps_per_sec': num_batches * batch / latencies.sum() * 1e9,
+        'batch_latency': _latency_stats(latencies),
+    }
+
+def _bench_vectorized(env_fn, steps: int, batch: int, backend: str) -> dict:
+    from amusepark.vector import AsyncEnvPool
+
+    pool = AsyncEnvPool([env_fn for _ in range(batch)], backend=backend)
+    num_batches = max(steps // batch, 1)
+    action_space = env_fn().action_space
+    actions = [[action_space.sample() for _ in range(batch)] for _ in range(num_batches)]
+
+    try:
+        pool.reset()
+        latencies = np.empty(num_batches, dtype=np.int64)
+        for k in range(num_batches):
+            t0 = time.perf_counter_ns()
+            pool.step(actions[k])
+            latencies[k] = time.perf_counter_ns() - t0
+    finally:
+        pool.close()
+
+    return {
+        'batch': batch,
+        'backend': backend,
+        'steps_per_sec': num_batches * batch / latencies.sum() * 1e9,
+        'batch_latency': _latency_stats(latencies),
+    }
+
+def _peak_memory(env_fn, steps: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        env = env_fn()
+        actions = _sample_actions(env, steps)
+        tracemalloc.reset_peak()
+        env.reset()
+        for act in actions:
+            _, _, done, _ = env.step(act)
+            if done:
+                env.reset()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+def bench_env(name: str, modes=MODES, steps: int=10000, batch: int=16, backend: str='thread') -> dict:
+    env_fn = ENVS[name]
+    result = {'name': name, 'kind': 'env'}
+    if 'single' in modes:
+        result['single'] = _bench_single(env_fn, steps)
+        result['single']['peak_memory_bytes'] = _peak_memory(env_fn, min(steps, 1000))
+    if 'batched' in modes:
+        result['batched'] = _bench_batched(env_fn, steps, batch)
+    if 'vectorized' in modes:
+        result['vectorized'] = _bench_vectorized(env_fn, steps, batch, backend)
+    return result
+
+def bench_solver(name: str, repeats: int=20) -> dict:
+    solver = SOLVERS[name]
+    solver() # warm up (imports, lazy tables)
+    times = np.empty(repeats, dtype=np.int64)
+    for k in range(repeats):
+        t0 = time.perf_counter_ns()
+        solver()
+        times[k] = time.perf_counter_ns() - t0
+    return {'name': name, 'kind': 'solver', 'repeats': repeats, 'time': _latency_stats(times)}
+
+def bench_import(module: str, repeats: int=5) -> dict:
+    # a fresh interpreter per run so that nothing is cached in sys.modules
+    code = f"import time; t0 = time.perf_counter_ns(); import {module}; print(time.perf_counter_ns() - t0)"
+    times = np.empty(repeats, dtype=np.int64)
+    for k in range(repeats):
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        times[k] = int(out.stdout.strip().splitlines()[-1])
+    return {'name': module, 'kind': 'import', 'repeats': repeats, 'time': _latency_stats(times)}
+
+def run_suite(envs=None, solvers=None, modes=MODES, steps: int=10000, batch: int=16, backend: str='thread', imports=None, verbose: bool=True) -> dict:
+    envs = list(ENVS) if envs is None else envs
+    solvers = list(SOLVERS) if solvers is None else solvers
+    imports = list(IMPORTS) if imports is None else imports
+
+    results = []
+    for name in envs:
+        if verbose: print(f"[bench] env {name} ...", file=sys.stderr)
+        results.append(bench_env(name, modes, steps, batch, backend))
+    for name in solvers:
+        if verbose: print(f"[bench] solver {name} ...", file=sys.stderr)
+        results.append(bench_solver(name))
+    for name in imports:
+        if verbose: print(f"[bench] import {name} ...", file=sys.stderr)
+        results.append(bench_import(name))
+
+    return {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'steps': steps,
+            'batch': batch,
+        },
+        'results': results,
+    }
+
+###### regression check ######
+
+def _throughputs(report: dict) -> dict:
+    # (name, mode) -> steps/sec or (name, 'solver'/'import') -> calls/sec
+    values = dict()
+    for r in report['results']:
+        if r['kind'] == 'env':
+            for mode in MODES:
+                if mode in r:
+                    values[(r['name'], mode)] = r[mode]['steps_per_sec']
+        else:
+            values[(r['name'], r['kind'])] = 1e6 / r['time']['mean_us']
+    return values
+
+def compare_results(baseline: dict, current: dict, tolerance: float=0.1) -> list:
+    """ rows of (name, mode, baseline, current, ratio, regressed); a ratio < 1 - tolerance is a regression """
+    old, new = _throughputs(baseline), _throughputs(current)
+    rows = []
+    for key in new:
+        if key in old:
+            ratio = new[key] / old[key]
+            rows.append((key[0], key[1], old[key], new[key], ratio, ratio < 1 - tolerance))
+    return rows
@@ -1,4 +1,41 @@
-from amusepark.envs.wordle import WordleEnv
-from amusepark.envs.isoland import MoveArrowEnv
-from amusepark.envs.machinarium import TraverseMazeEnv
-from amusepark.envs.in_a_row import TicTacToeEnv, GobbletEnv
\ No newline at end of file
+import os
+import importlib
+
+# env class -> module; the modules (and gym) are only imported on first access
+_ENV_MODULES = {
+    'WordleEnv': 'amusepark.envs.wordle',
+    'MultiWordleEnv': 'amusepark.envs.wordle',
+    'MoveArrowEnv': 'amusepark.envs.isoland',
+    'TraverseMazeEnv': 'amusepark.envs.machinarium',
+    'CoinGameEnv': 'amusepark.envs.gambler',
+    'TicTacToeEnv': 'amusepark.envs.in_a_row',
+    'GobbletEnv': 'amusepark.envs.in_a_row',
+    'MNKGameEnv': 'amusepark.envs.in_a_row',
+}
+
+__all__ = list(_ENV_MODULES) + ['register_envs']
+
+def __getattr__(name: str):
+    if name in _ENV_MODULES:
+        env_cls = getattr(importlib.import_module(_ENV_MODULES[name]), name)
+        globals()[name] = env_cls
+        return env_cls
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(_ENV_MODULES))
+
+def _default_kwargs(name: str) -> dict:
+    if name in ('WordleEnv', 'MultiWordleEnv'):
+        from amusepark.utils.path import data_path
+        return {'word_filename': os.path.join(data_path, 'wordle-hidden.txt')}
+    return {}
+
+def register_envs(namespace: str='amusepark'):
+    """ register the envs with gym as '<namespace>/<Name>-v0' (e.g. 'amusepark/Wordle-v0') by entry point """
+    from gym.envs.registration import register, registry
+
+    for name, module in _ENV_MODULES.items():
+        env_id = f"{namespace}/{name[:-len('Env')]}-v0"
+        if env_id not in registry:
+            register(id=env_id, entry_point=f"{module}:{name}", kwargs=_default_kwargs(name))
@@ -3,6 +3,9 @@ from gym import spaces
 
 import numpy as np
 
+from amusepark.utils.text_attr import write_frame
+from amusepark.utils.validation import make_action_checker
+
 class CoinGameEnv(gym.Env):
     """ 2-Armed Bandit Env
     The banker and the player each has a coin. In one play, they need to show either face of their own coin simultaneously, and the result is dependent on the face combination.
@@ -17,7 +20,9 @@ class CoinGameEnv(gym.Env):
     The banker shows the "head" according to a (deterministic or nondeterministic) probability p.
     The player wants to maximize the expected value earned.
     """
-    metadata = {'render.modes': ['terminal']}
+    metadata = {'render.modes': ['terminal', 'ansi']}
+    # methods timed by amusepark.wrappers.ProfileWrapper
+    profile_phases = {'dynamics': ['_banker_move']}
     # (banker, player): value
     values = {
         (0, 0): -3,
@@ -33,12 +38,12 @@ class CoinGameEnv(gym.Env):
         -1: 'none'
     }
 
-    def __init__(self, deterministic: bool=True):
+    def __init__(self, deterministic: bool=True, trusted_actions: bool=False):
         super(CoinGameEnv, self).__init__()
 
         # variables
         self.deterministic = deterministic
-        self.deterministic_p = np.random.rand()
+        self.deterministic_p = self.np_random.random()
         self.banker = -1
         self.player = -1
 
@@ -47,26 +52,23 @@ class CoinGameEnv(gym.Env):
 
         # action space: head (0) or tail (1)
         self.action_space = spaces.Discrete(2)
-
-    def reset(self):
+        # action check (skipped if the caller guarantees valid actions)
+        self._valid_action = make_action_checker(self.action_space, trusted_actions)
+
+    def reset(self, seed: int=None):
+        # seed the env's own random generator; a new seed also redraws the deterministic banker
+        super(CoinGameEnv, self).reset(seed=seed)
+        if seed is not None:
+            self.deterministic_p = self.np_random.random()
         return 0
 
     def step(self, action):
-        assert self.action_space.contains(action), f"Invalid action: {action}!"
+        assert self._valid_action(action), f"Invalid action: {action}!"
 
         self.player = action
 
         ## banker's strategy
-        # sample the probability p for "head"
-        if self.deterministic:
-            p = self.deterministic_p
-        else:
-            p = np.random.rand()
-        # sample the face according to p above
-        if np.random.rand() < p:
-            self.banker = 0
-        else:
-            self.banker = 1
+        p = self._banker_move()
 
         ## reward
         reward = self.values[(self.banker, action)]
@@ -79,15 +81,33 @@ class CoinGameEnv(gym.Env):
 
         return 0, reward, True, info
 
+    def _banker_move(self) -> float:
+        # sample the probability p for "head"
+        if self.deterministic:
+            p = self.deterministic_p
+        else:
+            p = self.np_random.random()
+        # sample the face according to p above
+        if self.np_random.random() < p:
+            self.banker = 0
+        else:
+            self.banker = 1
+        return p
+
     def render(self, mode='terminal'):
-        if mode != 'terminal':
+        if mode == 'terminal':
+            write_frame(self._render_ansi())
+        elif mode == 'ansi':
+            return self._render_ansi()
+        else:
             raise NotImplementedError
 
-        print(">>")
-        print("{:6s}|{:6s}|{:6s}".format("banker", "player", "value"))
-        print("-"*20)
-        print("{:6s}|{:6s}|{:<6d}".format(self.labels[self.banker], self.labels[self.player], self.values[(self.banker, self.player)]))
-        print()
+    def _render_ansi(self) -> str:
+        return ">>\n" + \
+            "{:6s}|{:6s}|{:6s}\n".format("banker", "player", "value") + \
+            "-"*20 + "\n" + \
+            "{:6s}|{:6s}|{:<6d}\n".format(self.labels[self.banker], self.labels[self.player], self.values[(self.banker, self.player)]) + \
+            "\n"
 
     def close(self):
         pass
@@ -2,8 +2,28 @@ import gym
 from gym import spaces
 
 import numpy as np
-
-from amusepark.utils.text_attr import Foreground
+from functools import lru_cache
+
+from amusepark.utils.text_attr import Foreground, write_frame
+from amusepark.utils.render import TileRenderer, sprite, code2rgb, disc_mask, ring_mask, cross_mask
+from amusepark.utils.validation import make_action_checker
+from amusepark.utils.observation import ObservationEmitter
+from amusepark.games import gobblet
+from amusepark.games.gobblet import GobbletState, GobbletArrays
+from amusepark import kernels
+
+### render tables ###
+# board value + 1: {player 2, empty, player 1}
+_TTT_GLYPHS = ["|" + Foreground.BLUE + "x" + Foreground.RESET, "| ", "|" + Foreground.RED + "o" + Foreground.RESET]
+
+@lru_cache(maxsize=None)
+def _ttt_sprites() -> np.ndarray:
+    white = code2rgb(Foreground.LIGHT_WHITE)
+    return np.stack([
+        sprite(white, code2rgb(Foreground.BLUE), cross_mask()),
+        sprite(white),
+        sprite(white, code2rgb(Foreground.RED), ring_mask(0.7)),
+    ])
 
 class TicTacToeEnv(gym.Env):
     """ Tic-Tac-Toe
@@ -13,30 +33,43 @@ class TicTacToeEnv(gym.Env):
 
     - Action:
     The position is encoded from left to right and top to bottom as 0 to 8. Actions take in turn.
+
+    - obs_mode: 'view' (internal board), 'copy' or 'int8' (int8 buffer, see ObservationEmitter and set_obs_buffer)
     
     """
-    metadata = {'render.modes': ['terminal']}
-    def __init__(self) -> None:
+    metadata = {'render.modes': ['terminal', 'ansi', 'rgb_array']}
+    # methods timed by amusepark.wrappers.ProfileWrapper
+    profile_phases = {'done': ['is_win']}
+
+    def __init__(self, trusted_actions: bool=False, obs_mode: str='view') -> None:
         super(TicTacToeEnv, self).__init__()
 
         # variables
         self.board = np.zeros((3, 3), dtype=int)
         self.turn_piece = 1 # 1: player 1; -1: player 2
         self.step_counter = 0
+        # rgb_array frames (built at the first call)
+        self._tile_renderer = None
 
         # observation/state space
         # 0: empty, 1: player 1, -1: player 2
-        self.observation_space = spaces.Box(low=-1, high=1, shape=(3, 3), dtype=int)
+        self._obs = ObservationEmitter((3, 3), obs_mode)
+        self.observation_space = spaces.Box(low=-1, high=1, shape=(3, 3), dtype=self._obs.dtype)
 
         # action space
         # left to right, top to bottom in the 3x3 grid
         self.action_space = spaces.Discrete(9)
+        # action check (skipped if the caller guarantees valid actions)
+        self._valid_action = make_action_checker(self.action_space, trusted_actions)
+
+    def reset(self, seed: int=None):
+        # deterministic env: the seed only initializes the env's random generator
+        super(TicTacToeEnv, self).reset(seed=seed)
 
-    def reset(self):
         self.board = np.zeros((3, 3), dtype=int)
         self.turn_piece = 1 # 1: player 1; -1: player 2
         self.step_counter = 0
-        return self.board
+        return self._obs(self.board)
 
     def is_win(self, i, j, turn_piece, board):
         # horizontal
@@ -44,13 +77,15 @@ class TicTacToeEnv(gym.Env):
             return True
         elif board[i, (j+1)%3] == turn_piece and board[i, (j+2)%3] == turn_piece:
             return True
-        elif (i+j)%2==0 and board[(i+1)%3, (j+1)%3] == turn_piece and board[(i+2)%3, (j+2)%3] == turn_piece:
+        elif i == j and board[(i+1)%3, (j+1)%3] == turn_piece and board[(i+2)%3, (j+2)%3] == turn_piece: # diagonal
+            return True
+        elif i + j == 2 and board[(i+1)%3, (j-1)%3] == turn_piece and board[(i+2)%3, (j-2)%3] == turn_piece: # anti-diagonal
             return True
         else:
             return False
 
     def step(self, action: int):
-        assert self.action_space.contains(action), f"Invalid action: {action}!"
+        assert self._valid_action(action), f"Invalid action: {action}!"
 
         # decode coordinates
         i, j = action // 3, action % 3
@@ -87,32 +122,224 @@ class TicTacToeEnv(gym.Env):
         # increment step counter
         self.step_counter += 1
 
-        return self.board, reward, done, info
+        return self._obs(self.board), reward, done, info
     
+    def set_obs_buffer(self, out: np.ndarray=None):
+        """ int8 mode: write the next observations into `out` """
+        self._obs.set_buffer(out)
+
+    def render(self, mode='terminal'):
+        if mode == 'terminal':
+            write_frame(self._render_ansi())
+        elif mode == 'ansi':
+            return self._render_ansi()
+        elif mode == 'rgb_array':
+            if self._tile_renderer is None:
+                self._tile_renderer = TileRenderer(_ttt_sprites(), (3, 3))
+            return self._tile_renderer(self.board + 1)
+        else:
+            raise NotImplementedError
+
+    def _render_ansi(self) -> str:
+        if (self.board == 0).all(): header = ">>>Init\n"
+        elif self.turn_piece == -1: header = ">>>" + Foreground.RED + "Player 1" + Foreground.RESET + f" Step {self.step_counter}\n"
+        elif self.turn_piece == 1: header = ">>>" + Foreground.BLUE + "Player 2" + Foreground.RESET + f" Step {self.step_counter}\n"
+        else: raise NotImplementedError
+
+        rows = [header, "-"*7 + "\n"]
+        for row in self.board.tolist():
+            rows.append("".join([_TTT_GLYPHS[v + 1] for v in row]) + "|\n" + "-"*7 + "\n")
+        return "".join(rows)
+
+    def close(self):
+        pass
+
+
+@lru_cache(maxsize=None)
+def _mnk_lines(m: int, n: int, k: int) -> tuple:
+    # per cell (i * n + j), the bitmasks of the k-cell windows through it in the 4 directions
+    lines = [[] for _ in range(m * n)]
+    for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        for i in range(m):
+            for j in range(n):
+                # window starting at (i, j)
+                end_i, end_j = i + (k-1)*di, j + (k-1)*dj
+                if not (0 <= end_i < m and 0 <= end_j < n):
+                    continue
+                cells = [(i + s*di) * n + (j + s*dj) for s in range(k)]
+                mask = sum(1 << c for c in cells)
+                for c in cells:
+                    lines[c].append(mask)
+    return tuple(tuple(l) for l in lines)
+
+class MNKGameEnv(gym.Env):
+    """ m,n,k-Game: two players take turns on an m x n board and the first to get k in a row wins (e.g. Gomoku: 15, 15, 5)
+
+    - Observation:
+    An m x n grid board. 1: pieces of Player 1; -1 pieces of Player 2.
+
+    - Action:
+    The position is encoded from left to right and top to bottom as 0 to m*n-1. Actions take in turn.
+
+    - Note: An occupied position terminates the game and the other player wins; a full board is a tie (reward 0).
+
+    - The state is kept as one bitboard (python int, bit i*n+j) per player. The k-in-a-row windows through each cell are
+      precomputed as bitmasks, so the win check after a move tests O(k) masks whatever the board size.
+
+    - obs_mode: 'view' (internal board), 'copy' or 'int8' (int8 buffer, see ObservationEmitter and set_obs_buffer)
+    """
+    metadata = {'render.modes': ['terminal', 'ansi', 'rgb_array']}
+    # methods timed by amusepark.wrappers.ProfileWrapper
+    profile_phases = {'done': ['is_win']}
+
+    def __init__(self, m: int=15, n: int=15, k: int=5, trusted_actions: bool=False, obs_mode: str='view') -> None:
+        super(MNKGameEnv, self).__init__()
+
+        assert k <= max(m, n), f"No {k} in a row on a {m}x{n} board!"
+        self.m, self.n, self.k = m, n, k
+        # k-in-a-row bitmasks through each cell
+        self._lines = _mnk_lines(m, n, k)
+
+        # variables
+        self._init_state()
+        # rgb_array frames (built at the first call)
+        self._tile_renderer = None
+
+        # observation/state space
+        # 0: empty, 1: player 1, -1: player 2
+        self._obs = ObservationEmitter((m, n), obs_mode)
+        self.observation_space = spaces.Box(low=-1, high=1, shape=(m, n), dtype=self._obs.dtype)
+
+        # action space
+        # left to right, top to bottom in the m x n grid
+        self.action_space = spaces.Discrete(m * n)
+        # action check (skipped if the caller guarantees valid actions)
+        self._valid_action = make_action_checker(self.action_space, trusted_actions)
+
+    def _init_state(self):
+        self.board = np.zeros((self.m, self.n), dtype=int)
+        # bitboards of both players
+        self.bitboards = {1: 0, -1: 0}
+        self.turn_piece = 1 # 1: player 1; -1: player 2
+        self.step_counter = 0
+
+    def reset(self, seed: int=None):
+        # deterministic env: the seed only initializes the env's random generator
+        super(MNKGameEnv, self).reset(seed=seed)
+
+        self._init_state()
+        return self._obs(self.board)
+
+    def is_win(self, cell: int, bitboard: int) -> bool:
+        # only the windows through the last move can be new
+        for mask in self._lines[cell]:
+            if bitboard & mask == mask:
+                return True
+        return False
+
+    def legal_mask(self) -> np.ndarray:
+        """ bool mask of the empty positions """
+        return (self.board == 0).reshape(-1)
+
+    def step(self, action: int):
+        assert self._valid_action(action), f"Invalid action: {action}!"
+
+        # decode coordinates
+        i, j = action // self.n, action % self.n
+        bit = 1 << action
+
+        # check if the cell has been occupied
+        if not (self.bitboards[1] | self.bitboards[-1]) & bit: # empty
+            self.board[i, j] = self.turn_piece
+            self.bitboards[self.turn_piece] |= bit
+
+            # check if game is over
+            if self.is_win(action, self.bitboards[self.turn_piece]):
+                done = True
+                reward = float(self.turn_piece)
+                msg = f"Win: {self.k} pieces in a row!"
+            elif self.step_counter + 1 == self.m * self.n:
+                done = True
+                reward = 0.
+                msg = "Tie: no feasible move!"
+            else:
+                done = False
+                reward = 0.
+                msg = ""
+
+        else: # occupied
+            done = True
+            reward = float(self.turn_piece*-1)
+            msg = f"Postion ({i}, {j}) is occupied! "
+
+        # info
+        info = {"message": msg}
+
+        # change turn
+        self.turn_piece *= -1
+
+        # increment step counter
+        self.step_counter += 1
+
+        return self._obs(self.board), reward, done, info
+
+    def set_obs_buffer(self, out: np.ndarray=None):
+        """ int8 mode: write the next observations into `out` """
+        self._obs.set_buffer(out)
+
     def render(self, mode='terminal'):
-        if mode != 'terminal':
+        if mode == 'terminal':
+            write_frame(self._render_ansi())
+        elif mode == 'ansi':
+            return self._render_ansi()
+        elif mode == 'rgb_array':
+            if self._tile_renderer is None:
+                self._tile_renderer = TileRenderer(_ttt_sprites(), (self.m, self.n))
+            return self._tile_renderer(self.board + 1)
+        else:
             raise NotImplementedError
 
-        if (self.board == 0).all(): print(">>>Init")
-        elif self.turn_piece == -1: print(">>>" + Foreground.RED + "Player 1" + Foreground.RESET + f" Step {self.step_counter}")
-        elif self.turn_piece == 1: print(">>>" + Foreground.BLUE + "Player 2" + Foreground.RESET + f" Step {self.step_counter}")
+    def _render_ansi(self) -> str:
+        if self.step_counter == 0: header = ">>>Init\n"
+        elif self.turn_piece == -1: header = ">>>" + Foreground.RED + "Player 1" + Foreground.RESET + f" Step {self.step_counter}\n"
+        elif self.turn_piece == 1: header = ">>>" + Foreground.BLUE + "Player 2" + Foreground.RESET + f" Step {self.step_counter}\n"
         else: raise NotImplementedError
 
-        print("-"*7)
-        for i in range(3):
-            for j in range(3):
-                if self.board[i, j] == 1:
-                    print("|" + Foreground.RED + "o" + Foreground.RESET, end="")
-                elif self.board[i, j] == -1:
-                    print("|" + Foreground.BLUE + "x" + Foreground.RESET, end="")
-                else:
-                    print("| ", end="")
-            print("|\n" + "-"*7)
+        row_sep = "-"*(2*self.n+1) + "\n"
+        rows = [header, row_sep]
+        for row in self.board.tolist():
+            rows.append("".join([_TTT_GLYPHS[v + 1] for v in row]) + "|\n" + row_sep)
+        return "".join(rows)
 
     def close(self):
         pass
 
 
+@lru_cache(maxsize=None)
+def _gobblet_glyphs() -> tuple:
+    # rank + 4 (-4 to 4) and piece + 12 (-12 to 12)
+    symbols = GobbletEnv.p_symbols
+    rank_glyphs = [
+        "|" + Foreground.RED + symbols[r] + Foreground.RESET if r > 0 else
+        "|" + Foreground.BLUE + symbols[-r] + Foreground.RESET if r < 0 else "| "
+        for r in range(-4, 5)
+    ]
+    piece_glyphs = [
+        "|" + Foreground.RED + "%2d"%(p) + Foreground.RESET if p > 0 else
+        "|" + Foreground.BLUE + "%2d"%(-p) + Foreground.RESET if p < 0 else "|  "
+        for p in range(-12, 13)
+    ]
+    return rank_glyphs, piece_glyphs
+
+@lru_cache(maxsize=None)
+def _gobblet_sprites() -> np.ndarray:
+    # rank + 4: discs growing with the rank
+    white = code2rgb(Foreground.LIGHT_WHITE)
+    return np.stack([
+        sprite(white, code2rgb(Foreground.RED if r > 0 else Foreground.BLUE), disc_mask(0.2 * abs(r) + 0.1)) if r != 0 else sprite(white)
+        for r in range(-4, 5)
+    ])
+
 class GobbletEnv(gym.Env):
     """ Simplified Version of the 2-Player Board Game Gobblet
     Simplification: All pieces are available at the beginning (no external stacks).
@@ -128,176 +355,193 @@ class GobbletEnv(gym.Env):
     A 2-tuple of (piece[int], position[int]). The piece is an absolute number in 1 to 12. The position is encoded from left to right and top to bottom as 0 to 15. Actions take in turn.
 
     - Note: An invalid action terminates the game and the other player automatically wins.
+
+    - obs_mode: 'view' (internal board), 'copy' or 'int8' (int8 buffer, see ObservationEmitter and set_obs_buffer)
     """
-    metadata = {'render.modes': ['terminal']}
+    metadata = {'render.modes': ['terminal', 'ansi', 'rgb_array']}
+    # methods timed by amusepark.wrappers.ProfileWrapper
+    profile_phases = {'dynamics': ['_apply'], 'done': ['_check_done']}
     mode_dict = {
         0: 'Static',
         1: 'Dynamic'
     }
 
     # ranks of each piece (a higher can cover a lower)
-    p_ranks = [0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 4, 4, 4] # 1st: dummy
+    p_ranks = list(gobblet.P_RANKS) # 1st: dummy
     p_symbols = ['\u25cb', '\u25d4', '\u25d1', '\u25d5', '\u25cf']
 
-    def __init__(self, mode: int=0) -> None:
+    def __init__(self, mode: int=0, trusted_actions: bool=False, obs_mode: str='view') -> None:
         super(GobbletEnv, self).__init__()
 
         ## variables
         # mode
         assert mode in self.mode_dict, f"Invalid mode: {mode}!"
         self.mode = mode
-        # availability of each piece for both players (1st: dummy)
-        self.p1_avail = [False] + [True for _ in range(12)]
-        self.p2_avail = [False] + [True for _ in range(12)]
-        # board of the history (pieces in a channel with the smaller index cover that with the larger index)
-        # pieces are labeled 1 to 12 for player 1 and -1 to -12 for player 2; 0 stands for empty
-        self.board = np.zeros((5, 4, 4), dtype=int) # last channel: dummy
-        # ranks of the pieces of history
-        # 1 to 4 for player 1 and -1 to -4 for player 2; 0 stands for empty
-        self.rank = np.zeros((5, 4, 4), dtype=int) # last channel: dummy
-        # who's turn: 1 for player 1; -1 for player 2
-        self.player = 1
-        # step counter
-        self.step_counter = 0
+        # compiled step kernels (None: numba unavailable), stepping the int8 array form of the state
+        self._kernels = kernels.env_kernels()
+        self._init_state()
+        # rgb_array frames (built at the first call)
+        self._tile_renderer = None
         
         ## observation/state space
-        self.observation_space = spaces.Box(low=-12, high=12, shape=(4, 4), dtype=int)
+        self._obs = ObservationEmitter((4, 4), obs_mode)
+        self.observation_space = spaces.Box(low=-12, high=12, shape=(4, 4), dtype=self._obs.dtype)
 
         ## action space: (piece, position)
         self.action_space = spaces.Tuple(
             (spaces.Discrete(12, start=1), spaces.Discrete(16))
         )
-    
-    def reset(self):
-        ## init variables
-        # availability of each piece for both players (1st: dummy)
-        self.p1_avail = [False] + [True for _ in range(12)]
-        self.p2_avail = [False] + [True for _ in range(12)]
+        # action check (skipped if the caller guarantees valid actions)
+        self._valid_action = make_action_checker(self.action_space, trusted_actions)
+
+    def _init_state(self):
+        # rules and state: amusepark.games.gobblet (with the kernels, its int8 array form is stepped)
+        self._state = GobbletState(self.mode)
+        self._arrays = None if self._kernels is None else GobbletArrays(self._state)
+        self._state_stale = False
         # board of the history (pieces in a channel with the smaller index cover that with the larger index)
         # pieces are labeled 1 to 12 for player 1 and -1 to -12 for player 2; 0 stands for empty
         self.board = np.zeros((5, 4, 4), dtype=int) # last channel: dummy
         # ranks of the pieces of history
         # 1 to 4 for player 1 and -1 to -4 for player 2; 0 stands for empty
         self.rank = np.zeros((5, 4, 4), dtype=int) # last channel: dummy
+        # int8 copies synced by the kernels
+        if self._kernels is not None:
+            self._board8 = np.zeros((5, 4, 4), dtype=np.int8)
+            self._rank8 = np.zeros((5, 4, 4), dtype=np.int8)
         # who's turn: 1 for player 1; -1 for player 2
         self.player = 1
         # step counter
         self.step_counter = 0
+    
+    @property
+    def state(self) -> GobbletState:
+        # with the kernels, rebuilt from the arrays when read
+        if self._state_stale:
+            self._state = self._arrays.to_state()
+            self._state_stale = False
+        return self._state
+
+    @property
+    def p1_avail(self) -> list:
+        # availability of each piece of player 1 (1st: dummy), shared with self.state
+        return self.state.avail[1]
+
+    @property
+    def p2_avail(self) -> list:
+        return self.state.avail[-1]
+
+    def reset(self, seed: int=None):
+        # deterministic env: the seed only initializes the env's random generator
+        super(GobbletEnv, self).reset(seed=seed)
+
+        ## init variables
+        self._init_state()
 
-        return self.board[0, :, :]
+        return self._obs(self.board[0, :, :])
 
     def step(self, action: tuple):
-        assert self.action_space.contains(action)
+        assert self._valid_action(action), f"Invalid action: {action}!"
 
         # decode action
         piece, pos = action
         pos_i, pos_j = pos // 4, pos % 4
 
-        # decide player
-        if self.player == 1: p_avail = self.p1_avail
-        elif self.player == -1: p_avail = self.p2_avail
-        else: raise NotImplementedError
+        # play the move, then check the outcome (the turn switches)
+        token = self._apply((piece, pos))
+        self._check_done(token)
+        state, _, move = token
+        self.player = state.player
 
-        # piece not available: the other player wins
-        if not p_avail[piece]:
-            self.player *= -1
-            return self.board[0, :, :], float(self.player), True, {'board': self.board, 'rank': self.rank, 'message': f"Piece {piece} unavailable!"}
-
-        # pos is taken up by a higher rank piece: the other player wins
-        if self.p_ranks[piece] <= self.p_ranks[abs(self.board[0, pos_i, pos_j])]:
-            self.player *= -1
-            return self.board[0, :, :], float(self.player), True, {'board': self.board, 'rank': self.rank, 'message': f"Position ({pos_i}, {pos_j}) unavailable for piece {piece}!"}
-
-        # remove the piece from the board if any (dynamic mode)
-        revealed_piece = 0
-        if (self.player * piece == self.board[0, :, :]).any():
-            prev_pos = np.where(self.player * piece == self.board[0, :, :])
-            prev_pos_i, prev_pos_j = int(prev_pos[0]), int(prev_pos[1])
-            for c in range(3, -1, -1):
-                self.board[c, prev_pos_i, prev_pos_j] = self.board[c+1, prev_pos_i, prev_pos_j]
-                self.rank[c, prev_pos_i, prev_pos_j] = self.rank[c+1, prev_pos_i, prev_pos_j]
-            revealed_piece = self.board[0, prev_pos_i, prev_pos_j]
-        
-        # place the piece
-        covered_piece = self.board[0, pos_i, pos_j]
-        for c in range(1, 5, 1):
-            self.board[c, pos_i, pos_j] = self.board[c-1, pos_i, pos_j]
-            self.rank[c, pos_i, pos_j] = self.rank[c-1, pos_i, pos_j]
-        self.board[0, pos_i, pos_j] = self.player * piece
-        self.rank[0, pos_i, pos_j] = self.player * self.p_ranks[piece]
-
-        # update availability
-        if covered_piece > 0: self.p1_avail[covered_piece] = False
-        elif covered_piece < 0: self.p2_avail[-covered_piece] = False
-        if self.mode == 0: # static
-            p_avail[piece] = False
-        elif self.mode == 1: # dynamic
-            if revealed_piece > 0: self.p1_avail[revealed_piece] = True
-            elif revealed_piece < 0: self.p2_avail[-revealed_piece] = True
+        # invalid move: the other player wins
+        if move is None:
+            if state.reason == gobblet.PIECE_UNAVAILABLE:
+                msg = f"Piece {piece} unavailable!"
+            else:
+                msg = f"Position ({pos_i}, {pos_j}) unavailable for piece {piece}!"
+            return self._obs(self.board[0, :, :]), float(state.winner), True, {'board': self.board, 'rank': self.rank, 'message': msg}
+
+        # history of the cells the piece left and entered
+        src, dst = move[1], move[2]
+        if self._kernels is not None:
+            a = self._arrays
+            self._kernels.gobblet_sync(self._board8, self._rank8, a.stacks, a.heights, gobblet.RANKS_ARRAY, src, dst)
+            self.board[...] = self._board8
+            self.rank[...] = self._rank8
         else:
-            raise NotImplementedError
+            self._sync_cell(dst)
+            if src >= 0:
+                self._sync_cell(src)
 
-        msg = ""
-        # check if the player wins or there is no valid move left (the other wins)
-        if (self.player * self.board[0, pos_i, :] > 0).all() or \
-            (self.player * self.board[0, :, pos_j] > 0).all() or \
-                (self.player * self.board[0, (0,1,2,3), (0,1,2,3)] > 0).all() or \
-                    (self.player * self.board[0, (0,1,2,3), (3,2,1,0)] > 0).all(): # horizontal, vertical, or diagonals
-            done, reward = True, float(self.player)
+        # the player wins or there is no valid move left (the other wins)
+        if state.reason == gobblet.WIN:
             msg = "Win: 4 pieces in a row!"
-        elif sum(p_avail) == 0: # no piece available
-            done, reward = True, float(-self.player)
+        elif state.reason == gobblet.NO_PIECE:
             msg = "No piece available!"
-        elif self.mode == 0: # all pieces on board ranked higher than available pieces
-            p_avail_ = p_avail.copy()
-            p_avail_.reverse()
-            avail_max_rank = self.p_ranks[12-p_avail_.index(True)]
-            on_board_min_rank = abs(self.rank[0, :, :]).min()
-            if avail_max_rank <= on_board_min_rank:
-                done, reward = True, float(-self.player)
-                msg = f"No position available! (max rank of available piece: {avail_max_rank}, min rank on board: {on_board_min_rank})"
-            else:
-                done, reward = False, 0
+        elif state.reason == gobblet.NO_POSITION:
+            msg = f"No position available! (max rank of available piece: {gobblet.max_avail_rank(self.state, -state.player)}, min rank on board: {gobblet.min_top_rank(self.state)})"
         else:
-            done, reward = False, 0
-
-        # switch turn
-        self.player *= -1
+            msg = ""
+        reward = float(state.winner) if state.done else 0
 
         # increment step counter
         self.step_counter += 1
 
-        return self.board[0, :, :], reward, done, {'board': self.board, 'rank': self.rank, 'message': msg}
+        return self._obs(self.board[0, :, :]), reward, state.done, {'board': self.board, 'rank': self.rank, 'message': msg}
+
+    def _apply(self, move: tuple) -> tuple:
+        if self._kernels is None:
+            return gobblet.apply(self.state, move, finish_move=False)
+        self._state_stale = True
+        return gobblet.apply_arrays(self._arrays, move, self._kernels)
+
+    def _check_done(self, token: tuple):
+        # wins through the source and destination cells, no piece or position left
+        if self._kernels is None:
+            gobblet.finish(token)
+        else:
+            gobblet.finish_arrays(token, self._kernels)
+
+    def _sync_cell(self, cell: int):
+        # stack of a cell -> channels of self.board and self.rank (top first)
+        pieces = self.state.stacks[cell][::-1]
+        pieces += [0] * (5 - len(pieces))
+        i, j = cell // 4, cell % 4
+        self.board[:, i, j] = pieces
+        self.rank[:, i, j] = [self.p_ranks[p] if p >= 0 else -self.p_ranks[-p] for p in pieces]
+
+    def set_obs_buffer(self, out: np.ndarray=None):
+        """ int8 mode: write the next observations into `out` """
+        self._obs.set_buffer(out)
 
     def render(self, mode='terminal'):
-        if mode != 'terminal':
+        if mode == 'terminal':
+            write_frame(self._render_ansi())
+        elif mode == 'ansi':
+            return self._render_ansi()
+        elif mode == 'rgb_array':
+            if self._tile_renderer is None:
+                self._tile_renderer = TileRenderer(_gobblet_sprites(), self.board.shape[1:])
+            return self._tile_renderer(self.rank[0, :, :] + 4)
+        else:
             raise NotImplementedError
 
-        if (self.rank == 0).all(): print(">>>Init")
-        elif self.player == 1: print(">>>" + Foreground.BLUE + "Player 2" + Foreground.RESET + f" Step {self.step_counter}")
-        elif self.player == -1: print(">>>" + Foreground.RED + "Player 1" + Foreground.RESET + f" Step {self.step_counter}")
+    def _render_ansi(self) -> str:
+        if (self.rank == 0).all(): header = ">>>Init\n"
+        elif self.player == 1: header = ">>>" + Foreground.BLUE + "Player 2" + Foreground.RESET + f" Step {self.step_counter}\n"
+        elif self.player == -1: header = ">>>" + Foreground.RED + "Player 1" + Foreground.RESET + f" Step {self.step_counter}\n"
         else: raise NotImplementedError
 
         _, m, n = self.board.shape
-        for i in range(m):
-            s1 = ""
-            s2 = ""
-            for j in range(n):
-                r = self.rank[0, i, j] # rank
-                p = self.board[0, i, j] # piece
-                # rank
-                if r > 0: s1 += "|" + Foreground.RED + self.p_symbols[r] + Foreground.RESET
-                elif r < 0: s1 += "|" + Foreground.BLUE + self.p_symbols[-r] + Foreground.RESET
-                else: s1 += "| "
-                # piece
-                if p > 0: s2 += "|" + Foreground.RED + "%2d"%(p) + Foreground.RESET
-                elif p < 0: s2 += "|" + Foreground.BLUE + "%2d"%(-p) + Foreground.RESET
-                else: s2 += "|  "
-            s1 += "|"
-            s2 += "|"
-            print(s1 + " "*5 + s2)
-            print("-"*(2*n+1) + " "*5 + "-"*(3*n+1))
-        
+        rank_glyphs, piece_glyphs = _gobblet_glyphs()
+        row_sep = "-"*(2*n+1) + " "*5 + "-"*(3*n+1) + "\n"
+        rows = [header]
+        for r_row, p_row in zip(self.rank[0, :, :].tolist(), self.board[0, :, :].tolist()):
+            s1 = "".join([rank_glyphs[r + 4] for r in r_row]) + "|"
+            s2 = "".join([piece_glyphs[p + 12] for p in p_row]) + "|"
+            rows.append(s1 + " "*5 + s2 + "\n" + row_sep)
+        return "".join(rows)
+
     def close(self):
         pass
 
@@ -360,6 +604,23 @@ def Gobblet_example(mode=0):
         print(r, done)
     print("---\n" + info["message"])
 
+def MNKGame_example():
+    print("\n====== Gomoku (15, 15, 5) ======\n")
+    # env
+    env = MNKGameEnv(15, 15, 5)
+    # action sequence: player 1 builds a diagonal, player 2 a row
+    actions = [16, 0, 32, 1, 48, 2, 64, 3, 80]
+
+    obs = env.reset()
+    done = False
+    while not done:
+        act = actions[env.step_counter]
+        obs, r, done, info = env.step(act)
+        print(r, done)
+    env.render()
+    print("---\n" + info["message"])
+
 if __name__ == '__main__':
         Gobblet_example(mode=1)
+        # MNKGame_example()
         # TicTacToe_example()
\ No newline at end of file
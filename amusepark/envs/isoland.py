@@ -2,18 +2,117 @@ import gym
 from gym import spaces
 
 import numpy as np
+from functools import lru_cache
 
-from amusepark.utils.text_attr import Background
+from amusepark.utils.text_attr import Background, write_frame
+from amusepark.utils.render import TileRenderer, sprite, code2rgb, arrow_mask
+from amusepark.utils.validation import make_action_checker
+from amusepark.utils.observation import ObservationEmitter
+from amusepark import kernels
 from amusepark.configs.isoland_configs import *
 
-class MoveArrowEnv(gym.Env):
-    """Custom Environment that follows gym interface"""
-    metadata = {'render.modes': ['terminal']}
+def _arrow_moves(cell: tuple, direction: int, push_dirs: set, signs: dict, H: int, W: int) -> set:
+    # (cell, direction) states after one move of the arrow: by itself along its direction, or pushed along push_dirs
+    # by an arrow behind it (so never away from a boundary it lies on)
+    states = set()
+    for move_dir in {direction} | push_dirs:
+        di, dj = DIRECTIONS[move_dir]
+        i, j = cell[0] + di, cell[1] + dj
+        if not (0 <= i < H and 0 <= j < W): # blocked by the boundary: no move
+            continue
+        if move_dir != direction and not (0 <= cell[0] - di < H and 0 <= cell[1] - dj < W): # no room for a pusher
+            continue
+        states.add(((i, j), signs.get((i, j), direction)))
+    return states
+
+def _freeze(x):
+    # nested lists/tuples -> nested tuples (hashable)
+    return tuple(_freeze(v) for v in x) if isinstance(x, (list, tuple)) else x
+
+def live_states(env_config: dict) -> np.ndarray:
+    r""" (num_arrows, H, W, 5) bool table, read-only and cached per config: live[a, i, j, d] is True if arrow a at
+    (i, j) with direction d can still reach its goal
+
+    An arrow moves along its own direction, or along the direction of another arrow that pushes it from behind, and
+    takes the direction of a sign cell it enters. The directions another arrow can ever hold are over-approximated by a
+    fixpoint of forward searches from the start states, so that pushes are never missed; a state flagged dead
+    (False) is therefore unsolvable. The table then comes from a reverse BFS from the goal cells.
+    """
+    return _live_states(_freeze(env_config['shape']), _freeze(env_config['signs']), _freeze(env_config['arrows']))
+
+@lru_cache(maxsize=None)
+def _live_states(shape: tuple, signs: tuple, arrows: tuple) -> np.ndarray:
+    H, W = shape
+    signs = {(i, j): direction for i, j, direction in signs}
+    num_arrows = len(arrows)
+    all_states = [((i, j), d) for i in range(H) for j in range(W) for d in DIRECTIONS]
+
+    def push_dirs(held: list, idx: int) -> set:
+        return set().union(*[held[k] for k in range(num_arrows) if k != idx])
+
+    # directions each arrow can hold
+    held = [{start[2]} for _, start in arrows]
+    changed = True
+    while changed:
+        changed = False
+        for idx, (_, start) in enumerate(arrows):
+            pushes = push_dirs(held, idx)
+            seen = {((start[0], start[1]), start[2])}
+            frontier = list(seen)
+            while frontier:
+                state = frontier.pop()
+                for nxt in _arrow_moves(*state, pushes, signs, H, W) - seen:
+                    seen.add(nxt)
+                    frontier.append(nxt)
+            dirs = {d for _, d in seen}
+            if not dirs <= held[idx]:
+                held[idx] |= dirs
+                changed = True
+
+    # reverse BFS from the goal cells
+    live = np.zeros((num_arrows, H, W, 5), dtype=bool)
+    for idx, (goal, _) in enumerate(arrows):
+        pushes = push_dirs(held, idx)
+        parents = {state: [] for state in all_states}
+        for state in all_states:
+            for nxt in _arrow_moves(*state, pushes, signs, H, W):
+                parents[nxt].append(state)
+        frontier = [(tuple(goal), d) for d in DIRECTIONS]
+        for (i, j), d in frontier:
+            live[idx, i, j, d] = True
+        while frontier:
+            state = frontier.pop()
+            for (i, j), d in parents[state]:
+                if not live[idx, i, j, d]:
+                    live[idx, i, j, d] = True
+                    frontier.append(((i, j), d))
+    live.setflags(write=False)
+    return live
+
+# direction -> (di, dj) of the push kernel, row 0 unused
+KERNEL_DELTAS = np.zeros((5, 2), dtype=np.int8)
+for _d, _delta in DIRECTIONS.items():
+    KERNEL_DELTAS[_d] = _delta
 
-    def __init__(self, env_config: dict=ENV_CONFIG_0):
+class MoveArrowEnv(gym.Env):
+    """Custom Environment that follows gym interface
+
+    - obs_mode: 'view' (internal state), 'copy' or 'int8' (int8 buffer, see ObservationEmitter and set_obs_buffer)
+    - info['dead']: an arrow can no longer reach its goal (see live_states); terminate_dead ends such episodes
+      (reward 0)
+    """
+    metadata = {'render.modes': ['terminal', 'ansi', 'rgb_array']}
+    # methods timed by amusepark.wrappers.ProfileWrapper
+    profile_phases = {'dynamics': ['_push'], 'done': ['_is_done']}
+
+    def __init__(self, env_config: dict=ENV_CONFIG_0, trusted_actions: bool=False, obs_mode: str='view',
+                 terminate_dead: bool=False):
         super(MoveArrowEnv, self).__init__()
 
         self.env_config = env_config
+        self.terminate_dead = terminate_dead
+        # arrow idx, i, j, direction -> goal still reachable (built at the first step)
+        self._live = None
 
         ### init ###
         # load env config as a state
@@ -27,15 +126,26 @@ class MoveArrowEnv(gym.Env):
         # init step counter
         self.step_counter = 0
 
+        # render tables (built at the first render)
+        self._glyphs = None
+        self._tile_renderer = None
+
+        # compiled step kernels (None: numba unavailable, or arrow metas beyond int8) and their arrays
+        self._kernels = kernels.env_kernels() if 5 + ARROW_FEATURE_NUM * num_arrows <= 128 else None
+        self._init_kernel_arrays()
+
         ### define spaces ###
         # observation/state space (see meta's of isoland_configs.py)
         #   1st layer: fixed map landmarks (i.e. env direction signs + arrow goal markers)
         #   2nd layer: current arrow positions and directions
-        self.observation_space = spaces.Box(low=0, high=5+ARROW_FEATURE_NUM*num_arrows-1, shape=(self.H, self.W, 2), dtype=int)
+        self._obs = ObservationEmitter((self.H, self.W, 2), obs_mode)
+        self.observation_space = spaces.Box(low=0, high=5+ARROW_FEATURE_NUM*num_arrows-1, shape=(self.H, self.W, 2), dtype=self._obs.dtype)
 
         # action space
         #   pick which arrow to move
         self.action_space = spaces.Discrete(num_arrows)
+        # action check (skipped if the caller guarantees valid actions)
+        self._valid_action = make_action_checker(self.action_space, trusted_actions)
 
     def __load_config(self, config: dict):
         ## map shape
@@ -62,7 +172,9 @@ class MoveArrowEnv(gym.Env):
 
         return H, W, state
 
-    def reset(self):
+    def reset(self, seed: int=None):
+        # deterministic env: the seed only initializes the env's random generator
+        super(MoveArrowEnv, self).reset(seed=seed)
 
         # load env config as a state
         self.H, self.W, self.state = self.__load_config(self.env_config)
@@ -70,18 +182,31 @@ class MoveArrowEnv(gym.Env):
         # get arrows dict
         #   arrow idx -> [arrow dir, arrow pos]
         self.arrows = self._get_arrows()
+        self._init_kernel_arrays()
 
         # init step counter
         self.step_counter = 0
     
-        return self.state
+        return self._obs(self.state)
     
+    @property
+    def arrows(self) -> dict:
+        # with the kernels, the arrow arrays are stepped and the dict is rebuilt when read
+        if self._arrows_stale:
+            self._arrows = {int(idx): [int(self._dirs[idx]), (int(self._pos[idx, 0]), int(self._pos[idx, 1]))] for idx in self._order}
+            self._arrows_stale = False
+        return self._arrows
+
+    @arrows.setter
+    def arrows(self, arrows: dict):
+        self._arrows = arrows
+        self._arrows_stale = False
+
     def step(self, action):
-        assert self.action_space.contains(action)
-        arrow_dir, _ = self.arrows[action]
+        assert self._valid_action(action), f"Invalid action: {action}!"
 
         # dynamics
-        self._move(action, arrow_dir)
+        self._push(action)
 
         # done  : True if all arrows are placed on their corresponding goal positions
         # reward: terminal, success or failure
@@ -91,53 +216,78 @@ class MoveArrowEnv(gym.Env):
         else:
             reward = 0
 
+        # an arrow stuck away from its goal: failure
+        dead = not done and self._is_dead()
+        if dead and self.terminate_dead:
+            done = True
+
         # info
-        info = {}
+        info = {'dead': dead}
 
         # step counter
         self.step_counter += 1
     
-        return self.state, reward, done, info
+        return self._obs(self.state), reward, done, info
     
+    def set_obs_buffer(self, out: np.ndarray=None):
+        """ int8 mode: write the next observations into `out` """
+        self._obs.set_buffer(out)
+
     def render(self, mode='terminal'):
         if mode == 'terminal':
-
-            print(">>>>>> STEP %i <<<<<<"%(self.step_counter))
-
-            for i in range(self.H):
-                print(end="|")
-                for j in range(self.W):
-
-                    # get meta's
-                    landmark_meta, arrow_meta = self.state[i, j, :]
-
-                    # draw each grid cell
-                    if arrow_meta > 0: 
-                        # draw movable arrow
-                        is_arrow, arrow_idx, arrow_dir = self._meta2feature(arrow_meta)
-                        assert is_arrow and arrow_dir in DIRECTIONS, f"invalid value in layer 2: {arrow_meta}!"
-                        print(COLORS[arrow_idx] + SYMBOLS[arrow_dir], end="")
-                    else: 
-                        # draw landmark
-                        landmark_is_arrow, landmark_idx, landmark_feature = self._meta2feature(landmark_meta)
-                        assert not landmark_is_arrow, f"invalid value in layer 1: {landmark_meta}!"
-                        if landmark_feature in DIRECTIONS: 
-                            # direction landmark
-                            print(Background.LIGHT_WHITE + SYMBOLS[landmark_feature], end="")
-                        elif landmark_idx == -1: 
-                            # empty cell
-                            print(Background.LIGHT_WHITE + " ", end="")
-                        else: 
-                            # arrow goal
-                            print(COLORS[landmark_idx] + " ", end="")
-
-                    print(Background.RESET, end="|")
-                        
-                print(Background.RESET + "\n" + "-"*self.W*2)
-
+            write_frame(self._render_ansi())
+        elif mode == 'ansi':
+            return self._render_ansi()
+        elif mode == 'rgb_array':
+            return self._render_rgb()
         else:
             raise NotImplementedError
 
+    def _build_render_tables(self):
+        # glyphs and sprites indexed by meta: landmarks (layer 1) and arrows (layer 2) use disjoint meta's
+        num_metas = 5 + ARROW_FEATURE_NUM * len(self.arrows)
+        white = code2rgb(Background.LIGHT_WHITE)
+        black = code2rgb(Background.BLACK)
+        glyphs, sprites = [], []
+        for meta in range(num_metas):
+            is_arrow, idx, feature = self._meta2feature(meta)
+            if is_arrow: # movable arrow
+                color = COLORS[idx % len(COLORS)]
+                glyphs.append(color + SYMBOLS[feature])
+                sprites.append(sprite(code2rgb(color), black, arrow_mask(*DIRECTIONS[feature])))
+            elif feature in DIRECTIONS: # direction landmark
+                glyphs.append(Background.LIGHT_WHITE + SYMBOLS[feature])
+                sprites.append(sprite(white, black, arrow_mask(*DIRECTIONS[feature])))
+            elif idx == -1: # empty cell
+                glyphs.append(Background.LIGHT_WHITE + " ")
+                sprites.append(sprite(white))
+            else: # arrow goal
+                color = COLORS[idx % len(COLORS)]
+                glyphs.append(color + " ")
+                sprites.append(sprite(code2rgb(color)))
+        self._glyphs = [g + Background.RESET + "|" for g in glyphs]
+        self._tile_renderer = TileRenderer(np.stack(sprites), (self.H, self.W))
+
+    def _render_tile_ids(self) -> np.ndarray:
+        # an arrow hides the landmark below it
+        layer1, layer2 = self.state[:, :, 0], self.state[:, :, 1]
+        return np.where(layer2 > 0, layer2, layer1)
+
+    def _render_ansi(self) -> str:
+        if self._glyphs is None:
+            self._build_render_tables()
+        glyphs = self._glyphs
+        row_end = Background.RESET + "\n" + "-"*self.W*2 + "\n"
+        rows = [">>>>>> STEP %i <<<<<<\n"%(self.step_counter)]
+        for row in self._render_tile_ids().tolist():
+            rows.append("|" + "".join([glyphs[m] for m in row]) + row_end)
+        return "".join(rows)
+
+    def _render_rgb(self) -> np.ndarray:
+        if self._glyphs is None:
+            self._build_render_tables()
+        return self._tile_renderer(self._render_tile_ids())
+
     def close(self):
         pass
     
@@ -208,6 +358,9 @@ class MoveArrowEnv(gym.Env):
         self.state[:, :, 1] = layer2
 
     def _is_done(self):
+        if self._kernels is not None:
+            return self._kernels.arrows_on_goals(self._pos, self._order, self._goal_of)
+
         # get layers
         layer1 = self.state[:, :, 0]
 
@@ -229,6 +382,17 @@ class MoveArrowEnv(gym.Env):
                 return False  
         return True
 
+    def _is_dead(self):
+        # O(num_arrows) lookups in the live table
+        if self._live is None:
+            self._live = live_states(self.env_config)
+        if self._kernels is not None:
+            return self._kernels.arrows_dead(self._pos, self._dirs, self._order, self._live)
+        for arrow_idx, (arrow_dir, (i, j)) in self.arrows.items():
+            if not self._live[arrow_idx, i, j, arrow_dir]:
+                return True
+        return False
+
     def _get_next_pos(self, cur_pos: tuple, move_dir: int):
         assert move_dir in DIRECTIONS, f"invalid direction: {move_dir}!"
 
@@ -241,6 +405,32 @@ class MoveArrowEnv(gym.Env):
 
         return next_pos, is_valid
 
+    def _init_kernel_arrays(self):
+        # arrays stepped by the kernels, which then hold the arrows (int8: maps up to 127 cells per side):
+        # arrow positions/directions, dict order, direction signs, goal arrow (+1) per cell and the 2nd layer
+        if self._kernels is None:
+            return
+        num_arrows = len(self.arrows)
+        self._pos = np.zeros((num_arrows, 2), dtype=np.int8)
+        self._dirs = np.zeros(num_arrows, dtype=np.int8)
+        for idx, (arrow_dir, (i, j)) in self.arrows.items():
+            self._pos[idx] = (i, j)
+            self._dirs[idx] = arrow_dir
+        self._order = np.array(list(self.arrows.keys()), dtype=np.int8)
+        layer1 = self.state[:, :, 0]
+        self._signs = np.where((layer1 > 0) & (layer1 < 5), layer1, 0).astype(np.int8)
+        is_goal = (layer1 >= 5) & ((layer1 - 5) % ARROW_FEATURE_NUM == GOAL)
+        self._goal_of = np.where(is_goal, (layer1 - 5) // ARROW_FEATURE_NUM + 1, 0).astype(np.int8)
+        self._layer2 = self.state[:, :, 1].astype(np.int8)
+
+    def _push(self, arrow_idx: int):
+        if self._kernels is None:
+            self._move(arrow_idx, self.arrows[arrow_idx][0])
+            return
+        self._kernels.arrow_push(arrow_idx, self._pos, self._dirs, KERNEL_DELTAS, self._signs, self._layer2, self._order)
+        self.state[:, :, 1] = self._layer2
+        self._arrows_stale = True
+
     def _move(self, arrow_idx: int, move_dir: int):
 
         # get arrow direction and current position
@@ -2,26 +2,53 @@ import gym
 from gym import spaces
 
 import numpy as np
+from functools import lru_cache
 
 from amusepark.configs.machinarium_configs import *
-from amusepark.utils.text_attr import Background
+from amusepark.utils.text_attr import Background, write_frame
+from amusepark.utils.render import TileRenderer, sprite, code2rgb
+from amusepark.utils.validation import make_action_checker
+from amusepark.utils.observation import ObservationEmitter
+from amusepark import kernels
+
+### render tables ###
+# {obstacle, empty, traversed, start}
+CELL_COLORS = [Background.RED, Background.LIGHT_GRAY, Background.GREEN, Background.BLUE]
+CUR_COLOR = Background.BROWN
+_ANSI_GLYPHS = [c + " " + Background.RESET + "|" for c in CELL_COLORS]
+_CUR_GLYPH = CUR_COLOR + " " + Background.RESET + "|"
+_UNKNOWN_GLYPH = " " + Background.RESET + "|"
+_ROW_END = Background.RESET + "\n" + "-"*W*2 + "\n"
+
+@lru_cache(maxsize=None)
+def _sprites() -> np.ndarray:
+    # {obstacle, empty, traversed, start, current position}
+    return np.stack([sprite(code2rgb(c)) for c in CELL_COLORS + [CUR_COLOR]])
 
 class TraverseMazeEnv(gym.Env):
-    """A mini-puzzle in the greenhouse of the game Machinarium"""
-    metadata = {'render.modes': ['terminal']}
+    """A mini-puzzle in the greenhouse of the game Machinarium
 
-    def __init__(self, maze_idx: int=-1):
+    - obs_mode: 'view' (internal maze), 'copy' or 'int8' (int8 buffer, see ObservationEmitter and set_obs_buffer)
+    """
+    metadata = {'render.modes': ['terminal', 'ansi', 'rgb_array']}
+    # methods timed by amusepark.wrappers.ProfileWrapper
+    profile_phases = {'dynamics': ['_slide'], 'done': ['_get_valid_directions']}
+
+    def __init__(self, maze_idx: int=-1, trusted_actions: bool=False, obs_mode: str='view'):
         super(TraverseMazeEnv, self).__init__()
 
         self.maze_idx = maze_idx
 
         # observation/state space
         #   {-1: obstacle; 0: empty; 1: traversed; 2: start}
-        self.observation_space = spaces.Box(low=-1, high=2, shape=(H, W), dtype=int)
+        self._obs = ObservationEmitter((H, W), obs_mode)
+        self.observation_space = spaces.Box(low=-1, high=2, shape=(H, W), dtype=self._obs.dtype)
 
         # action space
         #   {UP: 0; RIGHT: 1; DOWN: 2; LEFT: 3}
         self.action_space = spaces.Discrete(4)
+        # action check (skipped if the caller guarantees valid actions)
+        self._valid_action = make_action_checker(self.action_space, trusted_actions)
 
         # init the maze & current position
         self.maze = np.zeros((H, W), dtype=int)
@@ -31,22 +58,31 @@ class TraverseMazeEnv(gym.Env):
         # init step counter
         self.step_counter = 0
 
-    def reset(self):
+        # rgb_array frames (built at the first call)
+        self._tile_renderer = None
+
+        # compiled step kernels (None: numba unavailable) and the int8 maze they step
+        self._kernels = kernels.env_kernels()
+        self._maze = self.maze.astype(np.int8)
+
+    def reset(self, seed: int=None):
+        # seed the env's own random generator
+        super(TraverseMazeEnv, self).reset(seed=seed)
+
         # init the maze & current position
         self.maze, self.cur_pos = self.__load_maze()
+        self._maze = self.maze.astype(np.int8)
 
         # init step counter
         self.step_counter = 0
 
-        return self.maze
+        return self._obs(self.maze)
 
     def step(self, action):
-        assert self.action_space.contains(action)
+        assert self._valid_action(action), f"Invalid action: {action}!"
 
         # move in the direction until blocked
-        is_valid = True
-        while is_valid:
-            is_valid = self.__move2next(action)
+        self._slide(action)
 
         # get valid moving directions from the new position
         valid_directions = self._get_valid_directions()
@@ -68,37 +104,49 @@ class TraverseMazeEnv(gym.Env):
         # step counter
         self.step_counter += 1
 
-        return self.maze, reward, done, info
+        return self._obs(self.maze), reward, done, info
+
+    def _slide(self, action: int):
+        if self._kernels is not None:
+            di, dj = DIRECTIONS[action]
+            self.cur_pos = self._kernels.maze_slide(self._maze, self.cur_pos[0], self.cur_pos[1], di, dj)
+            self.maze[...] = self._maze
+            return
+        is_valid = True
+        while is_valid:
+            is_valid = self.__move2next(action)
+
+    def set_obs_buffer(self, out: np.ndarray=None):
+        """ int8 mode: write the next observations into `out` """
+        self._obs.set_buffer(out)
 
     def render(self, mode='terminal'):
-        if mode != 'terminal':
+        if mode == 'terminal':
+            write_frame(self._render_ansi())
+        elif mode == 'ansi':
+            return self._render_ansi()
+        elif mode == 'rgb_array':
+            return self._render_rgb()
+        else:
             raise NotImplementedError
 
-        print(">>>>>> STEP %i <<<<<<"%(self.step_counter))
-
-        for i in range(H):
-            for j in range(W):
-                cell = self.maze[i, j]
-                if (i, j) == self.cur_pos: 
-                    # current position
-                    print(Background.BROWN + " ", end="")
-                elif cell == -1: 
-                    # obstacle
-                    print(Background.RED + " ", end="")
-                elif cell == 0: 
-                    # empty
-                    print(Background.LIGHT_GRAY + " ", end="")
-                elif cell == 1: 
-                    # traversed
-                    print(Background.GREEN + " ", end="")
-                elif cell == 2: 
-                    # start
-                    print(Background.BLUE + " ", end="")
-                else: 
-                    # unknown
-                    print(" ", end="")
-                print(Background.RESET, end="|")
-            print(Background.RESET + "\n" + "-"*W*2)
+    def _render_ansi(self) -> str:
+        # per-cell glyphs indexed by cell value + 1 (obstacle, empty, traversed, start)
+        glyphs = _ANSI_GLYPHS
+        rows = [">>>>>> STEP %i <<<<<<\n"%(self.step_counter)]
+        for i, row in enumerate(self.maze.tolist()):
+            cells = [glyphs[v + 1] if -1 <= v <= 2 else _UNKNOWN_GLYPH for v in row]
+            if i == self.cur_pos[0]:
+                cells[self.cur_pos[1]] = _CUR_GLYPH
+            rows.append("".join(cells) + _ROW_END)
+        return "".join(rows)
+
+    def _render_rgb(self) -> np.ndarray:
+        if self._tile_renderer is None:
+            self._tile_renderer = TileRenderer(_sprites(), (H, W))
+        tile_ids = self.maze + 1
+        tile_ids[self.cur_pos] = 4
+        return self._tile_renderer(tile_ids)
 
     def close(self):
         pass
@@ -120,10 +168,10 @@ class TraverseMazeEnv(gym.Env):
 
         # get the maze configuration
         if not (0 <= self.maze_idx < num): # randomly sample a maze
-            maze_idx = np.random.randint(num)
+            maze_idx = int(self.np_random.integers(num))
         else: # always pick the selected one
             maze_idx = self.maze_idx
-        maze = MAZES[maze_idx]
+        maze = MAZES[maze_idx].copy()
 
         # get the start
         assert 2 in maze, f"maze {maze_idx} has no starting position!"
@@ -3,21 +3,19 @@ from gym import spaces
 
 import os
 import numpy as np
+from functools import lru_cache
 
-from amusepark.utils.text_attr import Background
+from amusepark.utils.text_attr import Background, write_frame
+from amusepark.utils.render import TileRenderer, sprite, code2rgb, text_mask
+from amusepark.utils.validation import make_action_checker
+from amusepark.utils.observation import ObservationEmitter
+from amusepark import kernels
+from amusepark.utils.path import data_path
+from amusepark.games.wordle import load_words, load_vocabulary, hard_mode_index, pattern_table, pattern_colors, encode_words, letter_counts, guess_feedback, feedback, pattern_ids, COMPACT_DTYPE
 
 GUESS_NUM = 6
-
-def load_words(filename: str) -> list:
-
-    if not os.path.isfile(filename):
-        print("Word file unfound! Use default!")
-        return ['default']
-
-    with open(filename, 'r') as f:
-        lines = f.readlines()
-    words = [l.strip('\n') for l in lines]
-    return words
+ACTION_MODES = ('letters', 'word')
+OBS_FORMATS = ('dict', 'compact')
 
 def compare_words(word1: str, word2: str) -> np.ndarray:
     assert len(word1) == len(word2), "length not equal"
@@ -51,12 +49,49 @@ def compare_words(word1: str, word2: str) -> np.ndarray:
         
     return color
 
+### render tables ###
+# {not guessed, gray, orange, green}
+COLORS = [Background.BLACK, Background.LIGHT_GRAY, Background.BROWN, Background.GREEN]
 
-class WordleEnv(gym.Env):
-    """Custom Environment that follows gym interface"""
-    metadata = {'render.modes': ['human']}
+@lru_cache(maxsize=None)
+def _ansi_glyphs() -> list:
+    # [color + 1][letter + 1] (a not guessed letter is drawn as '`', i.e. chr(-1 + 97))
+    return [[c + chr(v + 97) for v in range(-1, 26)] for c in COLORS]
 
-    def __init__(self, word_filename: str, guess_num: int=6):
+@lru_cache(maxsize=None)
+def _sprites() -> np.ndarray:
+    # (color + 1) * 27 + (letter + 1)
+    white = code2rgb(Background.LIGHT_WHITE)
+    return np.stack([
+        sprite(code2rgb(c), white, text_mask(chr(v + 97)) if v >= 0 else None)
+        for c in COLORS for v in range(-1, 26)
+    ])
+
+class WordleEnv(gym.Env):
+    """Custom Environment that follows gym interface
+
+    - obs_mode: 'view' (internal arrays), 'copy' or 'int8' (int8 buffers, see ObservationEmitter and set_obs_buffer)
+    - action_mode: 'letters' (MultiDiscrete([26] * word_len) letter codes) or 'word' (Discrete(len(self.vocab)) ids
+      of self.vocab.words, scored by pattern table lookups)
+    - hard_mode: guesses must be words of the vocabulary that use every revealed hint. An illegal guess ends the
+      episode with reward -1; info['action_mask'] and action_mask() give the legal words.
+    - adversarial: Absurdle-style, no fixed hidden word. Each guess gets the feedback pattern shared by the most
+      remaining candidate words (ties: the lowest pattern id), and the candidates narrow to that pattern; the game is
+      won once the guess is the only candidate left. info['candidates'] is the number of candidates left and
+      info['hidden_word'] one of them.
+    - obs_format: 'dict' (the 'color' and 'guess' arrays) or 'compact' ((guess_num, 2) int16 rows [word id of
+      self.vocab, pattern id], -1 while not guessed; see compact_obs/expand_obs of games/wordle.py). The compact
+      format needs every guess to be a word of the vocabulary (word action mode or hard mode).
+    The vocabulary (self.vocab, loaded in the word or hard mode) is the hidden words followed by the allowed guesses
+    of guess_filename (by default data/wordle-allowed-guesses.txt).
+    """
+    metadata = {'render.modes': ['human', 'ansi', 'rgb_array']}
+    # methods timed by amusepark.wrappers.ProfileWrapper
+    profile_phases = {'dynamics': ['_score'], 'done': ['_is_done'], 'validation': ['_is_legal']}
+
+    def __init__(self, word_filename: str, guess_num: int=6, trusted_actions: bool=False, obs_mode: str='view',
+                 hard_mode: bool=False, guess_filename: str=None, action_mode: str='letters', adversarial: bool=False,
+                 obs_format: str='dict'):
         super(WordleEnv, self).__init__()
 
         self.guess_num = guess_num
@@ -65,19 +100,55 @@ class WordleEnv(gym.Env):
         self.__word_pool = load_words(word_filename)
 
         # init hidden target word
-        self.hidden_word = np.random.choice(self.__word_pool)
+        self.hidden_word = self.np_random.choice(self.__word_pool)
         self.word_len = len(self.hidden_word)
         
-        # action space \in {A, B, ..., Z}^self.word_len
-        self.action_space = spaces.MultiDiscrete([26] * self.word_len) # ndarray of size (self.word_len, )
+        # vocabulary (word mode or hard mode)
+        assert action_mode in ACTION_MODES, f"Invalid action mode: {action_mode}!"
+        self.action_mode = action_mode
+        self.hard_mode = hard_mode
+        self.adversarial = adversarial
+        assert obs_format in OBS_FORMATS, f"Invalid observation format: {obs_format}!"
+        self.obs_format = obs_format
+        self.vocab = None
+        if self.action_mode == 'word' or self.hard_mode or self.adversarial or self.obs_format == 'compact':
+            if guess_filename is None:
+                guess_filename = os.path.join(data_path, 'wordle-allowed-guesses.txt')
+            self.vocab = load_vocabulary(word_filename, guess_filename)
+
+        if self.action_mode == 'word':
+            # action space \in {0, 1, ..., len(self.vocab)-1}
+            self.action_space = spaces.Discrete(len(self.vocab))
+            # pattern ids of every word against the hidden word, and pattern id -> colors
+            self._patterns = pattern_table(self.vocab)
+            self._pattern_colors = pattern_colors(self.word_len)
+            self.hidden_id = self.vocab.index[self.hidden_word]
+            self._pattern_row = self._patterns.row(self.hidden_id)
+        else:
+            # action space \in {A, B, ..., Z}^self.word_len
+            self.action_space = spaces.MultiDiscrete([26] * self.word_len) # ndarray of size (self.word_len, )
+        # action check (skipped if the caller guarantees valid actions)
+        self._valid_action = make_action_checker(self.action_space, trusted_actions)
 
         # observation/state space 
         #   color: {not guessed: -1, gray: 0, orange: 1, green: 2}
         #   guess: {not guessed: -1, A: 0, B: 1, ..., Z: 25}
+        self._color_obs = ObservationEmitter((self.guess_num, self.word_len), obs_mode)
+        self._guess_obs = ObservationEmitter((self.guess_num, self.word_len), obs_mode)
         self.observation_space = spaces.Dict({
-            'color': spaces.Box(low=-1, high=2, shape=(self.guess_num, self.word_len), dtype=int),
-            'guess': spaces.Box(low=-1, high=25, shape=(self.guess_num, self.word_len), dtype=int)
+            'color': spaces.Box(low=-1, high=2, shape=(self.guess_num, self.word_len), dtype=self._color_obs.dtype),
+            'guess': spaces.Box(low=-1, high=25, shape=(self.guess_num, self.word_len), dtype=self._guess_obs.dtype)
         })
+        if self.obs_format == 'compact':
+            assert self.action_mode == 'word' or self.hard_mode, "The compact observations need word actions or the hard mode!"
+            assert obs_mode != 'int8', "The compact observations are int16!"
+            high = max(len(self.vocab), 3 ** self.word_len) - 1
+            assert high <= np.iinfo(COMPACT_DTYPE).max, "Vocabulary too large for the compact observations!"
+            # [word id, pattern id] per guess row
+            self.compact = -np.ones((self.guess_num, 2), dtype=COMPACT_DTYPE)
+            self._compact_obs = ObservationEmitter((self.guess_num, 2), obs_mode)
+            self._pattern_weights = 3 ** np.arange(self.word_len)
+            self.observation_space = spaces.Box(low=-1, high=high, shape=(self.guess_num, 2), dtype=COMPACT_DTYPE)
 
         # init state
         self.color = -np.ones((self.guess_num, self.word_len), dtype=int)
@@ -86,30 +157,117 @@ class WordleEnv(gym.Env):
         # init guess counter
         self.guess_counter = 0
 
+        # hard mode: bitset of the legal words, narrowed by each scored guess
+        if self.hard_mode:
+            self._hard_index = hard_mode_index(self.vocab)
+            self._legal = self._hard_index.all
+
+        # compiled step kernels (None: numba unavailable): letters mode scoring on letter codes
+        self._kernels = kernels.env_kernels()
+        self._hidden_codes = encode_words([self.hidden_word])[0]
+        self._color_buf = np.zeros(self.word_len, dtype=np.int8)
+        self._letter_buf = np.zeros(self.word_len, dtype=np.int8)
+
+        # adversarial mode: ids of the hidden words consistent with the feedback so far
+        if self.adversarial:
+            self._patterns = pattern_table(self.vocab)
+            self._pattern_colors = pattern_colors(self.word_len)
+            self._candidates = self.vocab.hidden_ids()
+
+        # rgb_array frames (built at the first call)
+        self._tile_renderer = None
+
+    def _get_obs(self):
+        if self.obs_format == 'compact':
+            return self._compact_obs(self.compact)
+        return {'color': self._color_obs(self.color), 'guess': self._guess_obs(self.guess)}
+
+    def set_obs_buffer(self, out: dict=None):
+        """ int8 mode: write the next observations into out['color'] and out['guess'] """
+        out = dict() if out is None else out
+        self._color_obs.set_buffer(out.get('color'))
+        self._guess_obs.set_buffer(out.get('guess'))
+
     def _array2str(self, action: np.ndarray) -> str:
         return ''.join([chr(v + 97) for v in action])
     
     def _str2array(self, word: str) -> np.ndarray:
         return np.array([ord(c) - 97 for c in word], dtype=int)
 
+    def _is_legal(self, word) -> bool:
+        # word: the guessed string (letters mode) or word id (word mode)
+        word_id = word if self.action_mode == 'word' else self.vocab.index.get(word)
+        return word_id is not None and (self._legal >> word_id) & 1 == 1
+
+    def action_mask(self) -> np.ndarray:
+        """ hard mode: bool mask over self.vocab.words of the guesses that are legal now """
+        assert self.hard_mode, "The action mask is only provided in the hard mode!"
+        return self._hard_index.mask(self._legal)
+
+    def _score(self, word, letters: np.ndarray) -> np.ndarray:
+        if self.adversarial:
+            return self._adversary(word, letters)
+        if self.action_mode == 'word':
+            return self._pattern_colors[self._pattern_row[word]]
+        if self._kernels is not None:
+            self._letter_buf[:] = letters
+            return self._kernels.feedback_into(self._letter_buf, self._hidden_codes, self._color_buf)
+        return compare_words(word, self.hidden_word)
+
+    def _adversary(self, word, letters: np.ndarray) -> np.ndarray:
+        # partition the candidates by the pattern of the guess (one bincount) and keep the largest part
+        word_id = word if self.action_mode == 'word' else self.vocab.index.get(word)
+        if word_id is not None:
+            pids = self._patterns.guess_row(word_id)[self._candidates]
+        else:
+            pids = pattern_ids(feedback(letters, self.vocab.encoded[self._candidates]))
+        pattern = int(np.argmax(np.bincount(pids, minlength=len(self._pattern_colors))))
+        self._candidates = self._candidates[pids == pattern]
+        self.hidden_word = self.vocab.words[self._candidates[0]]
+        return self._pattern_colors[pattern]
+
+    def _is_done(self, solved: bool) -> bool:
+        return (self.guess_counter >= self.guess_num-1) or solved
+
     def step(self, action):
-        assert self.action_space.contains(action)
+        assert self._valid_action(action), f"Invalid action: {action}!"
 
-        action_str = self._array2str(action)
+        # word: the word id (word mode) or the guessed string (letters mode)
+        if self.action_mode == 'word':
+            word = int(action)
+            solved = word == self.hidden_id
+            letters = self.vocab.encoded[word]
+        else:
+            word = self._array2str(action)
+            solved = word == self.hidden_word
+            letters = action
+
+        # hard mode: an illegal guess is not played and ends the episode
+        if self.hard_mode and not self._is_legal(word):
+            info = {'hidden_word': self.hidden_word, 'illegal_guess': True, 'action_mask': self.action_mask()}
+            return self._get_obs(), -1, True, info
+
+        # state (adversarial mode: the feedback decides whether the guess solves the game)
+        self.color[self.guess_counter, :] = self._score(word, letters)
+        if self.adversarial:
+            solved = len(self._candidates) == 1 and (self.color[self.guess_counter] == 2).all()
 
         # done
-        done = False
-        if (self.guess_counter >= self.guess_num-1) or (action_str == self.hidden_word):
-            done = True
+        done = self._is_done(solved)
 
-        # state
-        self.color[self.guess_counter, :] = compare_words(action_str, self.hidden_word)
-        self.guess[self.guess_counter, :] = action
-        observation = {'color': self.color, 'guess': self.guess}
+        self.guess[self.guess_counter, :] = letters
+        if self.obs_format == 'compact':
+            if self.action_mode == 'word' and not self.adversarial:
+                self.compact[self.guess_counter, 0] = word
+                self.compact[self.guess_counter, 1] = self._pattern_row[word]
+            else:
+                self.compact[self.guess_counter, 0] = word if self.action_mode == 'word' else self.vocab.index[word]
+                self.compact[self.guess_counter, 1] = self.color[self.guess_counter] @ self._pattern_weights
+        observation = self._get_obs()
 
         # reward
         if done:
-            if action_str == self.hidden_word:
+            if solved:
                 reward = self.guess_num - self.guess_counter
             else:
                 reward = -1
@@ -118,45 +276,240 @@ class WordleEnv(gym.Env):
 
         # info
         info = {'hidden_word': self.hidden_word}
+        if self.adversarial:
+            info['candidates'] = len(self._candidates)
+        if self.hard_mode:
+            self._legal = self._hard_index.update(
+                self._legal, self.guess[self.guess_counter].tolist(), self.color[self.guess_counter].tolist()
+            )
+            info['action_mask'] = self.action_mask()
 
         # guess counter
         self.guess_counter += 1
 
         return observation, reward, done, info
     
-    def reset(self):
+    def reset(self, seed: int=None, options: dict=None):
+        # seed the env's own random generator
+        super(WordleEnv, self).reset(seed=seed)
 
         # init state
         self.color = -np.ones((self.guess_num, self.word_len), dtype=int)
         self.guess = -np.ones((self.guess_num, self.word_len), dtype=int)
+        if self.obs_format == 'compact':
+            self.compact = -np.ones((self.guess_num, 2), dtype=COMPACT_DTYPE)
 
-        obs = {'color': self.color, 'guess': self.guess}
+        obs = self._get_obs()
 
-        # init hidden target word
-        self.hidden_word = np.random.choice(self.__word_pool)
+        # init hidden target word (options={'hidden_word': word} picks it, e.g. to evaluate a policy on every word)
+        if options is not None and options.get('hidden_word') is not None:
+            self.hidden_word = options['hidden_word']
+        else:
+            self.hidden_word = self.np_random.choice(self.__word_pool)
         self.word_len = len(self.hidden_word)
+        if self._kernels is not None:
+            self._hidden_codes = encode_words([self.hidden_word])[0]
 
         # init guess counter
         self.guess_counter = 0
 
+        if self.action_mode == 'word':
+            self.hidden_id = self.vocab.index[self.hidden_word]
+            self._pattern_row = self._patterns.row(self.hidden_id)
+        if self.hard_mode:
+            self._legal = self._hard_index.all
+        if self.adversarial:
+            self._candidates = self.vocab.hidden_ids()
+
         return obs
     
     def render(self, mode='human'):
-        if mode != 'human':
+        if mode == 'human':
+            write_frame(self._render_ansi())
+        elif mode == 'ansi':
+            return self._render_ansi()
+        elif mode == 'rgb_array':
+            return self._render_rgb()
+        else:
             raise NotImplementedError
-        
-        print(">>>>>> GUESS %i <<<<<<"%(self.guess_counter))
-        for i in range(self.guess_num):
-            word = self._array2str(self.guess[i, ])
-            color = self.color[i, :]
-            for (w, c) in zip(word, color):
-                if c == 2: prefix = Background.GREEN
-                elif c == 1: prefix = Background.BROWN
-                elif c == 0: prefix = Background.LIGHT_GRAY
-                else: prefix = Background.BLACK
-                print(prefix + w, end="")
-            print(Background.RESET)
-        
+
+    def _render_ansi(self) -> str:
+        # glyphs[color + 1][letter + 1]
+        glyphs = _ansi_glyphs()
+        rows = [">>>>>> GUESS %i <<<<<<\n"%(self.guess_counter)]
+        for word, color in zip(self.guess.tolist(), self.color.tolist()):
+            rows.append("".join([glyphs[c + 1][w + 1] for (w, c) in zip(word, color)]) + Background.RESET + "\n")
+        return "".join(rows)
+
+    def _render_rgb(self) -> np.ndarray:
+        if self._tile_renderer is None:
+            self._tile_renderer = TileRenderer(_sprites(), (self.guess_num, self.word_len))
+        return self._tile_renderer((self.color + 1) * 27 + (self.guess + 1))
+
+    def close(self):
+        pass
+
+class MultiWordleEnv(gym.Env):
+    """ Multi-board Wordle (Quordle: 4 boards, Octordle: 8 boards)
+
+    Every guess is scored against the hidden words of all the unsolved boards at once; a solved board freezes.
+    - Observation: 'color' and 'guess' of (boards, guess_num, word_len), as in WordleEnv per board (rows stay -1 on a
+      board after it is solved).
+    - action_mode: 'letters' (MultiDiscrete([26] * word_len)) or 'word' (Discrete(len(self.vocab)) word ids)
+    - Reward: guess_num - guesses used + 1 once every board is solved; -1 if guesses run out (0 otherwise).
+    Guesses of the vocabulary are scored by one gather of the shared pattern table (see games/wordle.py); other
+    letter strings by one vectorized feedback over the boards.
+    """
+    metadata = {'render.modes': ['human', 'ansi', 'rgb_array']}
+    # methods timed by amusepark.wrappers.ProfileWrapper
+    profile_phases = {'dynamics': ['_score']}
+
+    def __init__(self, word_filename: str, boards: int=4, guess_num: int=None, trusted_actions: bool=False,
+                 obs_mode: str='view', guess_filename: str=None, action_mode: str='letters'):
+        super(MultiWordleEnv, self).__init__()
+
+        # Quordle: 9 guesses for 4 boards, Octordle: 13 for 8
+        self.boards = boards
+        self.guess_num = boards + 5 if guess_num is None else guess_num
+
+        # vocabulary: the hidden words followed by the allowed guesses
+        if guess_filename is None:
+            guess_filename = os.path.join(data_path, 'wordle-allowed-guesses.txt')
+        self.vocab = load_vocabulary(word_filename, guess_filename)
+        assert boards <= self.vocab.hidden_num, f"Too many boards: {boards}!"
+        self.word_len = self.vocab.word_len
+        self._patterns = pattern_table(self.vocab)
+        self._pattern_colors = pattern_colors(self.word_len)
+
+        # action space
+        assert action_mode in ACTION_MODES, f"Invalid action mode: {action_mode}!"
+        self.action_mode = action_mode
+        if self.action_mode == 'word':
+            self.action_space = spaces.Discrete(len(self.vocab))
+        else:
+            self.action_space = spaces.MultiDiscrete([26] * self.word_len)
+        self._valid_action = make_action_checker(self.action_space, trusted_actions)
+
+        # observation/state space (per board as in WordleEnv)
+        shape = (self.boards, self.guess_num, self.word_len)
+        self._color_obs = ObservationEmitter(shape, obs_mode)
+        self._guess_obs = ObservationEmitter(shape, obs_mode)
+        self.observation_space = spaces.Dict({
+            'color': spaces.Box(low=-1, high=2, shape=shape, dtype=self._color_obs.dtype),
+            'guess': spaces.Box(low=-1, high=25, shape=shape, dtype=self._guess_obs.dtype)
+        })
+
+        self._init_state(self.np_random.choice(self.vocab.hidden_num, self.boards, replace=False))
+
+        # rgb_array frames (built at the first call)
+        self._tile_renderer = None
+
+    def _init_state(self, hidden_ids: np.ndarray):
+        self.color = -np.ones((self.boards, self.guess_num, self.word_len), dtype=int)
+        self.guess = -np.ones((self.boards, self.guess_num, self.word_len), dtype=int)
+        self.guess_counter = 0
+        self.hidden_ids = np.asarray(hidden_ids, dtype=np.int64)
+        self.hidden_words = [self.vocab.words[i] for i in self.hidden_ids]
+        self.solved = np.zeros(self.boards, dtype=bool)
+        # the unsolved boards, and the pattern rows of their hidden words
+        self._active = slice(None)
+        self._unsolved = set(self.hidden_ids.tolist())
+        self._rows = np.stack([self._patterns.row(i) for i in self.hidden_ids])
+        self._answers = self.vocab.encoded[self.hidden_ids]
+        self._counts = letter_counts(self._answers)
+
+    def _get_obs(self) -> dict:
+        return {'color': self._color_obs(self.color), 'guess': self._guess_obs(self.guess)}
+
+    def set_obs_buffer(self, out: dict=None):
+        """ int8 mode: write the next observations into out['color'] and out['guess'] """
+        out = dict() if out is None else out
+        self._color_obs.set_buffer(out.get('color'))
+        self._guess_obs.set_buffer(out.get('guess'))
+
+    def _score(self, word_id: int, letters: np.ndarray) -> np.ndarray:
+        # colors of the guess on the unsolved boards
+        active = self._active
+        if word_id is not None:
+            return self._pattern_colors[self._rows[active, word_id]]
+        return guess_feedback(letters, self._answers[active], self._counts[active])
+
+    def step(self, action):
+        assert self._valid_action(action), f"Invalid action: {action}!"
+
+        if self.action_mode == 'word':
+            word_id = int(action)
+            letters = self.vocab.encoded[word_id]
+        else:
+            letters = np.asarray(action)
+            word_id = self.vocab.index.get(''.join([chr(v + 97) for v in letters]))
+
+        # score the unsolved boards only (a slice while no board is solved: basic indexing is cheaper)
+        active = self._active
+        self.color[active, self.guess_counter] = self._score(word_id, letters)
+        self.guess[active, self.guess_counter] = letters
+        all_solved = False
+        if word_id in self._unsolved:
+            self._unsolved.discard(word_id)
+            self.solved |= self.hidden_ids == word_id
+            self._active = np.flatnonzero(~self.solved)
+            all_solved = len(self._unsolved) == 0
+        observation = self._get_obs()
+
+        # done and reward
+        done = all_solved or self.guess_counter >= self.guess_num - 1
+        if done:
+            reward = self.guess_num - self.guess_counter if all_solved else -1
+        else:
+            reward = 0
+
+        self.guess_counter += 1
+        info = {'hidden_words': self.hidden_words, 'solved': self.solved.copy()}
+        return observation, reward, done, info
+
+    def reset(self, seed: int=None, options: dict=None):
+        # seed the env's own random generator
+        super(MultiWordleEnv, self).reset(seed=seed)
+
+        # hidden words (options={'hidden_words': [...]} picks them)
+        if options is not None and options.get('hidden_words') is not None:
+            hidden_ids = [self.vocab.index[w] for w in options['hidden_words']]
+            assert len(hidden_ids) == self.boards, f"Expected {self.boards} hidden words!"
+            assert all(i < self.vocab.hidden_num for i in hidden_ids), "Hidden words must be in the word list!"
+        else:
+            hidden_ids = self.np_random.choice(self.vocab.hidden_num, self.boards, replace=False)
+        self._init_state(hidden_ids)
+        return self._get_obs()
+
+    def render(self, mode='human'):
+        if mode == 'human':
+            write_frame(self._render_ansi())
+        elif mode == 'ansi':
+            return self._render_ansi()
+        elif mode == 'rgb_array':
+            return self._render_rgb()
+        else:
+            raise NotImplementedError
+
+    def _render_ansi(self) -> str:
+        # boards side by side; glyphs[color + 1][letter + 1]
+        glyphs = _ansi_glyphs()
+        rows = [">>>>>> GUESS %i, SOLVED %i/%i <<<<<<\n" % (self.guess_counter, self.solved.sum(), self.boards)]
+        for t in range(self.guess_num):
+            boards = [
+                "".join([glyphs[c + 1][w + 1] for (w, c) in zip(self.guess[b, t].tolist(), self.color[b, t].tolist())]) + Background.RESET
+                for b in range(self.boards)
+            ]
+            rows.append(" ".join(boards) + "\n")
+        return "".join(rows)
+
+    def _render_rgb(self) -> np.ndarray:
+        # boards side by side
+        if self._tile_renderer is None:
+            self._tile_renderer = TileRenderer(_sprites(), (self.guess_num, self.boards * self.word_len))
+        tiles = (self.color + 1) * 27 + (self.guess + 1)
+        return self._tile_renderer(tiles.transpose(1, 0, 2).reshape(self.guess_num, -1))
+
     def close(self):
         pass
 
@@ -170,3 +523,12 @@ if __name__ == '__main__':
         obs, r, done, info = env.step(act)
         env.render()
         print(r, done, info)
+
+    # Quordle: random guesses of the vocabulary
+    env = MultiWordleEnv(os.path.join(data_path, 'wordle-hidden.txt'), boards=4, action_mode='word')
+    obs = env.reset()
+    done = False
+    while not done:
+        obs, r, done, info = env.step(env.action_space.sample())
+    env.render()
+    print(r, done, info)
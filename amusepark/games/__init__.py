@@ -1 +1,30 @@
-from amusepark.games.puzzle import APuzzleADay, Calendar, Board, Piece
\ No newline at end of file
+import importlib
+
+# name -> module; imported on first access (so that `python -m amusepark.games.<module>` runs a fresh module)
+_GAMES = {
+    'APuzzleADay': 'amusepark.games.puzzle',
+    'Calendar': 'amusepark.games.puzzle',
+    'Board': 'amusepark.games.puzzle',
+    'Piece': 'amusepark.games.puzzle',
+    'GobbletState': 'amusepark.games.gobblet',
+    'Vocabulary': 'amusepark.games.wordle',
+    'HardModeIndex': 'amusepark.games.wordle',
+    'load_vocabulary': 'amusepark.games.wordle',
+    'hard_mode_index': 'amusepark.games.wordle',
+    'pattern_table': 'amusepark.games.wordle',
+    'guess_feedback': 'amusepark.games.wordle',
+    'compact_obs': 'amusepark.games.wordle',
+    'expand_obs': 'amusepark.games.wordle',
+}
+
+__all__ = list(_GAMES)
+
+def __getattr__(name: str):
+    if name in _GAMES:
+        attr = getattr(importlib.import_module(_GAMES[name]), name)
+        globals()[name] = attr
+        return attr
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(_GAMES))
@@ -0,0 +1,322 @@
+import numpy as np
+
+###### Rules of the simplified Gobblet of GobbletEnv, decoupled from gym ######
+## Cells are numbered 0 to 15 from left to right and top to bottom; pieces are 1 to 12 for either player and signed
+## on the board (1 to 12 for player 1, -1 to -12 for player 2). A move is (piece, cell). apply() plays a move in place
+## and returns an undo token; undo(token) takes it back, so that search agents never copy states.
+
+STATIC, DYNAMIC = 0, 1
+SIZE = 4
+CELLS = SIZE * SIZE
+
+# ranks of each piece (a higher can cover a lower; 1st: empty)
+P_RANKS = (0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 4, 4, 4)
+
+# lines checked after a move to a cell: its row and column, and both diagonals
+ROWS = tuple(tuple(range(i * SIZE, (i + 1) * SIZE)) for i in range(SIZE))
+COLS = tuple(tuple(range(j, CELLS, SIZE)) for j in range(SIZE))
+DIAGONALS = (tuple(range(0, CELLS, SIZE + 1)), tuple(range(SIZE - 1, CELLS - 1, SIZE - 1)))
+LINES = ROWS + COLS + DIAGONALS
+LINES_THROUGH = tuple((ROWS[c // SIZE], COLS[c % SIZE]) + DIAGONALS for c in range(CELLS))
+# [src + 1][dst]: the lines through the source (src = -1: from hand) and destination cells of a move
+LINES_OF_MOVE = tuple(
+    tuple(LINES_THROUGH[dst] + tuple(l for l in LINES_THROUGH[src] if l not in LINES_THROUGH[dst]) if src >= 0 else LINES_THROUGH[dst]
+          for dst in range(CELLS))
+    for src in range(-1, CELLS)
+)
+
+# outcome reasons
+ONGOING, WIN, NO_PIECE, NO_POSITION, PIECE_UNAVAILABLE, POSITION_UNAVAILABLE = range(6)
+
+class GobbletState:
+    r""" Mutable game state
+
+    mode  (int)   : STATIC (a placed piece can no longer move) or DYNAMIC (uncovered pieces can move)
+    stacks(list)  : per cell, the signed pieces from bottom to top
+    top   (list)  : per cell, the signed top piece (0: empty)
+    avail (dict)  : player -> availability of each piece (1st: dummy)
+    cell_of(list) : [signed piece + 12] -> cell of a piece on the board (-1: off the board)
+    player(int)   : who's turn: 1 for player 1; -1 for player 2
+    done, winner, reason: outcome of the last move (winner: 1, -1 or 0 while ongoing)
+    """
+    __slots__ = ('mode', 'stacks', 'top', 'avail', 'cell_of', 'player', 'done', 'winner', 'reason')
+
+    def __init__(self, mode: int=STATIC):
+        assert mode in (STATIC, DYNAMIC), f"Invalid mode: {mode}!"
+        self.mode = mode
+        self.stacks = [[] for _ in range(CELLS)]
+        self.top = [0] * CELLS
+        self.avail = {1: [False] + [True] * 12, -1: [False] + [True] * 12}
+        self.cell_of = [-1] * 25
+        self.player = 1
+        self.done, self.winner, self.reason = False, 0, ONGOING
+
+    def copy(self) -> 'GobbletState':
+        state = GobbletState.__new__(GobbletState)
+        state.mode = self.mode
+        state.stacks = [s.copy() for s in self.stacks]
+        state.top = self.top.copy()
+        state.avail = {1: self.avail[1].copy(), -1: self.avail[-1].copy()}
+        state.cell_of = self.cell_of.copy()
+        state.player = self.player
+        state.done, state.winner, state.reason = self.done, self.winner, self.reason
+        return state
+
+    def board(self) -> np.ndarray:
+        """ (4, 4) signed top pieces, the observation of GobbletEnv """
+        return np.array(self.top, dtype=int).reshape(SIZE, SIZE)
+
+    def key(self) -> tuple:
+        """ hashable position (e.g. for transposition tables) """
+        return (self.player, tuple(tuple(s) for s in self.stacks))
+
+###### int8 array form of the state, stepped by the compiled kernels (amusepark.kernels.step) ######
+## Ranks strictly increase up a stack, so a cell holds at most 4 pieces. The array form plays moves like
+## apply(..., finish_move=False) and finish(); it has no undo (search agents keep using GobbletState).
+
+RANKS_ARRAY = np.array(P_RANKS, dtype=np.int8)
+LINES_THROUGH_ARRAY = np.array(LINES_THROUGH, dtype=np.int8) # (16, 4, 4)
+
+class GobbletArrays:
+    r""" GobbletState as int8 arrays
+
+    stacks (16, 4) : per cell, the signed pieces from bottom to top (0 above the height)
+    heights(16,)   : per cell, the number of pieces
+    top    (16,)   : per cell, the signed top piece (0: empty)
+    avail  (2, 13) : availability of each piece (row 0: player 1, row 1: player 2, 1st column: dummy)
+    cell_of(25,)   : [signed piece + 12] -> cell of a piece on the board (-1: off the board)
+    mode, player, done, winner, reason: as in GobbletState
+    """
+    __slots__ = ('mode', 'stacks', 'heights', 'top', 'avail', 'cell_of', 'player', 'done', 'winner', 'reason')
+
+    def __init__(self, state: GobbletState):
+        self.mode = state.mode
+        self.stacks = np.zeros((CELLS, 4), dtype=np.int8)
+        self.heights = np.zeros(CELLS, dtype=np.int8)
+        for cell, stack in enumerate(state.stacks):
+            self.stacks[cell, :len(stack)] = stack
+            self.heights[cell] = len(stack)
+        self.top = np.array(state.top, dtype=np.int8)
+        self.avail = np.array([state.avail[1], state.avail[-1]], dtype=np.int8)
+        self.cell_of = np.array(state.cell_of, dtype=np.int8)
+        self.player = state.player
+        self.done, self.winner, self.reason = state.done, state.winner, state.reason
+
+    def to_state(self) -> GobbletState:
+        state = GobbletState.__new__(GobbletState)
+        state.mode = self.mode
+        state.stacks = [self.stacks[cell, :h].tolist() for cell, h in enumerate(self.heights.tolist())]
+        state.top = self.top.tolist()
+        state.avail = {1: (self.avail[0] > 0).tolist(), -1: (self.avail[1] > 0).tolist()}
+        state.cell_of = self.cell_of.tolist()
+        state.player = self.player
+        state.done, state.winner, state.reason = self.done, self.winner, self.reason
+        return state
+
+def apply_arrays(arrays: GobbletArrays, move: tuple, K) -> tuple:
+    r""" apply(..., finish_move=False) on the array form with the kernels K; returns the token of finish_arrays
+    (state, None, (piece, src, dst)) or (state, None, None) after an invalid move (already finished)
+    """
+    piece, dst = move
+    player = arrays.player
+    reason, src = K.gobblet_place(arrays.stacks, arrays.heights, arrays.top, arrays.avail, arrays.cell_of,
+                                  RANKS_ARRAY, player, piece, dst, arrays.mode == STATIC)
+    if reason != ONGOING: # invalid move: the other player wins
+        arrays.done, arrays.winner, arrays.reason, arrays.player = True, -player, reason, -player
+        return (arrays, None, None)
+    return (arrays, None, (piece, src, dst))
+
+def finish_arrays(token: tuple, K):
+    """ finish() of a move placed by apply_arrays """
+    arrays, _, move = token
+    if move is None:
+        return
+    reason, winner = K.gobblet_outcome(arrays.top, arrays.avail, RANKS_ARRAY, LINES_THROUGH_ARRAY,
+                                       arrays.player, move[1], move[2], arrays.mode == STATIC)
+    arrays.done, arrays.winner, arrays.reason = reason != ONGOING, winner, reason
+    arrays.player = -arrays.player
+
+def legal_moves(state: GobbletState) -> list:
+    """ (piece, cell) moves of the player to move that do not lose on the spot """
+    if state.done:
+        return []
+    top_ranks = [P_RANKS[abs(p)] for p in state.top]
+    avail = state.avail[state.player]
+    return [
+        (piece, cell)
+        for piece in range(1, 13) if avail[piece]
+        for cell in range(CELLS) if P_RANKS[piece] > top_ranks[cell]
+    ]
+
+def is_legal(state: GobbletState, move: tuple) -> bool:
+    piece, cell = move
+    return state.avail[state.player][piece] and P_RANKS[piece] > P_RANKS[abs(state.top[cell])]
+
+def apply(state: GobbletState, move: tuple, finish_move: bool=True) -> tuple:
+    r""" Play a move of the player to move and switch turns; returns the undo token
+
+    As in GobbletEnv, an unavailable piece or a position taken by a piece of a higher or equal rank ends the game
+    and the other player wins.
+    finish_move(bool): False only places the piece; finish(token) then checks the outcome and switches turns (e.g.
+                       to time the win check on its own)
+    """
+    piece, dst = move
+    player = state.player
+    avail = state.avail[player]
+    prev = (player, state.done, state.winner, state.reason)
+
+    # invalid move: the other player wins
+    if not avail[piece]:
+        state.done, state.winner, state.reason, state.player = True, -player, PIECE_UNAVAILABLE, -player
+        return (state, prev, None)
+    if P_RANKS[piece] <= P_RANKS[abs(state.top[dst])]:
+        state.done, state.winner, state.reason, state.player = True, -player, POSITION_UNAVAILABLE, -player
+        return (state, prev, None)
+
+    stacks, top, cell_of = state.stacks, state.top, state.cell_of
+    signed = player * piece
+
+    # lift the piece if it is on top of a cell (dynamic mode)
+    src = cell_of[signed + 12]
+    revealed = 0
+    if src >= 0 and top[src] == signed:
+        stack = stacks[src]
+        stack.pop()
+        revealed = stack[-1] if stack else 0
+        top[src] = revealed
+    else:
+        src = -1
+
+    # place the piece
+    covered = top[dst]
+    stacks[dst].append(signed)
+    top[dst] = signed
+    cell_of[signed + 12] = dst
+
+    # availability: (list, index, previous value) for undo
+    changes = []
+    if covered != 0:
+        owner = state.avail[1 if covered > 0 else -1]
+        changes.append((owner, abs(covered), owner[abs(covered)]))
+        owner[abs(covered)] = False
+    if state.mode == STATIC:
+        changes.append((avail, piece, avail[piece]))
+        avail[piece] = False
+    elif revealed != 0:
+        owner = state.avail[1 if revealed > 0 else -1]
+        changes.append((owner, abs(revealed), owner[abs(revealed)]))
+        owner[abs(revealed)] = True
+
+    token = (state, prev, (piece, src, dst, covered, changes))
+    if finish_move:
+        finish(token)
+    return token
+
+def finish(token: tuple):
+    """ outcome and turn switch of a move placed by apply(..., finish_move=False) """
+    state, _, move = token
+    if move is None: # invalid move: already finished
+        return
+    _check_done(state, move[1], move[2])
+    state.player = -state.player
+
+def _has_line(top: list, player: int, lines: tuple) -> bool:
+    for line in lines:
+        if player * top[line[0]] > 0 and player * top[line[1]] > 0 and player * top[line[2]] > 0 and player * top[line[3]] > 0:
+            return True
+    return False
+
+def _check_done(state: GobbletState, src: int, dst: int):
+    r""" The mover wins with 4 pieces in a row; the other player wins with a row uncovered by lifting the piece;
+    the mover loses without available pieces or (static mode) positions
+
+    Only the lines through the source and destination cells can change, and no line is complete before a move, so
+    this agrees with a scan of the full board (see full_board_winner).
+    """
+    player, top = state.player, state.top
+    if _has_line(top, player, LINES_OF_MOVE[src + 1][dst]):
+        state.done, state.winner, state.reason = True, player, WIN
+        return
+    if src >= 0 and _has_line(top, -player, LINES_THROUGH[src]):
+        state.done, state.winner, state.reason = True, -player, WIN
+        return
+    avail = state.avail[player]
+    if not any(avail):
+        state.done, state.winner, state.reason = True, -player, NO_PIECE
+    elif state.mode == STATIC and max_avail_rank(state, player) <= min_top_rank(state):
+        state.done, state.winner, state.reason = True, -player, NO_POSITION
+
+def full_board_winner(state: GobbletState, mover: int) -> int:
+    """ the winner by 4 in a row on the whole board after a move of `mover` (the mover first), 0 if none """
+    for player in (mover, -mover):
+        if _has_line(state.top, player, LINES):
+            return player
+    return 0
+
+def max_avail_rank(state: GobbletState, player: int) -> int:
+    avail = state.avail[player]
+    for piece in range(12, 0, -1):
+        if avail[piece]:
+            return P_RANKS[piece]
+    return 0
+
+def min_top_rank(state: GobbletState) -> int:
+    return min(P_RANKS[abs(p)] for p in state.top)
+
+def undo(token: tuple):
+    """ take back the move of apply() that returned the token """
+    state, (player, done, winner, reason), move = token
+    state.player, state.done, state.winner, state.reason = player, done, winner, reason
+    if move is None:
+        return
+    piece, src, dst, covered, changes = move
+    signed = player * piece
+    for owner, idx, value in reversed(changes):
+        owner[idx] = value
+
+    state.stacks[dst].pop()
+    state.top[dst] = covered
+    state.cell_of[signed + 12] = src
+    if src >= 0:
+        state.stacks[src].append(signed)
+        state.top[src] = signed
+
+if __name__ == '__main__':
+    import time
+
+    # random playouts with undo back to the start
+    rng = np.random.default_rng(0)
+    for mode in (STATIC, DYNAMIC):
+        state = GobbletState(mode)
+        start = state.key()
+        t0 = time.perf_counter()
+        moves = 0
+        for _ in range(200):
+            tokens = []
+            while not state.done:
+                ms = legal_moves(state)
+                if not ms:
+                    break
+                tokens.append(apply(state, ms[rng.integers(len(ms))]))
+            moves += len(tokens)
+            for token in reversed(tokens):
+                undo(token)
+            assert state.key() == start
+        dt = time.perf_counter() - t0
+        print("mode %i: %i moves, %.2f us per legal_moves + apply + undo" % (mode, moves, dt / moves * 1e6))
+
+    # incremental win detection against a full-board scan (dynamic mode: wins uncovered by lifting a piece)
+    uncovered = 0
+    for mode in (STATIC, DYNAMIC):
+        for _ in range(2000):
+            state = GobbletState(mode)
+            while not state.done:
+                ms = legal_moves(state)
+                if not ms:
+                    break
+                mover = state.player
+                token = apply(state, ms[rng.integers(len(ms))])
+                winner = full_board_winner(state, mover)
+                assert winner == (state.winner if state.reason == WIN else 0), "incremental win check diverged"
+                uncovered += winner == -mover
+    print("win detection agrees with a full-board scan (%i wins uncovered by a lift)" % uncovered)
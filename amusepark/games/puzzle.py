@@ -1,6 +1,8 @@
 import numpy as np
+from functools import lru_cache
 from amusepark.configs.puzzle_configs import PIECES, BOARD, CALENDAR, COLORS, MONTH
-from amusepark.utils.text_attr import Background
+from amusepark.utils.text_attr import Background, write_frame
+from amusepark.utils.render import TileRenderer, sprite, code2rgb
 
 class Piece:
     r"""
@@ -131,6 +133,24 @@ class Board:
 
         return True   
 
+@lru_cache(maxsize=None)
+def _calendar_texts() -> list:
+    # 3-character label of each cell: month, day or blank
+    texts = []
+    for i, row in enumerate(CALENDAR.tolist()):
+        texts.append([
+            "{:>3}".format(MONTH[v]) if i < 2 and v > 0 else
+            "{:>3}".format(str(v)) if i >= 2 and v > 0 else " " * 3
+            for v in row
+        ])
+    return texts
+
+@lru_cache(maxsize=None)
+def _calendar_sprites() -> np.ndarray:
+    # wall, empty, pieces 1 to 8, month/day
+    sprites = [sprite(code2rgb(Background.BLACK))] + [sprite(code2rgb(c)) for c in COLORS] + [sprite(code2rgb(Background.LIGHT_WHITE))]
+    return np.stack(sprites)
+
 class Calendar(Board):
     calendar = CALENDAR
     colors = COLORS
@@ -138,6 +158,8 @@ class Calendar(Board):
     def __init__(self):
         super().__init__(config=BOARD)
         self.set_date(date=(3, 20))
+        # rgb_array frames (built at the first call)
+        self._tile_renderer = None
 
     def month2coord(self, month: int) -> tuple:
         assert month in list(range(1, 13)), f"Month {month} is invalid!"
@@ -168,36 +190,39 @@ class Calendar(Board):
 
         # record date
         self.date = date
+        self.date_coord = np.zeros(self.status.shape, dtype=bool)
+        self.date_coord[mcoord] = self.date_coord[dcoord] = True
     
-    def render(self):
-        # get date coordinates
-        m, d = self.date
-        date_coord = {self.month2coord(m), self.day2coord(d)}
-
-        h, w = self.status.shape
-
-        for i in range(h):
-            for j in range(w):
-
-                # render texts
-                if i < 2 and self.calendar[i, j] > 0: # month
-                    s = "{:>3}".format(self.month[self.calendar[i, j]])
-                elif i >= 2 and self.calendar[i, j] > 0: # day
-                    s = "{:>3}".format(str(self.calendar[i, j]))
-                else:
-                    s = " " * 3
-
-                # render color
-                if (i, j) in date_coord or self.status[i, j] == 0: # month, day, or empty
-                    print(s, end="")
-                elif self.status[i, j] < 0: # wall
-                    print(Background.BLACK + s, end="")
-                else: # pieces
-                    print(self.colors[self.status[i, j]] + s, end="")
-
-                print(Background.RESET, end="")
-
-            print()
+    def render(self, mode: str='human'):
+        if mode == 'human':
+            write_frame(self._render_ansi())
+        elif mode == 'ansi':
+            return self._render_ansi()
+        elif mode == 'rgb_array':
+            return self._render_rgb()
+        else:
+            raise NotImplementedError
+
+    def _render_ansi(self) -> str:
+        texts = _calendar_texts()
+        walls = Background.BLACK
+        rows = []
+        for i, (row, date_row) in enumerate(zip(self.status.tolist(), self.date_coord.tolist())):
+            cells = []
+            for j, (v, is_date) in enumerate(zip(row, date_row)):
+                # month, day, or empty; wall; pieces
+                prefix = "" if v == 0 or is_date else walls if v < 0 else self.colors[v]
+                cells.append(prefix + texts[i][j] + Background.RESET)
+            rows.append("".join(cells) + "\n")
+        return "".join(rows)
+
+    def _render_rgb(self) -> np.ndarray:
+        if self._tile_renderer is None:
+            self._tile_renderer = TileRenderer(_calendar_sprites(), self.status.shape)
+        # walls: 0, empty: 1, pieces: 2 to 9, month/day: 10
+        tile_ids = self.status + 1
+        tile_ids[self.date_coord] = len(self.colors) + 1
+        return self._tile_renderer(tile_ids)
 
 class APuzzleADay:
     def __init__(self):
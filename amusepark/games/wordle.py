@@ -0,0 +1,252 @@
+import os
+import numpy as np
+from functools import lru_cache
+
+ALPHABET = 26
+
+def load_words(filename: str) -> list:
+
+    if not os.path.isfile(filename):
+        print("Word file unfound! Use default!")
+        return ['default']
+
+    with open(filename, 'r') as f:
+        lines = f.readlines()
+    words = [l.strip('\n') for l in lines]
+    return words
+
+def encode_words(words: list) -> np.ndarray:
+    """ (N, word_len) int8 letter codes {A: 0, B: 1, ..., Z: 25} """
+    if len(words) == 0:
+        return np.zeros((0, 0), dtype=np.int8)
+    raw = np.frombuffer("".join(words).lower().encode('ascii'), dtype=np.uint8)
+    return (raw.reshape(len(words), -1) - 97).astype(np.int8)
+
+###### bitsets: python ints, bit i <-> word i ######
+
+def mask2bits(mask: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
+
+def bits2mask(bits: int, size: int) -> np.ndarray:
+    raw = np.frombuffer(bits.to_bytes((size + 7) // 8, 'little'), dtype=np.uint8)
+    return np.unpackbits(raw, count=size, bitorder='little').view(bool)
+
+class Vocabulary:
+    r""" Integer-indexed Wordle vocabulary
+
+    words     (list)      : the hidden words first (ids 0..hidden_num-1), then the other allowed guesses
+    hidden_num(int)       : number of hidden words
+    index     (dict)      : word -> id
+    encoded   (np.ndarray): (len(words), word_len) int8 letter codes
+    """
+    def __init__(self, hidden_words: list, guess_words: list=()):
+        self.word_len = len(hidden_words[0])
+        words = list(dict.fromkeys(hidden_words))
+        self.hidden_num = len(words)
+        hidden = set(words)
+        words += [w for w in dict.fromkeys(guess_words) if len(w) == self.word_len and w not in hidden]
+        self.words = words
+        self.index = {w: i for i, w in enumerate(words)}
+        self.encoded = encode_words(words)
+        self.encoded.setflags(write=False)
+        # base-26 keys of the words, sorted, for vectorized lookups of letter codes
+        self._key_weights = ALPHABET ** np.arange(self.word_len, dtype=np.int64)
+        keys = self.encoded.astype(np.int64) @ self._key_weights
+        self._key_order = np.argsort(keys)
+        self._sorted_keys = keys[self._key_order]
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def hidden_ids(self) -> np.ndarray:
+        return np.arange(self.hidden_num)
+
+    def lookup(self, codes: np.ndarray) -> np.ndarray:
+        """ (..., word_len) letter codes -> (...) word ids (-1: not a word of the vocabulary, or a -1 row) """
+        codes = np.asarray(codes)
+        keys = codes.astype(np.int64) @ self._key_weights
+        pos = np.minimum(np.searchsorted(self._sorted_keys, keys), len(self._sorted_keys) - 1)
+        found = (self._sorted_keys[pos] == keys) & (codes >= 0).all(axis=-1)
+        return np.where(found, self._key_order[pos], -1)
+
+@lru_cache(maxsize=None)
+def load_vocabulary(hidden_filename: str, guess_filename: str=None) -> Vocabulary:
+    """ vocabulary of the hidden word file plus an allowed-guess file (cached: envs share it) """
+    guess_words = load_words(guess_filename) if guess_filename is not None and os.path.isfile(guess_filename) else []
+    return Vocabulary(load_words(hidden_filename), guess_words)
+
+class HardModeIndex:
+    r""" Precomputed constraint bitsets over a vocabulary for the hard mode
+
+    In the hard mode every revealed hint must be used by the next guesses: a green letter stays at its position, and
+    a letter revealed n times (green or orange) in a guess is used at least n times. The legal guesses are then the
+    intersection of one bitset per hint:
+
+    green   [pos * 26 + letter]: words with `letter` at `pos`
+    at_least[letter][n]        : words using `letter` at least n times (n = 1..word_len)
+    all                        : every word (the legal set of a new game)
+    """
+    def __init__(self, vocab: Vocabulary):
+        enc = vocab.encoded
+        self.size, self.word_len = enc.shape
+
+        letters = np.arange(ALPHABET)
+        # (pos, letter, word) and (letter, word)
+        at_pos = enc.T[:, None, :] == letters[None, :, None]
+        counts = at_pos.sum(axis=0)
+
+        self.green = [mask2bits(m) for m in at_pos.reshape(-1, self.size)]
+        self.at_least = [
+            [0] + [mask2bits(counts[v] >= n) for n in range(1, self.word_len + 1)]
+            for v in range(ALPHABET)
+        ]
+        self.all = (1 << self.size) - 1
+
+    def update(self, legal: int, guess: list, color: list) -> int:
+        """ intersect the legal set with the hints of one scored guess (letter codes and colors as lists) """
+        revealed = dict()
+        for pos, (v, c) in enumerate(zip(guess, color)):
+            if c == 2:
+                legal &= self.green[pos * ALPHABET + v]
+            if c >= 1:
+                revealed[v] = revealed.get(v, 0) + 1
+        for v, n in revealed.items():
+            legal &= self.at_least[v][n]
+        return legal
+
+    def mask(self, legal: int) -> np.ndarray:
+        """ bool mask of the legal set """
+        return bits2mask(legal, self.size)
+
+@lru_cache(maxsize=None)
+def hard_mode_index(vocab: Vocabulary) -> HardModeIndex:
+    """ the (cached) hard-mode index of a vocabulary """
+    return HardModeIndex(vocab)
+
+###### vectorized feedback and pattern ids ######
+## color: {gray: 0, orange: 1, green: 2}
+## pattern id: sum(color[i] * 3**i), in [0, 3**word_len)
+
+def feedback(guesses: np.ndarray, answers: np.ndarray) -> np.ndarray:
+    """ colors of (..., word_len) guesses against broadcastable answers, the same as compare_words """
+    guesses, answers = np.broadcast_arrays(np.asarray(guesses), np.asarray(answers))
+    shape = guesses.shape
+    # (word_len, M): one contiguous row per position
+    g = guesses.reshape(-1, shape[-1]).T.copy()
+    a = answers.reshape(-1, shape[-1]).T.copy()
+
+    green = g == a
+    color = np.where(green, 2, 0).astype(np.int8)
+    # letters of the answer left for oranges, consumed by the non-green guess letters from left to right
+    a_left = np.where(green, -1, a)
+    for i in range(shape[-1]):
+        avail = (a_left == g[i]).sum(axis=0)
+        used = ((g[:i+1] == g[i]) & ~green[:i+1]).sum(axis=0)
+        color[i] += ~green[i] & (used <= avail)
+    return color.T.reshape(shape)
+
+@lru_cache(maxsize=None)
+def _upper(word_len: int) -> np.ndarray:
+    return np.triu(np.ones((word_len, word_len), dtype=np.int64))
+
+def letter_counts(answers: np.ndarray) -> np.ndarray:
+    """ (N, word_len) letter codes -> (N, 26) letter counts """
+    answers = np.asarray(answers)
+    counts = np.zeros((len(answers), 26), dtype=np.int64)
+    np.add.at(counts, (np.arange(len(answers))[:, None], answers), 1)
+    return counts
+
+def guess_feedback(guess: np.ndarray, answers: np.ndarray, counts: np.ndarray=None) -> np.ndarray:
+    r""" colors of one (word_len,) guess against (N, word_len) answers, the same as feedback
+
+    A fixed number of array operations (no loop over the positions), for a few answers at a time (e.g. the boards of
+    MultiWordleEnv); counts: letter_counts(answers), if precomputed.
+    """
+    guess = np.asarray(guess)
+    if counts is None:
+        counts = letter_counts(answers)
+    is_green = answers == guess # (N, L)
+    green = is_green.astype(np.int64)
+    same = np.equal.outer(guess, guess).astype(np.int64) # (L, L)
+    # letters of the answer left for oranges / non-green occurrences of each guess letter so far
+    avail = counts[:, guess] - green @ same
+    used = (1 - green) @ (same * _upper(len(guess)))
+    orange = (used <= avail) & ~is_green
+    return (is_green.view(np.int8) << 1) | orange.view(np.int8)
+
+def pattern_ids(colors: np.ndarray) -> np.ndarray:
+    """ (..., word_len) colors -> (...) pattern ids """
+    colors = np.asarray(colors)
+    return colors.astype(np.int64) @ 3 ** np.arange(colors.shape[-1])
+
+@lru_cache(maxsize=None)
+def pattern_colors(word_len: int) -> np.ndarray:
+    """ (3**word_len, word_len) int8 table: pattern id -> colors """
+    ids = np.arange(3 ** word_len)
+    table = (ids[:, None] // 3 ** np.arange(word_len)) % 3
+    table = table.astype(np.int8)
+    table.setflags(write=False)
+    return table
+
+class PatternTable:
+    r""" (hidden_num, len(vocab)) table of the pattern ids of every guess against every hidden word
+
+    The rows are computed on first use (row) or all at once (fill), and shared by every env of the vocabulary.
+    rows   (np.ndarray): [answer id, guess id] -> pattern id (uint8 up to 5-letter words)
+    columns(np.ndarray): [guess id, answer id] -> pattern id, computed per guess on first use (guess_row)
+    """
+    def __init__(self, vocab: Vocabulary):
+        self.vocab = vocab
+        dtype = np.uint8 if vocab.word_len <= 5 else np.int64
+        # untouched pages of np.zeros are not allocated until the rows are filled
+        self.rows = np.zeros((vocab.hidden_num, len(vocab)), dtype=dtype)
+        self._filled = np.zeros(vocab.hidden_num, dtype=bool)
+        # the same table by guess (guess_row), for partitions of candidate sets by the feedback of one guess
+        self.columns = np.zeros((len(vocab), vocab.hidden_num), dtype=dtype)
+        self._columns_filled = np.zeros(len(vocab), dtype=bool)
+
+    def row(self, answer_id: int) -> np.ndarray:
+        if not self._filled[answer_id]:
+            self.rows[answer_id] = pattern_ids(feedback(self.vocab.encoded, self.vocab.encoded[answer_id]))
+            self._filled[answer_id] = True
+        return self.rows[answer_id]
+
+    def guess_row(self, guess_id: int) -> np.ndarray:
+        """ pattern ids of one guess against every hidden word """
+        if not self._columns_filled[guess_id]:
+            self.columns[guess_id] = pattern_ids(feedback(self.vocab.encoded[guess_id], self.vocab.encoded[:self.vocab.hidden_num]))
+            self._columns_filled[guess_id] = True
+        return self.columns[guess_id]
+
+    def fill(self) -> np.ndarray:
+        for answer_id in np.flatnonzero(~self._filled):
+            self.row(answer_id)
+        return self.rows
+
+@lru_cache(maxsize=None)
+def pattern_table(vocab: Vocabulary) -> PatternTable:
+    """ the (shared) pattern table of a vocabulary """
+    return PatternTable(vocab)
+
+###### compact observations ######
+## (..., guess_num, 2) int16 per guess row: [word id, pattern id], -1 for the rows not guessed yet (as in the
+## color/guess observations). 12 words of 2 bytes replace the two (6, 5) int64 arrays of WordleEnv.
+
+COMPACT_DTYPE = np.int16
+
+def compact_obs(vocab: Vocabulary, color: np.ndarray, guess: np.ndarray) -> np.ndarray:
+    """ (..., guess_num, word_len) color and guess observations -> (..., guess_num, 2) compact observations """
+    color, guess = np.asarray(color), np.asarray(guess)
+    out = np.empty(color.shape[:-1] + (2,), dtype=COMPACT_DTYPE)
+    out[..., 0] = vocab.lookup(guess)
+    out[..., 1] = np.where((color >= 0).all(axis=-1), pattern_ids(np.maximum(color, 0)), -1)
+    return out
+
+def expand_obs(vocab: Vocabulary, compact: np.ndarray) -> dict:
+    """ (..., guess_num, 2) compact observations -> {'color', 'guess'} of (..., guess_num, word_len) """
+    compact = np.asarray(compact)
+    word_ids, pids = compact[..., 0], compact[..., 1]
+    guessed = (pids >= 0)[..., None]
+    color = np.where(guessed, pattern_colors(vocab.word_len)[np.maximum(pids, 0)], -1)
+    guess = np.where(guessed & (word_ids >= 0)[..., None], vocab.encoded[np.maximum(word_ids, 0)], -1)
+    return {'color': color.astype(int), 'guess': guess.astype(int)}
@@ -0,0 +1,22 @@
+import os
+import importlib
+import importlib.util
+
+# numba is optional: the kernels are compiled only if it is installed (and not disabled by AMUSEPARK_DISABLE_NUMBA=1)
+NUMBA_AVAILABLE = importlib.util.find_spec('numba') is not None
+ENABLED = NUMBA_AVAILABLE and os.environ.get('AMUSEPARK_DISABLE_NUMBA', '0') != '1'
+
+def jit(fn):
+    """ numba.njit if numba is installed, else the plain python function """
+    if not NUMBA_AVAILABLE:
+        return fn
+    import numba
+    return numba.njit(cache=True)(fn)
+
+def load():
+    """ the kernels module (numba is imported on the first load, not with the envs) """
+    return importlib.import_module('amusepark.kernels.step')
+
+def env_kernels():
+    """ what an env steps with: the compiled kernels if enabled, else None (the env's own NumPy code) """
+    return load() if ENABLED else None
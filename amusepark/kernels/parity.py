@@ -0,0 +1,157 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+from amusepark import kernels
+
+###### Parity of the step kernels with the NumPy code of the envs ######
+## Runs the same random trajectories through each env with and without its kernels and asserts identical
+## observations, rewards, dones and internal states. Without numba the kernels run as plain python, which checks
+## their logic (slowly).
+
+def _same_step(a: tuple, b: tuple) -> bool:
+    obs_a, obs_b = a[0], b[0]
+    if isinstance(obs_a, dict):
+        same_obs = all(np.array_equal(obs_a[k], obs_b[k]) for k in obs_a)
+    else:
+        same_obs = np.array_equal(obs_a, obs_b)
+    return same_obs and a[1] == b[1] and a[2] == b[2]
+
+def _pair(make_env, K):
+    ref, fast = make_env(), make_env()
+    ref._kernels, fast._kernels = None, K
+    return ref, fast
+
+def check_wordle(K, episodes: int, rng: np.random.Generator) -> int:
+    from amusepark.envs.wordle import WordleEnv
+    from amusepark.games.wordle import load_vocabulary, encode_words
+    from amusepark.envs.wordle import compare_words
+    from amusepark.utils.path import data_path
+
+    word_file = os.path.join(data_path, 'wordle-hidden.txt')
+    vocab = load_vocabulary(word_file, os.path.join(data_path, 'wordle-allowed-guesses.txt'))
+    # the kernel alone, on random word pairs
+    ids = rng.integers(len(vocab), size=(2, 20 * episodes))
+    out = np.zeros(vocab.word_len, dtype=np.int8)
+    for g, a in zip(*ids):
+        assert np.array_equal(K.feedback_into(vocab.encoded[g], vocab.encoded[a], out), compare_words(vocab.words[g], vocab.words[a]))
+
+    # the env, guessing real words (and random letters)
+    ref, fast = _pair(lambda: WordleEnv(word_file), K)
+    steps = 0
+    for ep in range(episodes):
+        ref.reset(seed=ep)
+        fast.reset(seed=ep)
+        done = False
+        while not done:
+            act = vocab.encoded[rng.integers(len(vocab))].astype(int) if rng.random() < 0.8 else rng.integers(26, size=vocab.word_len)
+            a, b = ref.step(act), fast.step(act)
+            assert _same_step(a, b), f"WordleEnv diverged at episode {ep}"
+            done = a[2]
+            steps += 1
+    return steps
+
+def check_maze(K, episodes: int, rng: np.random.Generator) -> int:
+    from amusepark.envs.machinarium import TraverseMazeEnv
+
+    ref, fast = _pair(TraverseMazeEnv, K)
+    steps = 0
+    for ep in range(episodes):
+        ref.reset(seed=ep)
+        fast.reset(seed=ep)
+        done = False
+        while not done:
+            act = int(rng.integers(4))
+            a, b = ref.step(act), fast.step(act)
+            assert _same_step(a, b) and tuple(ref.cur_pos) == tuple(fast.cur_pos), f"TraverseMazeEnv diverged at episode {ep}"
+            done = a[2] or ref.step_counter >= 100
+            steps += 1
+    return steps
+
+def check_isoland(K, episodes: int, rng: np.random.Generator) -> int:
+    from amusepark.envs.isoland import MoveArrowEnv
+    from amusepark.configs.isoland_configs import ENV_CONFIG_0, ENV_CONFIG_1
+
+    steps = 0
+    for config in (ENV_CONFIG_0, ENV_CONFIG_1):
+        ref, fast = _pair(lambda: MoveArrowEnv(config), K)
+        for ep in range(episodes):
+            ref.reset()
+            fast.reset()
+            done = False
+            while not done:
+                act = int(rng.integers(len(ref.arrows)))
+                a, b = ref.step(act), fast.step(act)
+                same_arrows = all(
+                    ref.arrows[k][0] == fast.arrows[k][0] and tuple(map(int, ref.arrows[k][1])) == fast.arrows[k][1]
+                    for k in ref.arrows
+                )
+                same_dead = a[3]['dead'] == b[3]['dead']
+                assert _same_step(a, b) and same_arrows and same_dead, f"MoveArrowEnv diverged at episode {ep}"
+                done = a[2] or ref.step_counter >= 200
+                steps += 1
+    return steps
+
+def check_gobblet(K, episodes: int, rng: np.random.Generator) -> int:
+    from amusepark.envs.in_a_row import GobbletEnv
+    from amusepark.games import gobblet
+
+    def same_state(x, y) -> bool:
+        return (x.key() == y.key() and x.top == y.top and x.avail == y.avail and x.cell_of == y.cell_of
+                and (x.done, x.winner, x.reason) == (y.done, y.winner, y.reason))
+
+    steps = 0
+    for mode in (gobblet.STATIC, gobblet.DYNAMIC):
+        ref, fast = _pair(lambda: GobbletEnv(mode), K)
+        for ep in range(episodes):
+            ref.reset()
+            fast.reset()
+            done = False
+            while not done:
+                # mostly legal moves, some (invalid) random ones
+                moves = gobblet.legal_moves(ref.state)
+                if moves and rng.random() < 0.95:
+                    act = moves[rng.integers(len(moves))]
+                else:
+                    act = (int(rng.integers(1, 13)), int(rng.integers(16)))
+                a, b = ref.step(act), fast.step(act)
+                same_info = all(np.array_equal(a[3][k], b[3][k]) for k in ('board', 'rank')) and a[3]['message'] == b[3]['message']
+                assert _same_step(a, b) and same_info and same_state(ref.state, fast.state), f"GobbletEnv diverged at episode {ep}"
+                done = a[2]
+                steps += 1
+    return steps
+
+CHECKS = {
+    'wordle': check_wordle,
+    'maze': check_maze,
+    'isoland': check_isoland,
+    'gobblet': check_gobblet,
+}
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m amusepark.kernels.parity', description='Parity of the step kernels with the NumPy code of the envs.')
+    parser.add_argument('--checks', nargs='*', default=list(CHECKS), choices=list(CHECKS))
+    parser.add_argument('--episodes', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    K = kernels.load()
+    print("numba: %s" % ("compiled kernels" if kernels.NUMBA_AVAILABLE else "not installed, kernels run as python"))
+    rng = np.random.default_rng(args.seed)
+    failed = False
+    for name in args.checks:
+        t0 = time.perf_counter()
+        try:
+            steps = CHECKS[name](K, args.episodes, rng)
+            print("%-8s ok     %7i steps  %.1f sec" % (name, steps, time.perf_counter() - t0))
+        except AssertionError as e:
+            failed = True
+            print("%-8s FAILED %s" % (name, e))
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+import numpy as np
+
+from amusepark.kernels import jit
+from amusepark.configs.isoland_configs import ARROW_FEATURE_NUM
+from amusepark.games.gobblet import ONGOING, WIN, NO_PIECE, NO_POSITION, PIECE_UNAVAILABLE, POSITION_UNAVAILABLE
+
+###### Step kernels on plain integer arrays ######
+## Each kernel mirrors a hot loop of an env and is checked against it by amusepark.kernels.parity. The arrays the envs
+## keep for the kernels are int8 (letter codes, mazes, arrows, Gobblet boards).
+
+### WordleEnv: compare_words on letter codes ###
+
+@jit
+def feedback_into(guess, answer, out):
+    # colors {gray: 0, orange: 1, green: 2} of one guess against one answer (letter codes 0..25)
+    left = np.zeros(26, dtype=np.int64)
+    for i in range(guess.shape[0]):
+        if guess[i] == answer[i]:
+            out[i] = 2
+        else:
+            out[i] = 0
+            left[answer[i]] += 1
+    for i in range(guess.shape[0]):
+        if out[i] != 2 and left[guess[i]] > 0:
+            out[i] = 1
+            left[guess[i]] -= 1
+    return out
+
+### TraverseMazeEnv: slide until blocked ###
+
+@jit
+def maze_slide(maze, i, j, di, dj):
+    # move from (i, j) in (di, dj) while the next cell of the int8 maze is empty (0), marking traversed cells (1)
+    H, W = maze.shape
+    while True:
+        ni, nj = i + di, j + dj
+        if 0 <= ni < H and 0 <= nj < W and maze[ni, nj] == 0:
+            i, j = ni, nj
+            maze[i, j] = 1
+        else:
+            return i, j
+
+### MoveArrowEnv: chain push, done and dead checks ###
+
+@jit
+def arrow_push(arrow, pos, dirs, deltas, signs, layer2, order):
+    r""" MoveArrowEnv._move without recursion, pushing `arrow` along its own direction
+
+    pos (A, 2): arrow positions, dirs (A,): arrow directions, deltas (5, 2): direction -> (di, dj)
+    signs (H, W): direction landmarks (0: none)
+    layer2 (H, W): the 2nd observation layer (arrow metas, 0: none), rebuilt in `order` (a later arrow hides an
+    earlier one)
+    The chain of pushed arrows is read from layer2 before anything moves; the arrows then move from the far end of the
+    chain back to the pusher, an arrow blocked by the boundary ending the chain.
+    """
+    H, W = signs.shape
+    di, dj = deltas[dirs[arrow], 0], deltas[dirs[arrow], 1]
+    chain = np.empty(pos.shape[0], dtype=np.int64)
+    n = 0
+    cur = arrow
+    while n < pos.shape[0]:
+        i, j = pos[cur, 0] + di, pos[cur, 1] + dj
+        if not (0 <= i < H and 0 <= j < W):
+            break
+        chain[n] = cur
+        n += 1
+        if layer2[i, j] == 0:
+            break
+        cur = (layer2[i, j] - 5) // ARROW_FEATURE_NUM
+    for k in range(n - 1, -1, -1):
+        a = chain[k]
+        pos[a, 0] += di
+        pos[a, 1] += dj
+        s = signs[pos[a, 0], pos[a, 1]]
+        if s > 0:
+            dirs[a] = s
+    layer2[:, :] = 0
+    for a in order:
+        layer2[pos[a, 0], pos[a, 1]] = 5 + ARROW_FEATURE_NUM * a + dirs[a]
+
+@jit
+def arrows_on_goals(pos, order, goal_of):
+    # goal_of (H, W): index + 1 of the arrow whose goal marker is shown on each cell (0: none)
+    for a in order:
+        if goal_of[pos[a, 0], pos[a, 1]] != a + 1:
+            return False
+    return True
+
+@jit
+def arrows_dead(pos, dirs, order, live):
+    # live (A, H, W, 5): see envs.isoland.live_states
+    for a in order:
+        if not live[a, pos[a, 0], pos[a, 1], dirs[a]]:
+            return True
+    return False
+
+### GobbletEnv: place a piece, then the outcome (see games.gobblet.GobbletArrays) ###
+
+@jit
+def gobblet_place(stacks, heights, top, avail, cell_of, ranks, player, piece, dst, static):
+    r""" gobblet.apply(..., finish_move=False) on the int8 arrays; returns (reason, src)
+
+    reason: PIECE_UNAVAILABLE or POSITION_UNAVAILABLE for an invalid move (nothing changes), else ONGOING
+    src   : the cell the piece was lifted from (-1: from hand)
+    """
+    row = 0 if player == 1 else 1
+    if avail[row, piece] == 0:
+        return PIECE_UNAVAILABLE, -1
+    if ranks[piece] <= ranks[abs(top[dst])]:
+        return POSITION_UNAVAILABLE, -1
+
+    # lift the piece if it is on top of a cell (dynamic mode)
+    signed = player * piece
+    src = cell_of[signed + 12]
+    revealed = 0
+    if src >= 0 and top[src] == signed:
+        h = heights[src] - 1
+        stacks[src, h] = 0
+        heights[src] = h
+        if h > 0:
+            revealed = stacks[src, h - 1]
+        top[src] = revealed
+    else:
+        src = -1
+
+    # place the piece
+    covered = top[dst]
+    stacks[dst, heights[dst]] = signed
+    heights[dst] += 1
+    top[dst] = signed
+    cell_of[signed + 12] = dst
+
+    # availability
+    if covered != 0:
+        avail[0 if covered > 0 else 1, abs(covered)] = 0
+    if static:
+        avail[row, piece] = 0
+    elif revealed != 0:
+        avail[0 if revealed > 0 else 1, abs(revealed)] = 1
+    return ONGOING, src
+
+@jit
+def _gobblet_line(top, player, lines):
+    # player has 4 pieces on top in one of the lines (n, 4)
+    for k in range(lines.shape[0]):
+        if player * top[lines[k, 0]] > 0 and player * top[lines[k, 1]] > 0 and player * top[lines[k, 2]] > 0 and player * top[lines[k, 3]] > 0:
+            return True
+    return False
+
+@jit
+def gobblet_outcome(top, avail, ranks, lines_through, player, src, dst, static):
+    r""" gobblet._check_done on the int8 arrays after gobblet_place; returns (reason, winner)
+
+    lines_through (16, 4, 4): the lines through each cell (the mover is checked on the destination and source lines,
+    then the other player on the source lines)
+    """
+    if _gobblet_line(top, player, lines_through[dst]) or (src >= 0 and _gobblet_line(top, player, lines_through[src])):
+        return WIN, player
+    if src >= 0 and _gobblet_line(top, -player, lines_through[src]):
+        return WIN, -player
+    # ranks increase with the piece number: the last available piece has the highest rank
+    row = 0 if player == 1 else 1
+    max_rank = 0
+    for piece in range(1, avail.shape[1]):
+        if avail[row, piece] != 0:
+            max_rank = ranks[piece]
+    if max_rank == 0:
+        return NO_PIECE, -player
+    if static:
+        min_rank = ranks[abs(top[0])]
+        for cell in range(1, top.shape[0]):
+            min_rank = min(min_rank, ranks[abs(top[cell])])
+        if max_rank <= min_rank:
+            return NO_POSITION, -player
+    return ONGOING, 0
+
+@jit
+def gobblet_sync(board, rank, stacks, heights, ranks, src, dst):
+    r""" GobbletEnv._sync_cell of the destination and source (-1: none) cells of a move
+
+    board, rank (5, 4, 4): the signed pieces and ranks of each cell, top first (0 below the bottom)
+    """
+    W = board.shape[2]
+    for cell in (dst, src):
+        if cell < 0:
+            continue
+        i, j = cell // W, cell % W
+        h = heights[cell]
+        for k in range(board.shape[0]):
+            p = stacks[cell, h - 1 - k] if k < h else 0
+            board[k, i, j] = p
+            rank[k, i, j] = ranks[p] if p >= 0 else -ranks[-p]
@@ -0,0 +1,32 @@
+import importlib
+
+# name -> module; imported on first access (so that `python -m amusepark.tools.<module>` runs a fresh module)
+_TOOLS = {
+    'GreedyPolicy': 'amusepark.tools.wordle_policies',
+    'candidates': 'amusepark.tools.wordle_policies',
+    'evaluate_policy': 'amusepark.tools.wordle_eval',
+    'summarize': 'amusepark.tools.wordle_eval',
+    'save_results': 'amusepark.tools.wordle_eval',
+    'compile_tree': 'amusepark.tools.wordle_tree',
+    'save_tree': 'amusepark.tools.wordle_tree',
+    'load_tree': 'amusepark.tools.wordle_tree',
+    'TreePolicy': 'amusepark.tools.wordle_tree',
+    'TreeAgent': 'amusepark.tools.wordle_tree',
+    'RandomAgent': 'amusepark.tools.board_agents',
+    'GreedyAgent': 'amusepark.tools.board_agents',
+    'BradleyTerry': 'amusepark.tools.tournament',
+    'play_games': 'amusepark.tools.tournament',
+    'run_tournament': 'amusepark.tools.tournament',
+}
+
+__all__ = list(_TOOLS)
+
+def __getattr__(name: str):
+    if name in _TOOLS:
+        attr = getattr(importlib.import_module(_TOOLS[name]), name)
+        globals()[name] = attr
+        return attr
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(_TOOLS))
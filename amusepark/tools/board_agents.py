@@ -0,0 +1,64 @@
+import numpy as np
+
+from amusepark.games import gobblet
+
+###### baseline agents of TicTacToeEnv and GobbletEnv ######
+## An agent is called with a batch of envs (games in which it is to move) and a random generator, and returns one
+## action per env. Agents read the env state directly (e.g. the piece availability of GobbletEnv is not in the
+## observation), so that evaluators can step many games in lockstep and ask the agent once per batch.
+
+def legal_actions(env) -> list:
+    """ the actions of the player to move that do not lose on the spot """
+    if hasattr(env, 'state'): # GobbletEnv
+        return gobblet.legal_moves(env.state)
+    return np.flatnonzero(env.board.reshape(-1) == 0).tolist()
+
+def _ttt_lines(env, actions: list, piece: int) -> list:
+    # the actions completing a line of `piece`
+    n = env.board.shape[1]
+    return [a for a in actions if env.is_win(a // n, a % n, piece, env.board)]
+
+def winning_actions(env, actions: list) -> list:
+    if hasattr(env, 'state'):
+        state, wins = env.state, []
+        for move in actions:
+            token = gobblet.apply(state, move)
+            # (lifting a piece may also uncover a win of the opponent)
+            if state.reason == gobblet.WIN and state.winner == -state.player:
+                wins.append(move)
+            gobblet.undo(token)
+        return wins
+    return _ttt_lines(env, actions, env.turn_piece)
+
+class RandomAgent:
+    """ uniformly random legal actions """
+    def __call__(self, envs: list, rng: np.random.Generator) -> list:
+        actions = []
+        for env in envs:
+            legal = legal_actions(env)
+            actions.append(legal[rng.integers(len(legal))] if legal else env.action_space.sample())
+        return actions
+
+class GreedyAgent:
+    r""" One-ply lookahead: a winning action, else (Tic-Tac-Toe) block a line of the opponent, else random
+
+    Blocking is skipped for Gobblet, where it would need a search over the replies of the opponent.
+    """
+    def __call__(self, envs: list, rng: np.random.Generator) -> list:
+        actions = []
+        for env in envs:
+            legal = legal_actions(env)
+            if not legal:
+                actions.append(env.action_space.sample())
+                continue
+            best = winning_actions(env, legal)
+            if not best and not hasattr(env, 'state'):
+                best = _ttt_lines(env, legal, -env.turn_piece)
+            pool = best if best else legal
+            actions.append(pool[rng.integers(len(pool))])
+        return actions
+
+AGENTS = {
+    'random': RandomAgent,
+    'greedy': GreedyAgent,
+}
@@ -0,0 +1,270 @@
+import math
+import time
+import queue
+import argparse
+import importlib
+import itertools
+import multiprocessing as mp
+from functools import partial
+
+import numpy as np
+
+# Elo points per natural unit of the Bradley-Terry strength
+ELO_SCALE = 400 / math.log(10)
+
+###### games: name -> env factory ######
+
+def _env(cls: str, **kwargs):
+    from amusepark.envs import in_a_row
+    return getattr(in_a_row, cls)(trusted_actions=True, **kwargs)
+
+GAMES = {
+    'tictactoe': partial(_env, 'TicTacToeEnv'),
+    'gobblet-static': partial(_env, 'GobbletEnv', mode=0),
+    'gobblet-dynamic': partial(_env, 'GobbletEnv', mode=1),
+}
+
+def _is_tie(env, reward: float) -> bool:
+    # TicTacToeEnv scores a full board as a win of player 2 ("by default"); the tournament scores it as a draw
+    return hasattr(env, 'turn_piece') and reward == -1 and (env.board != 0).all()
+
+###### ratings ######
+
+class BradleyTerry:
+    r""" Incremental Bradley-Terry (Elo scale) ratings from streamed game results
+
+    names(list) : the players
+    prior(float): virtual draws of every player against a rating-0 opponent (keeps the ratings of unbeaten players
+                  finite; the ratings are centred on 0 by it)
+    add() accumulates results into a (players, players) score matrix; fit() refits all ratings by Newton steps,
+    warm-started from the previous fit, so that refitting after every batch of games stays cheap.
+    """
+    def __init__(self, names: list, prior: float=1.):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        n = len(self.names)
+        self.games = np.zeros((n, n)) # games between i and j
+        self.score = np.zeros((n, n)) # points of i against j (draw: 0.5)
+        self.prior = prior
+        self.theta = np.zeros(n)
+        self.cov = np.eye(n)
+
+    def add(self, a: str, b: str, score_a: float, games: int):
+        i, j = self.index[a], self.index[b]
+        self.games[i, j] += games
+        self.games[j, i] += games
+        self.score[i, j] += score_a
+        self.score[j, i] += games - score_a
+
+    def fit(self, iters: int=20, tol: float=1e-8) -> np.ndarray:
+        theta = self.theta
+        for _ in range(iters):
+            p = 1 / (1 + np.exp(theta[None, :] - theta[:, None])) # p[i, j]: i beats j
+            p0 = 1 / (1 + np.exp(-theta))
+            grad = (self.score - self.games * p).sum(axis=1) + self.prior * (0.5 - p0)
+            w = self.games * p * (1 - p)
+            hess = np.diag(w.sum(axis=1) + self.prior * p0 * (1 - p0)) - w # minus the Hessian
+            step = np.linalg.solve(hess, grad)
+            theta = theta + step
+            if np.abs(step).max() < tol:
+                break
+        self.theta = theta
+        self.cov = np.linalg.inv(hess)
+        return self.ratings()
+
+    def ratings(self) -> np.ndarray:
+        return ELO_SCALE * self.theta
+
+    def stderr(self) -> np.ndarray:
+        """ standard errors of the ratings relative to the average player """
+        n = len(self.names)
+        center = np.eye(n) - 1 / n
+        return ELO_SCALE * np.sqrt(np.maximum(np.diag(center @ self.cov @ center), 0))
+
+    def diff_interval(self, a: str, b: str, z: float=1.96) -> tuple:
+        """ confidence interval of rating(a) - rating(b) """
+        i, j = self.index[a], self.index[b]
+        diff = ELO_SCALE * (self.theta[i] - self.theta[j])
+        se = ELO_SCALE * math.sqrt(max(self.cov[i, i] + self.cov[j, j] - 2 * self.cov[i, j], 0))
+        return diff - z * se, diff + z * se
+
+    def separated(self, a: str, b: str, z: float=1.96) -> bool:
+        low, high = self.diff_interval(a, b, z)
+        return low > 0 or high < 0
+
+###### matches ######
+
+# per worker process: agent name -> agent (checkpoints are loaded once)
+_AGENT_CACHE = dict()
+
+def load_agent(name: str):
+    """ 'random', 'greedy' (see tools/board_agents.py) or 'package.module:factory', the factory taking no argument """
+    from amusepark.tools.board_agents import AGENTS
+    if name in AGENTS:
+        return AGENTS[name]()
+    module, attr = name.split(':')
+    return getattr(importlib.import_module(module), attr)()
+
+def _get_agent(name: str, factory):
+    if name not in _AGENT_CACHE:
+        _AGENT_CACHE[name] = factory()
+    return _AGENT_CACHE[name]
+
+def play_games(env_fn, agent_a, agent_b, games: int, first_game: int, rng: np.random.Generator) -> tuple:
+    r""" Games between two agents stepped in lockstep; returns (wins, draws, losses) of agent_a
+
+    Colours alternate with the game index: agent_a plays first in the even games (first_game + k).
+    Each agent is called once per lockstep round with all the games in which it is to move.
+    """
+    envs = [env_fn() for _ in range(games)]
+    for env in envs:
+        env.reset()
+    # player (1: first, -1: second) of agent_a per game
+    a_player = [1 if (first_game + k) % 2 == 0 else -1 for k in range(games)]
+    to_move = [1] * games
+    wins = draws = losses = 0
+
+    active = list(range(games))
+    while active:
+        finished = set()
+        for agent, side in ((agent_a, 1), (agent_b, -1)):
+            movers = [k for k in active if to_move[k] == side * a_player[k] and k not in finished]
+            if not movers:
+                continue
+            actions = agent([envs[k] for k in movers], rng)
+            for k, act in zip(movers, actions):
+                _, reward, done, _ = envs[k].step(act)
+                to_move[k] = -to_move[k]
+                if done:
+                    finished.add(k)
+                    if reward == 0 or _is_tie(envs[k], reward):
+                        draws += 1
+                    elif reward * a_player[k] > 0:
+                        wins += 1
+                    else:
+                        losses += 1
+        active = [k for k in active if k not in finished]
+    return wins, draws, losses
+
+def _play_round(game: str, names: tuple, factories: tuple, games: int, first_game: int, seed: tuple) -> tuple:
+    agent_a, agent_b = (_get_agent(name, fn) for name, fn in zip(names, factories))
+    rng = np.random.default_rng(seed)
+    return names, play_games(GAMES[game], agent_a, agent_b, games, first_game, rng)
+
+class _Pairing:
+    def __init__(self, a: str, b: str):
+        self.a, self.b = a, b
+        self.scheduled = 0 # games sent to the workers
+        self.played = 0
+        self.wins = self.draws = self.losses = 0
+        self.stopped = False
+
+def run_tournament(game: str, agents: dict, games_per_round: int=64, min_games: int=128, max_games: int=2048,
+                   z: float=3., processes: int=1, seed: int=0, prior: float=1., verbose: bool=False) -> tuple:
+    r""" Round-robin tournament with early stopping
+
+    game           : a key of GAMES
+    agents         : name -> picklable factory creating the agent (see tools/board_agents.py)
+    games_per_round: games of one job (played in lockstep by a worker, colours alternating)
+    min_games, max_games: games per pairing before it may stop early / at most
+    z              : width of the intervals in standard errors; a pairing stops once the interval of its rating
+                     difference excludes 0. The intervals are checked after every job, so z is wider than a one-shot
+                     95% interval to keep equal agents from separating by chance.
+    returns (ratings, pairings): the BradleyTerry estimator (refitted after every job) and per pairing the dict
+    {a, b, games, wins, draws, losses} of a
+    """
+    assert game in GAMES, f"Invalid game: {game}!"
+    names = list(agents)
+    ratings = BradleyTerry(names, prior)
+    pairings = [_Pairing(a, b) for a, b in itertools.combinations(names, 2)]
+    max_games = max(max_games, games_per_round)
+
+    def next_job():
+        # the open pairing with the fewest scheduled games
+        open_pairings = [p for p in pairings if not p.stopped and p.scheduled < max_games]
+        if not open_pairings:
+            return None
+        p = min(open_pairings, key=lambda p: p.scheduled)
+        games = min(games_per_round, max_games - p.scheduled)
+        job = (game, (p.a, p.b), (agents[p.a], agents[p.b]), games, p.scheduled, (seed, pairings.index(p), p.scheduled))
+        p.scheduled += games
+        return job
+
+    def collect(result):
+        (a, b), (wins, draws, losses) = result
+        p = next(p for p in pairings if (p.a, p.b) == (a, b))
+        p.played += wins + draws + losses
+        p.wins, p.draws, p.losses = p.wins + wins, p.draws + draws, p.losses + losses
+        ratings.add(a, b, wins + 0.5 * draws, wins + draws + losses)
+        ratings.fit()
+        if p.played >= min_games and ratings.separated(a, b, z):
+            p.stopped = True
+        if verbose:
+            low, high = ratings.diff_interval(a, b, z)
+            print("%s vs %s: %i games, +%i =%i -%i, diff [%.0f, %.0f]%s" % (a, b, p.played, p.wins, p.draws, p.losses, low, high, " (separated)" if p.stopped else ""))
+
+    t0 = time.perf_counter()
+    if processes == 1:
+        job = next_job()
+        while job is not None:
+            collect(_play_round(*job))
+            job = next_job()
+    else:
+        results = queue.Queue()
+        with mp.get_context('spawn').Pool(processes) as pool:
+            in_flight = 0
+            while True:
+                # keep every worker busy with one queued job
+                while in_flight < 2 * processes:
+                    job = next_job()
+                    if job is None:
+                        break
+                    pool.apply_async(_play_round, job, callback=results.put, error_callback=results.put)
+                    in_flight += 1
+                if in_flight == 0:
+                    break
+                result = results.get()
+                in_flight -= 1
+                if isinstance(result, BaseException):
+                    raise result
+                collect(result)
+
+    table = [
+        {'a': p.a, 'b': p.b, 'games': p.played, 'wins': p.wins, 'draws': p.draws, 'losses': p.losses}
+        for p in pairings
+    ]
+    if verbose:
+        print("%.1f sec" % (time.perf_counter() - t0))
+    return ratings, table
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m amusepark.tools.tournament', description='Round-robin tournament of board game agents with Bradley-Terry (Elo) ratings.')
+    parser.add_argument('--game', default='tictactoe', choices=list(GAMES))
+    parser.add_argument('--agents', nargs='+', default=['random', 'greedy'], help="'random', 'greedy' or 'package.module:factory' (name=spec to rename)")
+    parser.add_argument('--games-per-round', type=int, default=64)
+    parser.add_argument('--min-games', type=int, default=128)
+    parser.add_argument('--max-games', type=int, default=2048)
+    parser.add_argument('--z', type=float, default=3.)
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    agents = dict()
+    for spec in args.agents:
+        name, _, spec = spec.rpartition('=')
+        agents[name or spec] = partial(load_agent, spec)
+
+    ratings, table = run_tournament(
+        args.game, agents, args.games_per_round, args.min_games, args.max_games, args.z, args.processes, args.seed,
+        verbose=args.verbose,
+    )
+    elo, se = ratings.ratings(), ratings.stderr()
+    print("%-24s %8s %8s" % ("agent", "elo", "+/-"))
+    for i in np.argsort(-elo):
+        print("%-24s %8.0f %8.0f" % (ratings.names[i], elo[i], args.z * se[i]))
+    for row in table:
+        print("%(a)s vs %(b)s: %(games)i games, +%(wins)i =%(draws)i -%(losses)i" % row)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+import os
+import csv
+import time
+import argparse
+import importlib
+import multiprocessing as mp
+
+import numpy as np
+
+from amusepark.utils.path import data_path
+from amusepark.games.wordle import load_vocabulary, pattern_ids
+
+def _play_shard(policy, word_filename: str, guess_filename: str, guess_num: int, words: list, batch: int) -> tuple:
+    """ play every word of a shard with batches of envs stepped in lockstep; returns (results, policy calls) """
+    from amusepark.envs.wordle import WordleEnv
+
+    envs = [
+        WordleEnv(word_filename, guess_num=guess_num, action_mode='word', guess_filename=guess_filename)
+        for _ in range(min(batch, len(words)))
+    ]
+    vocab = envs[0].vocab if envs else None
+    # history ((guess id, pattern id), ...) -> guess id: games sharing a prefix ask the policy once
+    memo = dict()
+
+    results = []
+    for start in range(0, len(words), len(envs)):
+        chunk = words[start:start+len(envs)]
+        histories = [()] * len(chunk)
+        rewards = [0] * len(chunk)
+        for env, word in zip(envs, chunk):
+            env.reset(options={'hidden_word': word})
+
+        active = list(range(len(chunk)))
+        while len(active) > 0:
+            still = []
+            for k in active:
+                history = histories[k]
+                guess_id = memo.get(history)
+                if guess_id is None:
+                    guess_id = memo[history] = int(policy(history))
+                obs, rewards[k], done, _ = envs[k].step(guess_id)
+                histories[k] = history + ((guess_id, int(pattern_ids(obs['color'][len(history)]))),)
+                if not done:
+                    still.append(k)
+            active = still
+
+        for word, history, reward in zip(chunk, histories, rewards):
+            results.append({
+                'word': word,
+                'solved': reward > 0,
+                'guesses': len(history),
+                'path': ' '.join(vocab.words[g] for g, _ in history),
+            })
+    return results, len(memo)
+
+def evaluate_policy(policy, word_filename: str=None, guess_filename: str=None, guess_num: int=6, words: list=None,
+                    processes: int=1, batch: int=64) -> tuple:
+    r""" Exact scores of a deterministic policy (history -> word id, see tools/wordle_policies.py) on every hidden word
+
+    words    : the hidden words to play (default: every word of word_filename)
+    processes: number of worker processes, each playing an interleaved shard of the words
+    batch    : number of envs stepped in lockstep per worker
+    returns (results, stats): a per-word table (list of dicts: word, solved, guesses, path, in the order of `words`)
+    and the aggregate stats
+    """
+    if word_filename is None:
+        word_filename = os.path.join(data_path, 'wordle-hidden.txt')
+    if guess_filename is None:
+        guess_filename = os.path.join(data_path, 'wordle-allowed-guesses.txt')
+    if words is None:
+        vocab = load_vocabulary(word_filename, guess_filename)
+        words = vocab.words[:vocab.hidden_num]
+
+    t0 = time.perf_counter()
+    processes = max(1, min(processes, len(words)))
+    shards = [words[i::processes] for i in range(processes)]
+    args = [(policy, word_filename, guess_filename, guess_num, shard, batch) for shard in shards]
+    if processes == 1:
+        outputs = [_play_shard(*args[0])]
+    else:
+        with mp.get_context('spawn').Pool(processes) as pool:
+            outputs = pool.starmap(_play_shard, args)
+
+    # undo the interleaving
+    results = [None] * len(words)
+    for i, (shard_results, _) in enumerate(outputs):
+        results[i::processes] = shard_results
+
+    return results, summarize(results, guess_num, sum(calls for _, calls in outputs), time.perf_counter() - t0)
+
+def summarize(results: list, guess_num: int, policy_calls: int=None, time_sec: float=None) -> dict:
+    solved = np.array([r['solved'] for r in results], dtype=bool)
+    guesses = np.array([r['guesses'] for r in results], dtype=int)
+    distribution = {str(n): int(((guesses == n) & solved).sum()) for n in range(1, guess_num + 1)}
+    distribution['X'] = int((~solved).sum())
+    return {
+        'words': len(results),
+        'solved': int(solved.sum()),
+        'failure_rate': float((~solved).mean()) if len(results) else 0.,
+        # over the solved words
+        'avg_guesses': float(guesses[solved].mean()) if solved.any() else float('nan'),
+        'max_guesses': int(guesses[solved].max()) if solved.any() else 0,
+        'distribution': distribution,
+        'policy_calls': policy_calls,
+        'time_sec': time_sec,
+    }
+
+def save_results(results: list, filename: str):
+    with open(filename, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['word', 'solved', 'guesses', 'path'])
+        writer.writeheader()
+        writer.writerows(results)
+
+def load_policy(name: str, vocab, **kwargs):
+    """ 'greedy' or 'package.module:factory', the factory being called with the vocabulary """
+    if name == 'greedy':
+        from amusepark.tools.wordle_policies import GreedyPolicy
+        return GreedyPolicy(vocab, **kwargs)
+    module, attr = name.split(':')
+    return getattr(importlib.import_module(module), attr)(vocab)
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m amusepark.tools.wordle_eval', description='Exhaustive evaluation of a Wordle policy over all the hidden words.')
+    parser.add_argument('--policy', default='greedy', help="'greedy' or 'package.module:factory' (called with the vocabulary)")
+    parser.add_argument('--opener', default='salet', help='first guess of the greedy policy')
+    parser.add_argument('--pool', default='candidates', choices=['candidates', 'all'], help='guess pool of the greedy policy')
+    parser.add_argument('--word-file', default=os.path.join(data_path, 'wordle-hidden.txt'))
+    parser.add_argument('--guess-file', default=os.path.join(data_path, 'wordle-allowed-guesses.txt'))
+    parser.add_argument('--guess-num', type=int, default=6)
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--batch', type=int, default=64, help='envs stepped in lockstep per process')
+    parser.add_argument('--out', default=None, help='save the per-word results as CSV')
+    args = parser.parse_args()
+
+    vocab = load_vocabulary(args.word_file, args.guess_file)
+    kwargs = {'opener': args.opener, 'pool': args.pool} if args.policy == 'greedy' else {}
+    policy = load_policy(args.policy, vocab, **kwargs)
+
+    results, stats = evaluate_policy(policy, args.word_file, args.guess_file, args.guess_num, processes=args.processes, batch=args.batch)
+
+    print("words       : %i" % stats['words'])
+    print("solved      : %i" % stats['solved'])
+    print("failure rate: %.4f" % stats['failure_rate'])
+    print("avg guesses : %.4f" % stats['avg_guesses'])
+    print("distribution: %s" % ' '.join('%s:%i' % kv for kv in stats['distribution'].items()))
+    print("policy calls: %i (%.1f sec)" % (stats['policy_calls'], stats['time_sec']))
+
+    if args.out is not None:
+        save_results(results, args.out)
+
+if __name__ == '__main__':
+    main()
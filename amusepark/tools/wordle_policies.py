@@ -0,0 +1,43 @@
+import numpy as np
+
+from amusepark.games.wordle import Vocabulary, feedback, pattern_ids
+
+###### deterministic Wordle policies ######
+## A policy maps a history ((guess id, pattern id), ...) of one game to the next guess id of its vocabulary.
+## The same history always gets the same guess, so that evaluators can memoize the shared prefixes of the games.
+
+def candidates(vocab: Vocabulary, history: tuple) -> np.ndarray:
+    """ ids of the hidden words consistent with a history """
+    cand = vocab.hidden_ids()
+    for guess_id, pattern_id in history:
+        cand = cand[pattern_ids(feedback(vocab.encoded[guess_id], vocab.encoded[cand])) == pattern_id]
+    return cand
+
+class GreedyPolicy:
+    r""" Opener first, then the guess splitting the remaining candidates into the most feedback patterns
+
+    vocab (Vocabulary): the vocabulary of the env (word action mode)
+    opener(str)       : the first guess
+    pool  (str)       : 'candidates' (guess among the remaining candidates) or 'all' (among every word, slower)
+    Ties go to a remaining candidate, then to the lower word id.
+    """
+    def __init__(self, vocab: Vocabulary, opener: str='salet', pool: str='candidates'):
+        assert pool in ('candidates', 'all'), f"Invalid guess pool: {pool}!"
+        self.vocab = vocab
+        self.opener = vocab.index[opener]
+        self.pool = pool
+
+    def __call__(self, history: tuple) -> int:
+        if len(history) == 0:
+            return self.opener
+        cand = candidates(self.vocab, history)
+        if len(cand) <= 2:
+            return int(cand[0])
+
+        pool = cand if self.pool == 'candidates' else np.arange(len(self.vocab))
+        enc = self.vocab.encoded
+        # (guesses, candidates) pattern ids -> number of distinct patterns per guess
+        patterns = np.sort(pattern_ids(feedback(enc[pool][:, None, :], enc[cand][None, :, :])), axis=1)
+        splits = 1 + (np.diff(patterns, axis=1) != 0).sum(axis=1)
+        score = 2 * splits + np.isin(pool, cand)
+        return int(pool[np.argmax(score)])
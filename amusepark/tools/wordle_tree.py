@@ -0,0 +1,129 @@
+import os
+import time
+import argparse
+
+import numpy as np
+
+from amusepark.utils.path import data_path
+from amusepark.games.wordle import Vocabulary, load_vocabulary, feedback, pattern_ids
+
+###### Wordle strategies compiled into flat decision trees ######
+## tree: (nodes, 1 + 3**word_len) int32 array over the word ids of one vocabulary
+##   tree[node, 0]          : the guess of the node
+##   tree[node, 1 + pattern]: the child node after the feedback pattern id of that guess (0: none, the root is never
+##                            a child)
+## A game starts at the root (node 0); each move is one lookup. Trees are saved as .npy files and memory-mapped.
+
+ROOT = 0
+
+def compile_tree(policy, vocab: Vocabulary, guess_num: int=6) -> np.ndarray:
+    r""" Play a deterministic policy (history -> word id, see tools/wordle_policies.py) against every hidden word at
+    once and record its decisions
+
+    Each node holds the hidden words consistent with its history; they are split by the feedback of the node's
+    guess, and every non-solving pattern seen opens a child node (up to guess_num guesses).
+    """
+    enc = vocab.encoded
+    solved = 3 ** vocab.word_len - 1
+    rows = []
+    # (node, history, candidates), depth first
+    stack = [(ROOT, (), vocab.hidden_ids())]
+    rows.append(None)
+    while stack:
+        node, history, cand = stack.pop()
+        guess = int(policy(history))
+        row = np.zeros(1 + 3 ** vocab.word_len, dtype=np.int32)
+        row[0] = guess
+        if len(history) + 1 < guess_num:
+            pids = pattern_ids(feedback(enc[guess], enc[cand]))
+            for p in np.unique(pids):
+                if p == solved:
+                    continue
+                child = len(rows)
+                rows.append(None)
+                row[1 + p] = child
+                stack.append((child, history + ((guess, int(p)),), cand[pids == p]))
+        rows[node] = row
+    return np.stack(rows)
+
+def save_tree(tree: np.ndarray, filename: str):
+    np.save(filename, np.ascontiguousarray(tree, dtype=np.int32))
+
+def load_tree(filename: str, mmap: bool=True) -> np.ndarray:
+    """ the tree of a .npy file, memory-mapped (read-only) by default """
+    return np.load(filename, mmap_mode='r' if mmap else None)
+
+def tree_word_len(tree: np.ndarray) -> int:
+    word_len = int(round(np.log(tree.shape[1] - 1) / np.log(3)))
+    assert 3 ** word_len + 1 == tree.shape[1], f"Invalid tree shape: {tree.shape}!"
+    return word_len
+
+class TreePolicy:
+    r""" A compiled tree as a policy (history -> word id), e.g. for tools/wordle_eval.py
+
+    A history that leaves the tree (a hidden word outside the compiled word list) raises a KeyError.
+    """
+    def __init__(self, tree: np.ndarray):
+        self.tree = tree
+
+    def child(self, node: int, pattern: int) -> int:
+        child = int(self.tree[node, 1 + pattern])
+        if child == ROOT:
+            raise KeyError(f"Pattern {pattern} leaves the tree at node {node}!")
+        return child
+
+    def __call__(self, history: tuple) -> int:
+        node = ROOT
+        for _, pattern in history:
+            node = self.child(node, pattern)
+        return int(self.tree[node, 0])
+
+class TreeAgent(TreePolicy):
+    r""" Baseline agent of WordleEnv (word action mode) playing a compiled tree
+
+    reset() at the start of every game, then act(obs) per move: one pattern id from the last color row and one
+    lookup in the tree.
+    """
+    def __init__(self, tree: np.ndarray):
+        super().__init__(tree)
+        self._weights = 3 ** np.arange(tree_word_len(tree))
+        self.reset()
+
+    def reset(self):
+        self.node = ROOT
+        self.turn = 0
+
+    def act(self, obs: dict) -> int:
+        if self.turn > 0:
+            self.node = self.child(self.node, int(obs['color'][self.turn - 1] @ self._weights))
+        self.turn += 1
+        return int(self.tree[self.node, 0])
+
+def main():
+    from amusepark.tools.wordle_eval import evaluate_policy, load_policy
+
+    parser = argparse.ArgumentParser(prog='python -m amusepark.tools.wordle_tree', description='Compile a deterministic Wordle policy into a decision tree.')
+    parser.add_argument('--policy', default='greedy', help="'greedy' or 'package.module:factory' (called with the vocabulary)")
+    parser.add_argument('--opener', default='salet', help='first guess of the greedy policy')
+    parser.add_argument('--word-file', default=os.path.join(data_path, 'wordle-hidden.txt'))
+    parser.add_argument('--guess-file', default=os.path.join(data_path, 'wordle-allowed-guesses.txt'))
+    parser.add_argument('--guess-num', type=int, default=6)
+    parser.add_argument('--out', default='wordle-tree.npy')
+    parser.add_argument('--evaluate', action='store_true', help='evaluate the saved tree with wordle_eval')
+    args = parser.parse_args()
+
+    vocab = load_vocabulary(args.word_file, args.guess_file)
+    kwargs = {'opener': args.opener} if args.policy == 'greedy' else {}
+    policy = load_policy(args.policy, vocab, **kwargs)
+
+    t0 = time.perf_counter()
+    tree = compile_tree(policy, vocab, args.guess_num)
+    save_tree(tree, args.out)
+    print("%i nodes (%.1f MB) compiled in %.1f sec -> %s" % (len(tree), tree.nbytes / 2**20, time.perf_counter() - t0, args.out))
+
+    if args.evaluate:
+        _, stats = evaluate_policy(TreePolicy(load_tree(args.out)), args.word_file, args.guess_file, args.guess_num)
+        print("solved %i/%i, avg guesses %.4f" % (stats['solved'], stats['words'], stats['avg_guesses']))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+import numpy as np
+
+OBS_MODES = ('view', 'copy', 'int8')
+
+class ObservationEmitter:
+    r""" Turns an env's internal state array into the returned observation
+
+    mode:
+        view: return the internal array itself (legacy behavior: it changes in place with the next step)
+        copy: return a fresh copy of the internal array
+        int8: write an int8 copy into a buffer and return the buffer. The buffer is preallocated, or provided by the
+              caller (e.g. a slot of a replay buffer) with set_buffer. It is overwritten by the next step, so callers
+              either consume it right away or point the emitter to a new buffer before stepping.
+    """
+    def __init__(self, shape: tuple, mode: str='view'):
+        assert mode in OBS_MODES, f"Invalid observation mode: {mode}!"
+        self.shape = tuple(shape)
+        self.mode = mode
+        self.dtype = np.int8 if mode == 'int8' else int
+        self.buffer = np.zeros(self.shape, dtype=np.int8) if mode == 'int8' else None
+
+    def set_buffer(self, out: np.ndarray=None):
+        """ write the next observations into `out` (None: back to the preallocated buffer) """
+        assert self.mode == 'int8', "Buffers are only used in the int8 observation mode!"
+        if out is None:
+            out = np.zeros(self.shape, dtype=np.int8)
+        assert out.shape == self.shape, f"Invalid buffer shape: {out.shape}, expected {self.shape}!"
+        assert out.dtype == np.int8, f"Invalid buffer dtype: {out.dtype}, expected int8!"
+        self.buffer = out
+
+    def __call__(self, state: np.ndarray) -> np.ndarray:
+        if self.mode == 'view':
+            return state
+        if self.mode == 'copy':
+            return state.copy()
+        np.copyto(self.buffer, state, casting='unsafe')
+        return self.buffer
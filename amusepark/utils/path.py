@@ -1,10 +1,11 @@
 import os
 
 cur_path = os.path.dirname(os.path.realpath(__file__))
-root_path = os.path.join(cur_path[:cur_path.find('/amusepark')], 'amusepark')
+# <root>/amusepark/utils -> <root>
+root_path = os.path.dirname(os.path.dirname(cur_path))
 data_path = os.path.join(root_path, 'data')
 
 if __name__ == '__main__':
     print(cur_path)
     print(root_path)
-    print(data_path)
\ No newline at end of file
+    print(data_path)
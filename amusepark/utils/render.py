@@ -0,0 +1,123 @@
+import numpy as np
+
+from amusepark.utils.text_attr import Foreground, Background
+
+TILE = 16 # sprite size in pixels
+GRID_RGB = (64, 64, 64)
+
+### RGB of the ANSI colors ###
+NAME2RGB = {
+    'RESET': (240, 240, 240),
+    'BLACK': (0, 0, 0),
+    'RED': (205, 49, 49),
+    'GREEN': (13, 188, 121),
+    'BROWN': (196, 160, 0),
+    'BLUE': (36, 114, 200),
+    'PURPLE': (188, 63, 188),
+    'CYAN': (17, 168, 205),
+    'LIGHT_GRAY': (200, 200, 200),
+    'DARK_GRAY': (102, 102, 102),
+    'LIGHT_RED': (241, 76, 76),
+    'LIGHT_GREEN': (35, 209, 139),
+    'YELLOW': (245, 245, 67),
+    'LIGHT_BLUE': (59, 142, 234),
+    'LIGHT_PURPLE': (214, 112, 214),
+    'LIGHT_CYAN': (41, 184, 219),
+    'LIGHT_WHITE': (255, 255, 255),
+}
+CODE2RGB = {
+    getattr(attr, name): rgb
+    for attr in (Foreground, Background) for name, rgb in NAME2RGB.items() if hasattr(attr, name)
+}
+
+def code2rgb(code: str) -> tuple:
+    """ RGB of an ANSI color code of text_attr """
+    return CODE2RGB[code]
+
+### 5x7 font: one 5-bit integer per row ###
+FONT = {
+    'a': (0x0E, 0x11, 0x11, 0x1F, 0x11, 0x11, 0x11), 'b': (0x1E, 0x11, 0x11, 0x1E, 0x11, 0x11, 0x1E),
+    'c': (0x0E, 0x11, 0x10, 0x10, 0x10, 0x11, 0x0E), 'd': (0x1E, 0x11, 0x11, 0x11, 0x11, 0x11, 0x1E),
+    'e': (0x1F, 0x10, 0x10, 0x1E, 0x10, 0x10, 0x1F), 'f': (0x1F, 0x10, 0x10, 0x1E, 0x10, 0x10, 0x10),
+    'g': (0x0E, 0x11, 0x10, 0x17, 0x11, 0x11, 0x0F), 'h': (0x11, 0x11, 0x11, 0x1F, 0x11, 0x11, 0x11),
+    'i': (0x0E, 0x04, 0x04, 0x04, 0x04, 0x04, 0x0E), 'j': (0x07, 0x02, 0x02, 0x02, 0x02, 0x12, 0x0C),
+    'k': (0x11, 0x12, 0x14, 0x18, 0x14, 0x12, 0x11), 'l': (0x10, 0x10, 0x10, 0x10, 0x10, 0x10, 0x1F),
+    'm': (0x11, 0x1B, 0x15, 0x15, 0x11, 0x11, 0x11), 'n': (0x11, 0x11, 0x19, 0x15, 0x13, 0x11, 0x11),
+    'o': (0x0E, 0x11, 0x11, 0x11, 0x11, 0x11, 0x0E), 'p': (0x1E, 0x11, 0x11, 0x1E, 0x10, 0x10, 0x10),
+    'q': (0x0E, 0x11, 0x11, 0x11, 0x15, 0x12, 0x0D), 'r': (0x1E, 0x11, 0x11, 0x1E, 0x14, 0x12, 0x11),
+    's': (0x0F, 0x10, 0x10, 0x0E, 0x01, 0x01, 0x1E), 't': (0x1F, 0x04, 0x04, 0x04, 0x04, 0x04, 0x04),
+    'u': (0x11, 0x11, 0x11, 0x11, 0x11, 0x11, 0x0E), 'v': (0x11, 0x11, 0x11, 0x11, 0x11, 0x0A, 0x04),
+    'w': (0x11, 0x11, 0x11, 0x15, 0x15, 0x15, 0x0A), 'x': (0x11, 0x11, 0x0A, 0x04, 0x0A, 0x11, 0x11),
+    'y': (0x11, 0x11, 0x0A, 0x04, 0x04, 0x04, 0x04), 'z': (0x1F, 0x01, 0x02, 0x04, 0x08, 0x10, 0x1F),
+}
+
+###### sprite masks (size x size booleans) ######
+
+def _coords(size: int):
+    # pixel centers in [-1, 1]
+    c = (np.arange(size) + 0.5) / size * 2 - 1
+    return np.meshgrid(c, c, indexing='ij')
+
+def disc_mask(radius: float, size: int=TILE) -> np.ndarray:
+    y, x = _coords(size)
+    return y**2 + x**2 <= radius**2
+
+def ring_mask(radius: float, width: float=0.25, size: int=TILE) -> np.ndarray:
+    return disc_mask(radius, size) & ~disc_mask(radius - width, size)
+
+def cross_mask(width: float=0.2, size: int=TILE) -> np.ndarray:
+    y, x = _coords(size)
+    inside = (np.abs(y) <= 0.7) & (np.abs(x) <= 0.7)
+    return inside & ((np.abs(y - x) <= width) | (np.abs(y + x) <= width))
+
+def arrow_mask(di: int, dj: int, size: int=TILE) -> np.ndarray:
+    """ triangle pointing in the direction (di, dj) on the (row, column) grid """
+    y, x = _coords(size)
+    forward = di * y + dj * x
+    lateral = dj * y - di * x
+    return (forward >= -0.6) & (np.abs(lateral) <= (0.6 - forward) * 0.7)
+
+def text_mask(char: str, size: int=TILE) -> np.ndarray:
+    mask = np.zeros((size, size), dtype=bool)
+    if char.lower() not in FONT:
+        return mask
+    bits = np.array([[(row >> (4 - k)) & 1 for k in range(5)] for row in FONT[char.lower()]], dtype=bool)
+    scale = max(size // 8, 1)
+    glyph = bits.repeat(scale, axis=0).repeat(scale, axis=1)
+    h, w = glyph.shape
+    i0, j0 = (size - h) // 2, (size - w) // 2
+    mask[i0:i0+h, j0:j0+w] = glyph
+    return mask
+
+def sprite(bg: tuple, fg: tuple=None, mask: np.ndarray=None, size: int=TILE, border: tuple=GRID_RGB) -> np.ndarray:
+    """ (size, size, 3) uint8 tile: background color, optional foreground mask and a 1-pixel border """
+    tile = np.empty((size, size, 3), dtype=np.uint8)
+    tile[...] = bg
+    if mask is not None:
+        tile[mask] = fg
+    if border is not None:
+        tile[-1, :] = border
+        tile[:, -1] = border
+    return tile
+
+class TileRenderer:
+    r""" Blits cached sprites into a preallocated RGB frame
+
+    sprites  ((T, th, tw, 3) uint8): the tile sprites
+    grid_shape(tuple)              : (H, W) cells
+    __call__(tile_ids) takes (H, W) sprite indices and returns the (H*th, W*tw, 3) frame. The frame is reused
+    by the next call: copy it if it has to be kept (e.g. when buffering a video).
+    """
+    def __init__(self, sprites: np.ndarray, grid_shape: tuple):
+        self.sprites = np.ascontiguousarray(sprites, dtype=np.uint8)
+        H, W = grid_shape
+        _, th, tw, _ = self.sprites.shape
+        self.frame = np.zeros((H * th, W * tw, 3), dtype=np.uint8)
+        # the frame seen as (H, th, W, tw, 3) blocks
+        self._blocks = self.frame.reshape(H, th, W, tw, 3)
+        self._tiles = np.empty((H, W, th, tw, 3), dtype=np.uint8)
+
+    def __call__(self, tile_ids: np.ndarray) -> np.ndarray:
+        np.take(self.sprites, tile_ids, axis=0, out=self._tiles)
+        self._blocks[...] = self._tiles.transpose(0, 2, 1, 3, 4)
+        return self.frame
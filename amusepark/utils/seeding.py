@@ -0,0 +1,10 @@
+import numpy as np
+
+def episode_seed(seed: int, episode: int) -> int:
+    r""" Counter-based seed of one episode
+
+    The seed only depends on (seed, episode), so episode i is reproducible no matter which worker (or node) runs it,
+    and evaluations sharded over episode ranges can be merged bit-for-bit.
+    """
+    state = np.random.SeedSequence(seed, spawn_key=(episode,)).generate_state(2, dtype=np.uint32)
+    return int(state[0]) << 32 | int(state[1])
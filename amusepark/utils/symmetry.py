@@ -0,0 +1,138 @@
+import numpy as np
+from functools import lru_cache
+
+###### the 8 symmetries (dihedral group D4) of a square board ######
+## t = 0..3: rotations by t*90 degrees (counter-clockwise); t = 4..7: the transpose followed by the same rotations
+
+def _transform(x: np.ndarray, t: int) -> np.ndarray:
+    # x: (n, n)
+    return np.rot90(x.T if t >= 4 else x, t % 4)
+
+@lru_cache(maxsize=None)
+def board_perms(n: int) -> tuple:
+    """ (perms, inverse): (8, n*n) index tables, transform(board, t).flat == board.flat[perms[t]] """
+    idx = np.arange(n * n).reshape(n, n)
+    perms = np.stack([_transform(idx, t).reshape(-1) for t in range(8)])
+    inverse = np.argsort(perms, axis=1)
+    perms.setflags(write=False)
+    inverse.setflags(write=False)
+    return perms, inverse
+
+def direction_perms(n: int, directions: dict) -> np.ndarray:
+    """ (8, len(directions)): direction d of a board moves in direction table[t][d] on its transform t """
+    perms, inverse = board_perms(n)
+    # follow a move from an inner cell through each transform
+    c = n // 2
+    dirs = {tuple(v): k for k, v in directions.items()}
+    table = np.zeros((8, len(directions)), dtype=int)
+    for t in range(8):
+        src = inverse[t][c * n + c]
+        for d, (di, dj) in directions.items():
+            dst = inverse[t][(c + di) * n + (c + dj)]
+            table[t, d] = dirs[(dst // n - src // n, dst % n - src % n)]
+    return table
+
+class BoardSymmetry:
+    r""" Canonical forms and symmetric variants of n x n boards, by precomputed permutation tables
+
+    n         (int) : board size
+    directions(dict): action -> (di, dj) if the actions are moving directions (e.g. TraverseMazeEnv); by default the
+                      actions are the cells of the board (TicTacToeEnv, the positions of GobbletEnv)
+    Boards are (..., n, n) arrays; action masks and policies are (..., num_actions) arrays over the actions. Every
+    transform of a batch is a single np.take.
+    """
+    def __init__(self, n: int, directions: dict=None):
+        self.n = n
+        self.perms, self.inverse = board_perms(n)
+        if directions is None:
+            # actions: cells, transformed as the board
+            self.action_perms = self.perms
+            self.action_map = self.inverse
+        else:
+            self.action_map = direction_perms(n, directions)
+            self.action_perms = np.argsort(self.action_map, axis=1)
+
+    def transform(self, board: np.ndarray, t: int) -> np.ndarray:
+        board = np.asarray(board)
+        flat = board.reshape(board.shape[:-2] + (-1,))
+        return np.take(flat, self.perms[t], axis=-1).reshape(board.shape)
+
+    def variants(self, board: np.ndarray) -> np.ndarray:
+        """ (8, ..., n, n): the board under every symmetry """
+        board = np.asarray(board)
+        flat = board.reshape(board.shape[:-2] + (-1,))
+        out = np.take(flat, self.perms, axis=-1) # (..., 8, n*n)
+        return np.moveaxis(out, -2, 0).reshape((8,) + board.shape)
+
+    def transform_action(self, action: int, t: int) -> int:
+        """ the action on the transform t of a board that matches `action` on the board """
+        return int(self.action_map[t][action])
+
+    def _argmin_lex(self, flat: np.ndarray) -> np.ndarray:
+        # flat: (B, 8, n*n) -> index of the lexicographically smallest of the 8 rows per batch
+        alive = np.ones(flat.shape[:2], dtype=bool)
+        big = np.iinfo(np.int64).max
+        for p in range(flat.shape[2]):
+            vals = np.where(alive, flat[:, :, p], big)
+            alive &= vals == vals.min(axis=1, keepdims=True)
+            if (alive.sum(axis=1) == 1).all():
+                break
+        return alive.argmax(axis=1)
+
+    def canonical(self, board: np.ndarray) -> tuple:
+        r""" (canonical board, t): the lexicographically smallest variant and the symmetry mapping the board to it
+
+        Also takes (B, n, n) batches (then t is a (B,) array).
+        """
+        board = np.asarray(board)
+        if board.ndim == 2:
+            flat = np.take(board.reshape(-1), self.perms) # (8, n*n)
+            rows = flat.tolist()
+            t = min(range(8), key=rows.__getitem__)
+            return flat[t].reshape(board.shape), t
+        batch = board.reshape(-1, self.n * self.n)
+        flat = np.take(batch, self.perms, axis=-1) # (B, 8, n*n)
+        t = self._argmin_lex(flat.astype(np.int64, copy=False))
+        return flat[np.arange(len(batch)), t].reshape(board.shape), t
+
+    def key(self, board: np.ndarray) -> bytes:
+        """ hashable canonical form of one board (e.g. for transposition tables) """
+        return self.canonical(board)[0].tobytes()
+
+    def augment(self, obs: np.ndarray, mask: np.ndarray=None, policy: np.ndarray=None) -> tuple:
+        r""" All 8 symmetric variants of an (obs, action mask, policy) sample or batch
+
+        obs (..., n, n) -> (8, ..., n, n); mask and policy (..., num_actions) -> (8, ..., num_actions), or None
+        """
+        out = [self.variants(obs)]
+        for x in (mask, policy):
+            if x is None:
+                out.append(None)
+            else:
+                x = np.asarray(x)
+                out.append(np.moveaxis(np.take(x, self.action_perms, axis=-1), -2, 0))
+        return tuple(out)
+
+if __name__ == '__main__':
+    # distinct Tic-Tac-Toe positions reachable in play, and how many of them are distinct up to symmetry
+    sym = BoardSymmetry(3)
+
+    def wins(b: np.ndarray, p: int) -> bool:
+        lines = list(b) + list(b.T) + [b.diagonal(), np.fliplr(b).diagonal()]
+        return any((line == p).all() for line in lines)
+
+    seen, canon = set(), set()
+    frontier = [(np.zeros((3, 3), dtype=int), 1)]
+    while frontier:
+        board, p = frontier.pop()
+        if board.tobytes() in seen:
+            continue
+        seen.add(board.tobytes())
+        canon.add(sym.key(board))
+        if wins(board, -p) or (board != 0).all():
+            continue
+        for c in np.flatnonzero(board == 0):
+            nxt = board.copy()
+            nxt.flat[c] = p
+            frontier.append((nxt, -p))
+    print("Tic-Tac-Toe positions: %i, up to symmetry: %i" % (len(seen), len(canon)))
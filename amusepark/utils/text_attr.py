@@ -1,17 +1,33 @@
-class Attr:
-    RESET = "\033[0m"
+import re
+import sys
+import platform
+
+_is_terminal = None
 
-    # cancel SGR codes if we don't write to a terminal
-    if not __import__("sys").stdout.isatty():
-        for _ in dir():
-            if isinstance(_, str) and _[0] != "_":
-                locals()[_] = ""
-    else:
-        # set Windows console in VT mode
-        if __import__("platform").system() == "Windows":
+def init_terminal() -> bool:
+    r""" Probe the terminal once, at the first render instead of at import time
+
+    Sets the Windows console in VT mode and returns whether stdout is a terminal.
+    """
+    global _is_terminal
+    if _is_terminal is None:
+        _is_terminal = sys.stdout.isatty()
+        if _is_terminal and platform.system() == "Windows":
             kernel32 = __import__("ctypes").windll.kernel32
             kernel32.SetConsoleMode(kernel32.GetStdHandle(-11), 7)
-            del kernel32
+    return _is_terminal
+
+# SGR escape sequences
+_SGR = re.compile(r"\033\[[0-9;]*m")
+
+def write_frame(frame: str):
+    """ write a rendered frame to stdout at once; SGR codes are dropped if we don't write to a terminal """
+    if not init_terminal():
+        frame = _SGR.sub("", frame)
+    sys.stdout.write(frame)
+
+class Attr:
+    RESET = "\033[0m"
 
 class Foreground(Attr):
     """ ANSI color codes """
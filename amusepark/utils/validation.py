@@ -0,0 +1,131 @@
+import numpy as np
+from gym import spaces
+
+def _trusted(action) -> bool:
+    return True
+
+def _as_int(action):
+    # the integers accepted by spaces.Discrete.contains: int (and bool), NumPy integer scalars and 0-d integer
+    # arrays -> int; otherwise None
+    if isinstance(action, int):
+        return int(action)
+    if isinstance(action, (np.generic, np.ndarray)) and action.shape == () and action.dtype.kind in 'iu':
+        return int(action)
+    return None
+
+def _discrete_checker(space: spaces.Discrete):
+    low = int(getattr(space, 'start', 0))
+    high = low + int(space.n)
+    def check(action) -> bool:
+        if type(action) is not int:
+            action = _as_int(action)
+            if action is None:
+                return False
+        return low <= action < high
+    return check
+
+def _multi_discrete_checker(space: spaces.MultiDiscrete):
+    shape = space.shape
+    nvec = space.nvec.flatten().tolist()
+    size = len(nvec)
+    # all dims share the same range (e.g. Wordle's letters): a single min/max test
+    uniform = nvec[0] if len(set(nvec)) == 1 else None
+    def in_range(values: list) -> bool:
+        if uniform is not None:
+            return 0 <= min(values) and max(values) < uniform
+        return all(0 <= v < n for v, n in zip(values, nvec))
+    def check(action) -> bool:
+        # fast paths: integer arrays and flat lists/tuples of ints; anything else (bool/float values, nested
+        # lists, NumPy scalars in lists) goes through space.contains, which promotes it to an array
+        if isinstance(action, np.ndarray) and action.dtype.kind in 'iu':
+            return action.shape == shape and in_range(action.ravel().tolist())
+        if isinstance(action, (tuple, list)) and len(shape) == 1 and all(type(v) is int for v in action):
+            return len(action) == size and in_range(action)
+        return space.contains(action)
+    return check
+
+def _tuple_checker(space: spaces.Tuple):
+    size = len(space.spaces)
+    if all(isinstance(s, spaces.Discrete) for s in space.spaces):
+        # tuple of Discrete's (e.g. Gobblet's (piece, position)): inline the range checks
+        ranges = [(int(getattr(s, 'start', 0)), int(getattr(s, 'start', 0)) + int(s.n)) for s in space.spaces]
+        def check(action) -> bool:
+            # lists and arrays are promoted to tuples as in spaces.Tuple.contains
+            if not isinstance(action, (tuple, list, np.ndarray)) or len(action) != size:
+                return False
+            for a, (low, high) in zip(action, ranges):
+                if type(a) is not int:
+                    a = _as_int(a)
+                    if a is None:
+                        return False
+                if not low <= a < high:
+                    return False
+            return True
+        return check
+
+    checkers = [make_action_checker(s) for s in space.spaces]
+    def check(action) -> bool:
+        if isinstance(action, (list, np.ndarray)):
+            action = tuple(action)
+        if not isinstance(action, tuple) or len(action) != size:
+            return False
+        for checker, a in zip(checkers, action):
+            if not checker(a):
+                return False
+        return True
+    return check
+
+def make_action_checker(space: spaces.Space, trusted: bool=False):
+    r""" Build a specialized replacement of space.contains for actions
+
+    Discrete, MultiDiscrete and Tuple spaces get plain range checks on Python ints (no array allocation
+    or dtype conversion); other spaces fall back to space.contains. The checks accept exactly the actions that
+    space.contains accepts: the fast paths only skip work.
+    trusted(bool): the caller guarantees valid actions (e.g. a vectorized caller); the check is skipped.
+    """
+    if trusted:
+        return _trusted
+    if isinstance(space, spaces.Discrete):
+        return _discrete_checker(space)
+    if isinstance(space, spaces.MultiDiscrete):
+        return _multi_discrete_checker(space)
+    if isinstance(space, spaces.Tuple):
+        return _tuple_checker(space)
+    return space.contains
+
+if __name__ == '__main__':
+    from timeit import timeit
+
+    for space, action in [
+        (spaces.Discrete(9), 4),
+        (spaces.MultiDiscrete([26] * 5), np.array([1, 2, 3, 4, 5])),
+        (spaces.Tuple((spaces.Discrete(12, start=1), spaces.Discrete(16))), (12, 15)),
+    ]:
+        check = make_action_checker(space)
+        assert check(action) == space.contains(action)
+        t_gym = timeit(lambda: space.contains(action), number=10000) * 100
+        t_fast = timeit(lambda: check(action), number=10000) * 100
+        print("{:50s} gym: {:.2f} us, fast: {:.2f} us".format(str(space), t_gym, t_fast))
+
+    # same verdicts as space.contains on edge cases (including the inputs it raises on)
+    def verdict(fn, action):
+        try:
+            return fn(action)
+        except Exception as e:
+            return type(e)
+    tuple_mixed = spaces.Tuple((spaces.Discrete(3), spaces.MultiDiscrete([2, 2])))
+    actions = [
+        0, 4, 12, 16, -1, True, False, 1.0, np.int8(3), np.uint16(15), np.float32(2), np.bool_(True), np.array(3),
+        np.array([3]), np.array(3.), '3', None, [1, 2, 3, 4, 5], (1, 2, 3, 4, 26), [True, 0, 1, 2, 3],
+        np.array([1, 2, 3, 4, 5]), np.array([1., 2., 3., 4., 5.]), np.array([1.5, 2, 3, 4, 5]),
+        np.array([True, False, True, True, True]), np.array([[1, 2, 3, 4, 5]]), [np.int64(1), 2, 3, 4, 5],
+        [12, 15], (12, 15), np.array([12, 15]), np.array([12., 15.]), [True, 1], (0, 16), (12, 15, 0), [0, [1, 0]],
+        (2, np.array([1, 1])), [1, (1, 2)],
+    ]
+    for space in [spaces.Discrete(9), spaces.Discrete(12, start=1), spaces.MultiDiscrete([26] * 5),
+                  spaces.MultiDiscrete([3, 5, 2, 9, 4]), spaces.Tuple((spaces.Discrete(12, start=1), spaces.Discrete(16))),
+                  tuple_mixed]:
+        check = make_action_checker(space)
+        for action in actions:
+            assert verdict(check, action) == verdict(space.contains, action), f"{space}: {action!r}"
+    print("same verdicts as space.contains: ok")
@@ -0,0 +1,23 @@
+import importlib
+
+# name -> module; imported on first access (so that `python -m amusepark.vector.<module>` runs a fresh module)
+_VECTOR = {
+    'AsyncEnvPool': 'amusepark.vector.async_pool',
+    'RolloutServer': 'amusepark.vector.rollout',
+    'RolloutClient': 'amusepark.vector.rollout',
+    'spawn_servers': 'amusepark.vector.rollout',
+    'TicTacToeVecEnv': 'amusepark.vector.tictactoe',
+    'MoveArrowVecEnv': 'amusepark.vector.isoland',
+}
+
+__all__ = list(_VECTOR)
+
+def __getattr__(name: str):
+    if name in _VECTOR:
+        attr = getattr(importlib.import_module(_VECTOR[name]), name)
+        globals()[name] = attr
+        return attr
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(_VECTOR))
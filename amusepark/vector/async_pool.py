@@ -0,0 +1,281 @@
+import time
+import asyncio
+import queue
+import threading
+import traceback
+import multiprocessing as mp
+
+import numpy as np
+
+from amusepark.utils.seeding import episode_seed
+
+BACKENDS = ('thread', 'process')
+# seconds between liveness checks of the workers while waiting for results
+POLL_INTERVAL = 1.
+
+class EnvError(RuntimeError):
+    r""" An env (or its worker) failed while a batch was received
+
+    results: (obs, rewards, dones, infos, env_ids) of the envs of the batch that did not fail (None if all failed)
+    """
+    def __init__(self, message: str, results: tuple=None):
+        super().__init__(message)
+        self.results = results
+
+def _snapshot(x):
+    # copy arrays so that results stay valid while the env keeps stepping
+    if isinstance(x, np.ndarray):
+        return x.copy()
+    if isinstance(x, dict):
+        return {k: _snapshot(v) for k, v in x.items()}
+    return x
+
+def _stack(items: list):
+    if isinstance(items[0], dict):
+        return {k: _stack([item[k] for item in items]) for k in items[0]}
+    return np.stack([np.asarray(item) for item in items])
+
+def _next_episode(counter) -> int:
+    with counter.get_lock():
+        episode = counter.value
+        counter.value += 1
+    return episode
+
+def _worker(env_idx: int, env_fn, commands, results, auto_reset: bool, seed: int, counter):
+    # a failed construction is reported as the result of every command
+    try:
+        env, failure = env_fn(), None
+    except Exception:
+        env, failure = None, traceback.format_exc()
+    episode = None
+
+    def reset():
+        nonlocal episode
+        if seed is None:
+            return _snapshot(env.reset())
+        # counter-based seeding: the episode index alone decides the seed
+        episode = _next_episode(counter)
+        return _snapshot(env.reset(seed=episode_seed(seed, episode)))
+
+    while True:
+        cmd, data = commands.get()
+        try:
+            if failure is not None:
+                if cmd == 'close':
+                    break
+                results.put((env_idx, None, None, None, {'error': failure}))
+            elif cmd == 'step':
+                obs, reward, done, info = env.step(data)
+                obs, info = _snapshot(obs), _snapshot(info)
+                if episode is not None:
+                    info['episode'] = episode
+                if done and auto_reset:
+                    # keep the last observation of the finished episode
+                    info['terminal_observation'] = obs
+                    obs = reset()
+                results.put((env_idx, obs, reward, done, info))
+            elif cmd == 'reset':
+                obs = reset()
+                results.put((env_idx, obs, 0, False, {} if episode is None else {'episode': episode}))
+            elif cmd == 'close':
+                env.close()
+                break
+            else:
+                raise NotImplementedError(f"Unknown command: {cmd}!")
+        except Exception:
+            results.put((env_idx, None, None, None, {'error': traceback.format_exc()}))
+
+class AsyncEnvPool:
+    r""" Asynchronous pool of envs stepped by worker threads or processes
+
+    The pool follows a send/recv split: `send` dispatches actions to a subset of the envs and returns immediately,
+    `recv` blocks until `batch_size` envs have finished and returns their results. Slow envs (e.g. a long Gobblet
+    game in dynamic mode) therefore never block the envs which are already done.
+
+    env_fns   (list)  : callables creating the envs (picklable for the process backend)
+    batch_size(int)   : number of env results returned by each `recv` (default: all envs)
+    backend   (str)   : 'thread' or 'process'
+    auto_reset(bool)  : reset an env as soon as its episode is done;
+                        the last observation is kept in info['terminal_observation']
+    seed      (int)   : if given, the k-th episode started by the pool (counting from `first_episode`, over all
+                        envs) is reset with episode_seed(seed, k) and reported in info['episode'];
+                        episode k is then reproducible independently of the number of workers
+
+    recv returns (obs, rewards, dones, infos, env_ids), where obs/rewards/dones are stacked along the first axis.
+    A failing env (or a dead worker process) raises an EnvError once the rest of the batch is received.
+    """
+    def __init__(self, env_fns: list, batch_size: int=None, backend: str='thread', auto_reset: bool=True, seed: int=None, first_episode: int=0, start_method: str=None):
+        assert backend in BACKENDS, f"Invalid backend: {backend}!"
+        self.num_envs = len(env_fns)
+        self.batch_size = self.num_envs if batch_size is None else batch_size
+        assert 0 < self.batch_size <= self.num_envs, f"Invalid batch size: {self.batch_size}!"
+        self.backend = backend
+
+        # envs whose results have not been received yet
+        self._busy = set()
+        self._closed = False
+
+        # workers (sharing the episode counter)
+        ctx = mp.get_context(start_method)
+        self._episode_counter = ctx.Value('q', first_episode)
+        if backend == 'thread':
+            self._results = queue.Queue()
+            self._commands = [queue.Queue() for _ in range(self.num_envs)]
+            self._workers = [
+                threading.Thread(target=_worker, args=(i, fn, self._commands[i], self._results, auto_reset, seed, self._episode_counter), daemon=True)
+                for i, fn in enumerate(env_fns)
+            ]
+        else:
+            self._results = ctx.Queue()
+            self._commands = [ctx.Queue() for _ in range(self.num_envs)]
+            self._workers = [
+                ctx.Process(target=_worker, args=(i, fn, self._commands[i], self._results, auto_reset, seed, self._episode_counter), daemon=True)
+                for i, fn in enumerate(env_fns)
+            ]
+        for w in self._workers:
+            w.start()
+
+    def _dispatch(self, cmd: str, data: list, env_ids):
+        if env_ids is None:
+            env_ids = range(self.num_envs)
+        assert len(env_ids) == len(data), f"{len(data)} commands for {len(env_ids)} envs!"
+        for env_idx, d in zip(env_ids, data):
+            env_idx = int(env_idx)
+            assert env_idx not in self._busy, f"Env {env_idx} is still running!"
+            self._busy.add(env_idx)
+            self._commands[env_idx].put((cmd, d))
+
+    def send(self, actions, env_ids=None):
+        """ dispatch actions[k] to env env_ids[k] (default: all envs) without waiting """
+        self._dispatch('step', actions, env_ids)
+
+    def async_reset(self, env_ids=None):
+        """ dispatch a reset to the given envs (default: all envs) without waiting """
+        n = self.num_envs if env_ids is None else len(env_ids)
+        self._dispatch('reset', [None] * n, env_ids)
+
+    def _get_result(self, deadline: float):
+        # the next result, checking the workers of the running envs while waiting
+        while True:
+            wait = POLL_INTERVAL if deadline is None else min(POLL_INTERVAL, deadline - time.monotonic())
+            if wait <= 0:
+                raise TimeoutError(f"No result from envs {sorted(self._busy)}!")
+            try:
+                return self._results.get(timeout=wait)
+            except queue.Empty:
+                pass
+            dead = [i for i in self._busy if not self._workers[i].is_alive()]
+            if dead:
+                for env_idx in dead:
+                    self._busy.discard(env_idx)
+                return None, dead
+
+    def recv(self, batch_size: int=None, timeout: float=None):
+        """ wait for the first `batch_size` envs to finish (at most `timeout` seconds) """
+        batch_size = min(self.batch_size if batch_size is None else batch_size, len(self._busy))
+        assert batch_size > 0, "No env is running!"
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        results, errors = [], []
+        while len(results) + len(errors) < batch_size and self._busy:
+            result = self._get_result(deadline)
+            if result[0] is None: # dead workers
+                errors += [f"Env {env_idx} failed: its worker died!" for env_idx in result[1]]
+                continue
+            env_idx, info = result[0], result[4]
+            self._busy.discard(env_idx)
+            if 'error' in info:
+                errors.append(f"Env {env_idx} failed:\n{info['error']}")
+            else:
+                results.append(result)
+
+        if results:
+            env_ids, obs, rewards, dones, infos = zip(*results)
+            results = _stack(obs), np.array(rewards), np.array(dones), list(infos), np.array(env_ids)
+        else:
+            results = None
+        if errors:
+            raise EnvError("\n".join(errors), results)
+        return results
+
+    def reset(self):
+        """ reset all envs synchronously; the results are ordered by env index """
+        self.async_reset()
+        obs, _, _, _, env_ids = self.recv(self.num_envs)
+        order = np.argsort(env_ids)
+        if isinstance(obs, dict):
+            return {k: v[order] for k, v in obs.items()}
+        return obs[order]
+
+    def step(self, actions, env_ids=None):
+        self.send(actions, env_ids)
+        return self.recv()
+
+    async def recv_async(self, batch_size: int=None):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.recv, batch_size)
+
+    async def reset_async(self, env_ids=None):
+        """ reset the given envs and return whichever batch is ready first """
+        self.async_reset(env_ids)
+        return await self.recv_async()
+
+    async def step_async(self, actions, env_ids=None):
+        """ step the given envs and return whichever batch is ready first """
+        self.send(actions, env_ids)
+        return await self.recv_async()
+
+    def close(self):
+        if self._closed:
+            return
+        # drain the running envs first (failed envs are dropped from the running ones)
+        while self._busy:
+            try:
+                self.recv(len(self._busy))
+            except EnvError:
+                pass
+        for commands in self._commands:
+            commands.put(('close', None))
+        for w in self._workers:
+            w.join()
+        self._closed = True
+
+    def __len__(self):
+        return self.num_envs
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+if __name__ == '__main__':
+    import os
+    from functools import partial
+    from amusepark.envs import WordleEnv, GobbletEnv
+    from amusepark.utils.path import data_path
+
+    # Gobblet: random play until a batch of 4 games is ready
+    env_fns = [partial(GobbletEnv, mode=1) for _ in range(8)]
+    pool = AsyncEnvPool(env_fns, batch_size=4, backend='process')
+    pool.reset()
+    action_space = GobbletEnv().action_space
+    env_ids = np.arange(pool.num_envs)
+    for _ in range(5):
+        actions = [action_space.sample() for _ in env_ids]
+        obs, rewards, dones, infos, env_ids = pool.step(actions, env_ids)
+        print(env_ids, rewards, dones)
+    pool.close()
+
+    # Wordle: asyncio interface
+    async def main():
+        env_fn = partial(WordleEnv, os.path.join(data_path, 'wordle-hidden.txt'))
+        action_space = env_fn().action_space
+        pool = AsyncEnvPool([env_fn for _ in range(4)], batch_size=2)
+        obs, _, _, _, env_ids = await pool.reset_async()
+        for _ in range(3):
+            actions = [action_space.sample() for _ in env_ids]
+            obs, rewards, dones, infos, env_ids = await pool.step_async(actions, env_ids)
+            print(env_ids, rewards, dones, obs['color'].shape)
+        pool.close()
+    asyncio.run(main())
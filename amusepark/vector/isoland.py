@@ -0,0 +1,233 @@
+import numpy as np
+
+from amusepark.envs.isoland import live_states
+from amusepark.configs.isoland_configs import DIRECTIONS, ARROW_FEATURE_NUM, ENV_CONFIG_0
+
+###### MoveArrowEnv on (N, num_arrows, 3) arrays ######
+## arrows[n, a] = (i, j, direction) of arrow a in env n. Envs step N copies of one config or one env per config of
+## a padded set (maps padded to the largest shape, missing arrows masked out). A push resolves the chain of
+## MoveArrowEnv._move (see kernels.step.arrow_push) with at most num_arrows vectorized passes.
+
+# direction -> (di, dj), row 0 unused
+DELTAS = np.zeros((5, 2), dtype=np.int16)
+for _d, _delta in DIRECTIONS.items():
+    DELTAS[_d] = _delta
+
+def _stack_configs(configs: list) -> dict:
+    # padded per-config tables
+    C = len(configs)
+    H = max(config['shape'][0] for config in configs)
+    W = max(config['shape'][1] for config in configs)
+    A = max(len(config['arrows']) for config in configs)
+    tables = {
+        'shape': np.zeros((C, 2), dtype=np.int16),
+        'signs': np.zeros((C, H, W), dtype=np.int8), # landmark lookup: the direction of a sign cell, 0 elsewhere
+        'layer1': np.zeros((C, H, W), dtype=np.int8), # 1st observation layer (signs and goals)
+        'start': np.zeros((C, A, 3), dtype=np.int16),
+        'goals': np.zeros((C, A, 2), dtype=np.int16),
+        'active': np.zeros((C, A), dtype=bool),
+        'order': np.zeros((C, A), dtype=np.int64), # arrows in the order of MoveArrowEnv.arrows (padding last)
+        'live': np.ones((C, A, H, W, 5), dtype=bool), # see envs.isoland.live_states (padded arrows never dead)
+    }
+    for c, config in enumerate(configs):
+        h, w = config['shape']
+        tables['shape'][c] = (h, w)
+        tables['live'][c, :len(config['arrows']), :h, :w] = live_states(config)
+        for i, j, direction in config['signs']:
+            assert direction in DIRECTIONS
+            tables['signs'][c, i, j] = direction
+            tables['layer1'][c, i, j] = direction
+        starts = []
+        for a, ((gi, gj), (i, j, direction)) in enumerate(config['arrows']):
+            tables['layer1'][c, gi, gj] = 5 + ARROW_FEATURE_NUM * a
+            tables['start'][c, a] = (i, j, direction)
+            tables['goals'][c, a] = (gi, gj)
+            tables['active'][c, a] = True
+            starts.append((i * w + j, a))
+        # MoveArrowEnv reads its arrows from the map row by row, and a later arrow hides an earlier one on a cell
+        ranked = [a for _, a in sorted(starts)]
+        tables['order'][c] = ranked + [a for a in range(A) if a not in ranked]
+    return tables
+
+class MoveArrowVecEnv:
+    r""" N envs of MoveArrowEnv stepped together
+
+    env_config(dict or list): one config (stepped num_envs times) or a list of configs (one env per config, padded)
+    num_envs  (int)         : number of envs of a single config
+    auto_reset(bool)        : restart an env as soon as it ends; its final arrows are kept in info['terminal_arrows']
+    terminate_dead(bool)    : end an env once an arrow can no longer reach its goal (info['dead'], reward 0)
+    step() returns the (N, num_arrows, 3) arrows [i, j, direction], rewards (1: all arrows on their goals), dones
+    and info; observations() builds the (N, H, W, 2) MoveArrowEnv observations on demand. An action picking a
+    padded arrow is a no-op.
+    """
+    def __init__(self, env_config=ENV_CONFIG_0, num_envs: int=None, auto_reset: bool=True, terminate_dead: bool=False):
+        if isinstance(env_config, dict):
+            configs = [env_config]
+            num_envs = 1 if num_envs is None else num_envs
+            self.config_idx = np.zeros(num_envs, dtype=np.int64)
+        else:
+            configs = list(env_config)
+            assert num_envs in (None, len(configs)), f"num_envs ({num_envs}) differs from the number of configs!"
+            num_envs = len(configs)
+            self.config_idx = np.arange(num_envs)
+        self.num_envs = num_envs
+        self.auto_reset = auto_reset
+        self.terminate_dead = terminate_dead
+        self.tables = _stack_configs(configs)
+        self.num_arrows = self.tables['active'].shape[1]
+        self.H, self.W = self.tables['signs'].shape[1:]
+
+        # per-env copies of the small config tables (the grids are gathered through config_idx)
+        c = self.config_idx
+        self._shape = self.tables['shape'][c]
+        self._active = self.tables['active'][c]
+        self._goals = self.tables['goals'][c]
+        self._order = self.tables['order'][c]
+
+        self.arrows = np.zeros((num_envs, self.num_arrows, 3), dtype=np.int16)
+        # arrow index + 1 shown on each cell (0: none)
+        self.occ = np.zeros((num_envs, self.H, self.W), dtype=np.int16)
+        self.step_counter = np.zeros(num_envs, dtype=np.int64)
+        self._envs = np.arange(num_envs)
+        self.reset()
+
+    def reset(self, mask: np.ndarray=None) -> np.ndarray:
+        """ restart all envs (or those of a boolean mask) """
+        envs = self._envs if mask is None else np.flatnonzero(mask)
+        self.arrows[envs] = self.tables['start'][self.config_idx[envs]]
+        self.step_counter[envs] = 0
+        self._update_occ(envs)
+        return self.arrows
+
+    def _update_occ(self, envs: np.ndarray):
+        # rebuild the occupancy of some envs in arrow order (a later arrow hides an earlier one)
+        self.occ[envs] = 0
+        for r in range(self.num_arrows):
+            a = self._order[envs, r]
+            live = self._active[envs, a]
+            n = envs[live]
+            a = a[live]
+            self.occ[n, self.arrows[n, a, 0], self.arrows[n, a, 1]] = a + 1
+
+    def _push(self, actions: np.ndarray):
+        # read the chain of pushed arrows from the occupancy before anything moves
+        n = self._envs
+        move_dir = self.arrows[n, actions, 2]
+        di, dj = DELTAS[move_dir, 0], DELTAS[move_dir, 1]
+        H, W = self._shape[:, 0], self._shape[:, 1]
+        chain = np.zeros((self.num_envs, self.num_arrows), dtype=bool)
+        cur = actions.copy()
+        moving = self._active[n, actions]
+        for _ in range(self.num_arrows):
+            i = self.arrows[n, cur, 0] + di
+            j = self.arrows[n, cur, 1] + dj
+            # an arrow blocked by the boundary ends the chain (and stays)
+            moving &= (0 <= i) & (i < H) & (0 <= j) & (j < W)
+            chain[n[moving], cur[moving]] = True
+            nxt = self.occ[n, np.clip(i, 0, self.H - 1), np.clip(j, 0, self.W - 1)].astype(np.int64) - 1
+            moving &= nxt >= 0
+            if not moving.any():
+                break
+            cur = np.where(moving, nxt, cur)
+
+        # move the chain; sign cells redirect the arrows
+        rows, arrows = np.nonzero(chain)
+        if len(rows) == 0:
+            return rows
+        i = self.arrows[rows, arrows, 0] + di[rows]
+        j = self.arrows[rows, arrows, 1] + dj[rows]
+        sign = self.tables['signs'][self.config_idx[rows], i, j]
+        self.arrows[rows, arrows, 0] = i
+        self.arrows[rows, arrows, 1] = j
+        self.arrows[rows, arrows, 2] = np.where(sign > 0, sign, self.arrows[rows, arrows, 2])
+        return np.unique(rows)
+
+    def _is_done(self) -> np.ndarray:
+        on_goal = (self.arrows[:, :, :2] == self._goals).all(axis=2)
+        return (on_goal | ~self._active).all(axis=1)
+
+    def _is_dead(self) -> np.ndarray:
+        a = np.arange(self.num_arrows)
+        i, j, d = self.arrows[:, :, 0], self.arrows[:, :, 1], self.arrows[:, :, 2]
+        return ~self.tables['live'][self.config_idx[:, None], a, i, j, d].all(axis=1)
+
+    def step(self, actions: np.ndarray) -> tuple:
+        """ actions: (N,) arrow indices -> (arrows, rewards, dones, info) """
+        actions = np.asarray(actions, dtype=np.int64)
+        assert ((0 <= actions) & (actions < self.num_arrows)).all(), "Invalid actions!"
+        moved = self._push(actions)
+        self._update_occ(moved)
+        dones = self._is_done()
+        rewards = dones.astype(np.float32)
+        dead = ~dones & self._is_dead()
+        if self.terminate_dead:
+            dones |= dead
+        self.step_counter += 1
+        info = {'dead': dead}
+        if self.auto_reset and dones.any():
+            info['terminal_arrows'] = self.arrows.copy()
+            self.reset(dones)
+        return self.arrows, rewards, dones, info
+
+    def observations(self, envs: np.ndarray=None) -> np.ndarray:
+        """ (N, H, W, 2) int8 observations of MoveArrowEnv (of all envs or an index array) """
+        envs = self._envs if envs is None else np.asarray(envs)
+        obs = np.zeros((len(envs), self.H, self.W, 2), dtype=np.int8)
+        obs[..., 0] = self.tables['layer1'][self.config_idx[envs]]
+        occ = self.occ[envs].astype(np.int64)
+        shown = occ > 0
+        k, i, j = np.nonzero(shown)
+        a = occ[k, i, j] - 1
+        obs[k, i, j, 1] = 5 + ARROW_FEATURE_NUM * a + self.arrows[envs[k], a, 2]
+        return obs
+
+    def __len__(self):
+        return self.num_envs
+
+if __name__ == '__main__':
+    import time
+    from amusepark.envs.isoland import MoveArrowEnv
+    from amusepark.configs.isoland_configs import ENV_CONFIG_1, OPT_ACTIONS_0, OPT_ACTIONS_1, RIGHT, DOWN
+
+    rng = np.random.default_rng(0)
+    # a smaller map with a single arrow, padded to the others
+    small = {'shape': (4, 5), 'signs': [(1, 1, DOWN), (3, 1, RIGHT)], 'arrows': [((3, 3), (0, 1, DOWN))]}
+    configs = [ENV_CONFIG_0, ENV_CONFIG_1, small]
+
+    # parity with MoveArrowEnv on random actions (padded configs)
+    vec = MoveArrowVecEnv(configs * 8, auto_reset=False)
+    refs = [MoveArrowEnv(config) for config in configs * 8]
+    for env in refs:
+        env.reset()
+    for t in range(300):
+        actions = np.array([rng.integers(len(env.arrows)) for env in refs])
+        arrows, rewards, dones, info = vec.step(actions)
+        obs = vec.observations()
+        for k, env in enumerate(refs):
+            ref_obs, reward, done, ref_info = env.step(int(actions[k]))
+            for a, (direction, (i, j)) in env.arrows.items():
+                assert tuple(arrows[k, a]) == (i, j, direction), f"arrows diverged at step {t}"
+            h, w = env.H, env.W
+            assert (obs[k, :h, :w] == ref_obs).all() and reward == rewards[k] and done == dones[k]
+            assert ref_info['dead'] == info['dead'][k]
+    print("parity with MoveArrowEnv: ok")
+
+    # the optimal solutions
+    vec = MoveArrowVecEnv([ENV_CONFIG_0, ENV_CONFIG_1])
+    solved = [None, None]
+    for t in range(max(len(OPT_ACTIONS_0), len(OPT_ACTIONS_1))):
+        # a finished env keeps stepping its restarted copy
+        acts = [opt[t] if t < len(opt) else 0 for opt in (OPT_ACTIONS_0, OPT_ACTIONS_1)]
+        _, _, dones, _ = vec.step(acts)
+        for k in np.flatnonzero(dones):
+            solved[k] = solved[k] or t + 1
+    print("optimal solutions solved in %s steps" % solved)
+
+    # random play
+    vec = MoveArrowVecEnv(ENV_CONFIG_0, num_envs=1 << 16)
+    steps = 100
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        vec.step(rng.integers(vec.num_arrows, size=vec.num_envs))
+    dt = time.perf_counter() - t0
+    print("%.2f M steps/sec (%i envs)" % (steps * vec.num_envs / dt / 1e6, vec.num_envs))
@@ -0,0 +1,471 @@
+import os
+import json
+import time
+import socket
+import struct
+import argparse
+import tempfile
+import traceback
+import multiprocessing as mp
+from functools import partial
+
+import numpy as np
+
+from amusepark.utils.seeding import episode_seed
+
+###### Rollout service: batches of envs served over TCP or Unix sockets ######
+## A RolloutServer hosts `num_envs` envs and answers batched reset/step requests; a RolloutClient fans the requests
+## out over many servers. Messages are a fixed header followed by raw array bytes (no pickle):
+##   header : command (or status), request id, payload size
+##   spec   : JSON layout of the observations and actions (each a named array with the smallest fitting int dtype)
+##   reset  : -> observations, rewards (float32), dones (uint8) of every env
+##   step   : actions of every env -> observations, rewards, dones; done envs are reset and return their new
+##            observation (infos are not sent)
+## Requests are answered in order, so a client may pipeline several before reading the first answer.
+
+HEADER = struct.Struct('<BxxxII')
+SPEC, RESET, STEP, CLOSE, ERROR = range(5)
+INT_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+# episode offset between the servers started by spawn_servers (distinct seeds for every episode)
+EPISODE_STRIDE = 1 << 32
+
+def _int_dtype(low: int, high: int) -> str:
+    for dtype in INT_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype).str
+    raise ValueError(f"Values out of range: {low}, {high}!")
+
+def _bounds(space) -> tuple:
+    # (shape, low, high) of an integer space
+    from gym import spaces
+    if isinstance(space, spaces.Discrete):
+        return (), int(space.start), int(space.start + space.n - 1)
+    if isinstance(space, spaces.MultiDiscrete):
+        return space.shape, 0, int(space.nvec.max()) - 1
+    if isinstance(space, spaces.Box):
+        return space.shape, int(np.min(space.low)), int(np.max(space.high))
+    raise NotImplementedError(f"Unsupported space: {space}!")
+
+def obs_layout(space) -> list:
+    """ [(key, shape, dtype), ...]: the observation arrays of a space (key None for a single array) """
+    from gym import spaces
+    items = space.spaces.items() if isinstance(space, spaces.Dict) else [(None, space)]
+    layout = []
+    for key, sub in items:
+        shape, low, high = _bounds(sub)
+        layout.append((key, list(shape), _int_dtype(low, high)))
+    return layout
+
+def action_layout(space) -> dict:
+    r""" {'kind', 'shape', 'dtype', 'low', 'high'}: the action array of one env
+
+    kind: 'discrete' (a scalar), 'multi' (a MultiDiscrete array) or 'tuple' (a Tuple of Discrete, sent as an array)
+    """
+    from gym import spaces
+    if isinstance(space, spaces.Tuple):
+        bounds = [_bounds(sub) for sub in space.spaces]
+        assert all(shape == () for shape, _, _ in bounds), f"Unsupported space: {space}!"
+        low, high = [b[1] for b in bounds], [b[2] for b in bounds]
+        kind, shape = 'tuple', [len(bounds)]
+    elif isinstance(space, spaces.MultiDiscrete):
+        kind, shape = 'multi', list(space.shape)
+        low, high = [0] * space.nvec.size, (space.nvec.reshape(-1) - 1).tolist()
+    else:
+        shape, lo, hi = _bounds(space)
+        kind, shape, low, high = 'discrete', list(shape), [lo], [hi]
+    return {'kind': kind, 'shape': shape, 'dtype': _int_dtype(min(low), max(high)), 'low': low, 'high': high}
+
+class _Batch:
+    """ (observations, rewards, dones) of `num_envs` envs in one contiguous buffer, sections aligned to 8 bytes """
+    def __init__(self, layout: list, num_envs: int, buffer=None):
+        sections = [(key, [num_envs] + shape, np.dtype(dtype)) for key, shape, dtype in layout]
+        sections += [('__reward', [num_envs], np.dtype('<f4')), ('__done', [num_envs], np.dtype('u1'))]
+        offsets, size = [], 0
+        for _, shape, dtype in sections:
+            offsets.append(size)
+            size += -(-int(np.prod(shape)) * dtype.itemsize // 8) * 8
+        self.nbytes = size
+        self.buffer = np.zeros(size, dtype=np.uint8) if buffer is None else np.frombuffer(buffer, dtype=np.uint8)
+        self.arrays = {
+            key: self.buffer[off:off + int(np.prod(shape)) * dtype.itemsize].view(dtype).reshape(shape)
+            for (key, shape, dtype), off in zip(sections, offsets)
+        }
+        self.rewards = self.arrays.pop('__reward')
+        self.dones = self.arrays.pop('__done')
+
+    def obs(self):
+        return self.arrays[None] if None in self.arrays else self.arrays
+
+def parse_address(address: str) -> tuple:
+    """ 'tcp://host:port', 'host:port', 'unix:///path' or '/path' -> (socket family, socket address) """
+    if address.startswith('unix://'):
+        return socket.AF_UNIX, address[len('unix://'):]
+    if address.startswith('tcp://'):
+        address = address[len('tcp://'):]
+    elif '/' in address:
+        return socket.AF_UNIX, address
+    host, port = address.rsplit(':', 1)
+    return socket.AF_INET, (host, int(port))
+
+def _recv_exact(sock: socket.socket, nbytes: int) -> bytearray:
+    buf = bytearray(nbytes)
+    view = memoryview(buf)
+    got = 0
+    while got < nbytes:
+        n = sock.recv_into(view[got:])
+        if n == 0:
+            raise ConnectionError("Connection closed!")
+        got += n
+    return buf
+
+def _send(sock: socket.socket, cmd: int, request_id: int, payload=b''):
+    payload = memoryview(payload).cast('B')
+    sock.sendall(HEADER.pack(cmd, request_id, len(payload)) + payload)
+
+def _recv(sock: socket.socket) -> tuple:
+    cmd, request_id, nbytes = HEADER.unpack(_recv_exact(sock, HEADER.size))
+    return cmd, request_id, _recv_exact(sock, nbytes)
+
+class RolloutServer:
+    r""" A batch of envs served over a socket
+
+    env_fn       : callable creating an env (integer Box/Discrete/MultiDiscrete/Dict observations and
+                   Discrete/MultiDiscrete/Tuple actions)
+    num_envs(int): number of envs of the batch
+    address (str): see parse_address (port 0: any free port; `address` is then the bound one)
+    seed    (int): if given, the k-th episode of the server is reset with episode_seed(seed, first_episode + k)
+    One client is served at a time; a CLOSE request (or RolloutClient.close(shutdown=True)) stops the server.
+    """
+    def __init__(self, env_fn, num_envs: int, address: str='127.0.0.1:0', seed: int=None, first_episode: int=0):
+        self.envs = [env_fn() for _ in range(num_envs)]
+        self.num_envs = num_envs
+        self.seed = seed
+        self.episode = first_episode
+
+        env = self.envs[0]
+        self.spec = {
+            'num_envs': num_envs,
+            'obs': obs_layout(env.observation_space),
+            'action': action_layout(env.action_space),
+        }
+        self._batch = _Batch(self.spec['obs'], num_envs)
+        action = self.spec['action']
+        self._action_dtype = np.dtype(action['dtype'])
+        self._action_shape = [num_envs] + action['shape']
+        self._action_kind = action['kind']
+
+        family, sockaddr = parse_address(address)
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(sockaddr)
+        self._sock.listen(1)
+        if family == socket.AF_INET:
+            host, port = self._sock.getsockname()
+            self.address = f"tcp://{host}:{port}"
+        else:
+            self.address = f"unix://{sockaddr}"
+
+    def _reset_env(self, env_idx: int):
+        env = self.envs[env_idx]
+        if self.seed is None:
+            obs = env.reset()
+        else:
+            obs = env.reset(seed=episode_seed(self.seed, self.episode))
+        self.episode += 1
+        self._write_obs(env_idx, obs)
+
+    def _write_obs(self, env_idx: int, obs):
+        if isinstance(obs, dict):
+            for key, arr in self._batch.arrays.items():
+                arr[env_idx] = obs[key]
+        else:
+            self._batch.arrays[None][env_idx] = obs
+
+    def reset(self):
+        for env_idx in range(self.num_envs):
+            self._reset_env(env_idx)
+        self._batch.rewards[:] = 0
+        self._batch.dones[:] = 0
+
+    def step(self, actions: np.ndarray):
+        batch = self._batch
+        kind = self._action_kind
+        for env_idx, (env, act) in enumerate(zip(self.envs, actions)):
+            if kind == 'discrete':
+                act = int(act)
+            elif kind == 'tuple':
+                act = tuple(act.tolist())
+            obs, reward, done, _ = env.step(act)
+            batch.rewards[env_idx] = reward
+            batch.dones[env_idx] = done
+            if done:
+                self._reset_env(env_idx)
+            else:
+                self._write_obs(env_idx, obs)
+
+    def _handle(self, conn: socket.socket) -> bool:
+        # serve one connection; returns False once the server is closed
+        while True:
+            try:
+                cmd, request_id, payload = _recv(conn)
+            except ConnectionError:
+                return True
+            try:
+                if cmd == SPEC:
+                    _send(conn, SPEC, request_id, json.dumps(self.spec).encode())
+                elif cmd == RESET:
+                    self.reset()
+                    _send(conn, RESET, request_id, self._batch.buffer)
+                elif cmd == STEP:
+                    self.step(np.frombuffer(payload, dtype=self._action_dtype).reshape(self._action_shape))
+                    _send(conn, STEP, request_id, self._batch.buffer)
+                elif cmd == CLOSE:
+                    _send(conn, CLOSE, request_id)
+                    return False
+                else:
+                    raise NotImplementedError(f"Unknown command: {cmd}!")
+            except Exception:
+                _send(conn, ERROR, request_id, traceback.format_exc().encode())
+
+    def serve_forever(self):
+        try:
+            running = True
+            while running:
+                conn, _ = self._sock.accept()
+                if conn.family == socket.AF_INET:
+                    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with conn:
+                    running = self._handle(conn)
+        finally:
+            self.close()
+
+    def close(self):
+        self._sock.close()
+        if self.address.startswith('unix://') and os.path.exists(self.address[len('unix://'):]):
+            os.unlink(self.address[len('unix://'):])
+        for env in self.envs:
+            env.close()
+
+def _serve(env_fn, num_envs: int, address: str, seed: int, first_episode: int, ready):
+    server = RolloutServer(env_fn, num_envs, address, seed, first_episode)
+    ready.send(server.address)
+    ready.close()
+    server.serve_forever()
+
+def spawn_servers(env_fn, num_servers: int, envs_per_server: int, transport: str='unix', seed: int=None,
+                  start_method: str=None) -> tuple:
+    r""" Start local server processes (e.g. for tests or one box); returns (processes, addresses)
+
+    transport: 'unix' (sockets in a temporary directory) or 'tcp' (free ports of 127.0.0.1)
+    """
+    assert transport in ('unix', 'tcp'), f"Invalid transport: {transport}!"
+    ctx = mp.get_context(start_method)
+    tmp_dir = tempfile.mkdtemp(prefix='amusepark-rollout-') if transport == 'unix' else None
+    processes, pipes = [], []
+    for i in range(num_servers):
+        address = os.path.join(tmp_dir, f"server-{i}.sock") if transport == 'unix' else '127.0.0.1:0'
+        recv_end, send_end = ctx.Pipe(duplex=False)
+        p = ctx.Process(target=_serve, args=(env_fn, envs_per_server, address, seed, i * EPISODE_STRIDE, send_end), daemon=True)
+        p.start()
+        send_end.close()
+        processes.append(p)
+        pipes.append(recv_end)
+    addresses = []
+    for i, pipe in enumerate(pipes):
+        try:
+            addresses.append(pipe.recv())
+        except EOFError:
+            raise RuntimeError(f"Server {i} failed to start!")
+    return processes, addresses
+
+class RolloutClient:
+    r""" Batched reset/step over many rollout servers, as one batch of envs
+
+    addresses(list): server addresses (see parse_address); the envs are numbered server by server
+
+    Like AsyncEnvPool, `send` dispatches actions to some servers and returns immediately, and `recv` waits for their
+    oldest pending answers. A server may have several pending requests (pipelining), e.g. to step half of the servers
+    while the learner computes the actions of the other half.
+    recv returns (obs, rewards, dones, env_ids): obs in the compact int dtypes of the spec (a dict of arrays for
+    Dict observations), rewards float32, dones bool.
+    """
+    def __init__(self, addresses: list, timeout: float=None):
+        self.addresses = list(addresses)
+        self._socks = []
+        for address in self.addresses:
+            family, sockaddr = parse_address(address)
+            sock = socket.create_connection(sockaddr, timeout) if family == socket.AF_INET else socket.socket(family)
+            if family == socket.AF_INET:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            else:
+                sock.settimeout(timeout)
+                sock.connect(sockaddr)
+            self._socks.append(sock)
+        self._next_id = 0
+        # per server: ids of the requests not received yet
+        self._pending = [[] for _ in self._socks]
+
+        self.specs = [json.loads(payload) for payload in self._request_all(SPEC)]
+        self.spec = self.specs[0]
+        assert all(spec['obs'] == self.spec['obs'] and spec['action'] == self.spec['action'] for spec in self.specs), \
+            "The servers host different envs!"
+        self.sizes = [spec['num_envs'] for spec in self.specs]
+        self.offsets = np.concatenate([[0], np.cumsum(self.sizes)]).astype(int)
+        self.num_envs = int(self.offsets[-1])
+        self.action_dtype = np.dtype(self.spec['action']['dtype'])
+        self.action_shape = tuple(self.spec['action']['shape'])
+        self._closed = False
+
+    def _post(self, server_idx: int, cmd: int, payload=b''):
+        request_id = self._next_id
+        self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+        _send(self._socks[server_idx], cmd, request_id, payload)
+        self._pending[server_idx].append(request_id)
+
+    def _answer(self, server_idx: int) -> tuple:
+        assert self._pending[server_idx], f"No pending request on server {server_idx}!"
+        status, request_id, payload = _recv(self._socks[server_idx])
+        expected = self._pending[server_idx].pop(0)
+        assert request_id == expected, f"Out of order answer from server {server_idx}!"
+        if status == ERROR:
+            raise RuntimeError(f"Server {self.addresses[server_idx]} failed:\n{payload.decode()}")
+        return status, payload
+
+    def _request_all(self, cmd: int) -> list:
+        for i in range(len(self._socks)):
+            self._post(i, cmd)
+        return [self._answer(i)[1] for i in range(len(self._socks))]
+
+    def _server_ids(self, server_ids) -> list:
+        return list(range(len(self._socks))) if server_ids is None else [int(i) for i in server_ids]
+
+    def send(self, actions, server_ids=None):
+        """ dispatch the actions of every env of the given servers (default: all), concatenated in server order """
+        server_ids = self._server_ids(server_ids)
+        actions = np.asarray(actions).astype(self.action_dtype, copy=False)
+        start = 0
+        for i in server_ids:
+            stop = start + self.sizes[i]
+            self._post(i, STEP, np.ascontiguousarray(actions[start:stop]))
+            start = stop
+        assert start == len(actions), f"Expected {start} actions, got {len(actions)}!"
+
+    def async_reset(self, server_ids=None):
+        for i in self._server_ids(server_ids):
+            self._post(i, RESET)
+
+    def recv(self, server_ids=None) -> tuple:
+        """ the oldest pending answer of each given server (default: all), concatenated in server order """
+        server_ids = self._server_ids(server_ids)
+        batches = [_Batch(self.spec['obs'], self.sizes[i], self._answer(i)[1]) for i in server_ids]
+        env_ids = np.concatenate([np.arange(self.offsets[i], self.offsets[i + 1]) for i in server_ids])
+        if len(batches) == 1:
+            b = batches[0]
+            return b.obs(), b.rewards, b.dones.astype(bool), env_ids
+        obs = {key: np.concatenate([b.arrays[key] for b in batches]) for key in batches[0].arrays}
+        obs = obs[None] if None in obs else obs
+        rewards = np.concatenate([b.rewards for b in batches])
+        dones = np.concatenate([b.dones for b in batches]).astype(bool)
+        return obs, rewards, dones, env_ids
+
+    def reset(self, server_ids=None):
+        self.async_reset(server_ids)
+        return self.recv(server_ids)[0]
+
+    def step(self, actions, server_ids=None) -> tuple:
+        self.send(actions, server_ids)
+        return self.recv(server_ids)
+
+    def sample_actions(self, rng: np.random.Generator, num_envs: int=None) -> np.ndarray:
+        """ uniformly random actions of `num_envs` envs (default: all) """
+        action = self.spec['action']
+        num_envs = self.num_envs if num_envs is None else num_envs
+        low, high = np.array(action['low']), np.array(action['high'])
+        shape = (num_envs,) + tuple(action['shape'])
+        return rng.integers(low, high + 1, size=(num_envs, len(low))).reshape(shape).astype(self.action_dtype)
+
+    def close(self, shutdown: bool=False):
+        """ drain the pending requests and disconnect (shutdown: also stop the servers) """
+        if self._closed:
+            return
+        for i, sock in enumerate(self._socks):
+            while self._pending[i]:
+                self._answer(i)
+            if shutdown:
+                self._post(i, CLOSE)
+                self._answer(i)
+            sock.close()
+        self._closed = True
+
+    def __len__(self):
+        return self.num_envs
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+def make_env(name: str, **kwargs):
+    """ an env of amusepark.envs by class name (picklable as partial(make_env, name, ...)) """
+    import amusepark.envs as envs
+    return getattr(envs, name)(**{**envs._default_kwargs(name), **kwargs})
+
+def benchmark(client: RolloutClient, steps: int, pipeline: bool, seed: int=0) -> float:
+    """ env steps per second of random play; pipeline: step the two halves of the servers alternately """
+    rng = np.random.default_rng(seed)
+    client.reset()
+    t0 = time.perf_counter()
+    if not pipeline or len(client.sizes) < 2:
+        for _ in range(steps):
+            client.step(client.sample_actions(rng))
+    else:
+        half = len(client.sizes) // 2
+        groups = [list(range(half)), list(range(half, len(client.sizes)))]
+        sizes = [sum(client.sizes[i] for i in g) for g in groups]
+        client.send(client.sample_actions(rng, sizes[0]), groups[0])
+        for t in range(steps):
+            # the other half steps while this one is received and gets its next actions
+            client.send(client.sample_actions(rng, sizes[1]), groups[1])
+            client.recv(groups[0])
+            if t + 1 < steps:
+                client.send(client.sample_actions(rng, sizes[0]), groups[0])
+            client.recv(groups[1])
+    return steps * client.num_envs / (time.perf_counter() - t0)
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m amusepark.vector.rollout', description='Rollout servers of amusepark envs.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve = sub.add_parser('serve', help='serve a batch of envs')
+    serve.add_argument('--address', default='0.0.0.0:5555', help="'host:port' or a Unix socket path")
+    bench = sub.add_parser('bench', help='random play through local server processes')
+    bench.add_argument('--servers', type=int, default=os.cpu_count())
+    bench.add_argument('--transport', default='unix', choices=['unix', 'tcp'])
+    bench.add_argument('--steps', type=int, default=100)
+    for p in (serve, bench):
+        p.add_argument('--env', default='WordleEnv', help='env class of amusepark.envs')
+        p.add_argument('--kwargs', default='{}', help='env kwargs (JSON)')
+        p.add_argument('--num-envs', type=int, default=256, help='envs per server')
+        p.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    env_fn = partial(make_env, args.env, **json.loads(args.kwargs))
+    if args.command == 'serve':
+        server = RolloutServer(env_fn, args.num_envs, args.address, args.seed)
+        print("serving %i %s on %s" % (args.num_envs, args.env, server.address))
+        server.serve_forever()
+        return
+
+    processes, addresses = spawn_servers(env_fn, args.servers, args.num_envs, args.transport, args.seed)
+    client = RolloutClient(addresses)
+    for pipeline in (False, True):
+        rate = benchmark(client, args.steps, pipeline)
+        print("%i servers x %i %s, pipeline=%s: %.0f env steps/sec" % (args.servers, args.num_envs, args.env, pipeline, rate))
+    client.close(shutdown=True)
+    for p in processes:
+        p.join()
+
+if __name__ == '__main__':
+    main()
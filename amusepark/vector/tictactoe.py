@@ -0,0 +1,148 @@
+import numpy as np
+from functools import lru_cache
+
+###### Tic-Tac-Toe as base-3 state indices ######
+## state = sum(digit[c] * 3**c) over the cells c = 0..8 (left to right, top to bottom), digit {0: empty, 1: player 1,
+## 2: player 2}; the player to move follows from the piece counts. Every rule of TicTacToeEnv is precomputed into
+## (19683, 9) tables, so that a step of N games is three gathers.
+
+STATES = 3 ** 9
+LINES = ((0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6))
+
+@lru_cache(maxsize=None)
+def tables() -> tuple:
+    r""" (next_state, valid, outcome, boards, turn) of every state, read-only
+
+    next_state(19683, 9) int16: the state after the move (unchanged by an invalid move)
+    valid     (19683, 9) bool : the cell is empty
+    outcome   (19683, 9) int8 : the reward of the move in TicTacToeEnv, 0 while the game goes on; every end of game
+                                has a non-zero reward (win: the mover, full board: -1, occupied cell: the other player)
+    boards    (19683, 3, 3) int8: the observation of TicTacToeEnv (1: player 1, -1: player 2)
+    turn      (19683,) int8    : the player to move (1 or -1)
+    """
+    states = np.arange(STATES)
+    digits = (states[:, None] // 3 ** np.arange(9)) % 3 # (S, 9)
+    boards = np.where(digits == 2, -1, digits).astype(np.int8)
+    turn = np.where((digits == 1).sum(axis=1) > (digits == 2).sum(axis=1), -1, 1).astype(np.int8)
+    turn_digit = np.where(turn == 1, 1, 2)
+
+    valid = digits == 0
+    next_state = np.where(valid, states[:, None] + turn_digit[:, None] * 3 ** np.arange(9), states[:, None])
+
+    # the mover wins with a line through the cell
+    outcome = np.zeros((STATES, 9), dtype=np.int8)
+    for cell in range(9):
+        placed = digits.copy()
+        placed[:, cell] = turn_digit
+        win = np.zeros(STATES, dtype=bool)
+        for line in LINES:
+            if cell in line:
+                win |= (placed[:, line] == turn_digit[:, None]).all(axis=1)
+        full = (placed != 0).all(axis=1)
+        ok = valid[:, cell]
+        outcome[:, cell] = np.where(~ok, -turn, np.where(win, turn, np.where(full, -1, 0)))
+
+    result = (next_state.astype(np.int16), valid, outcome, boards.reshape(STATES, 3, 3), turn)
+    for table in result:
+        table.setflags(write=False)
+    return result
+
+class TicTacToeVecEnv:
+    r""" N games of TicTacToeEnv stepped by table lookups
+
+    num_envs  (int) : number of games
+    auto_reset(bool): start a new game (state 0) as soon as a game ends; the final state is kept in
+                      info['terminal_state']
+    Observations are the (num_envs,) int16 state indices; boards() decodes the (num_envs, 3, 3) boards on demand.
+    Rewards follow TicTacToeEnv (from player 1's view: 1 / -1 for a win of player 1 / 2, -1 for a full board and
+    the other player wins after an invalid move).
+    """
+    def __init__(self, num_envs: int, auto_reset: bool=True):
+        self.num_envs = num_envs
+        self.auto_reset = auto_reset
+        self.next_state, self.valid, self.outcome, self._boards, self.turn_table = tables()
+        self.states = np.zeros(num_envs, dtype=np.int16)
+
+    def reset(self) -> np.ndarray:
+        self.states[:] = 0
+        return self.states
+
+    def step(self, actions: np.ndarray) -> tuple:
+        """ actions: (num_envs,) cells -> (states, rewards, dones, info); info['valid']: the move was valid """
+        states, actions = self.states, np.asarray(actions)
+        rewards = self.outcome[states, actions]
+        valid = self.valid[states, actions]
+        self.states = self.next_state[states, actions]
+        dones = rewards != 0
+        info = {'valid': valid}
+        if self.auto_reset:
+            info['terminal_state'] = self.states.copy()
+            self.states[dones] = 0
+        return self.states, rewards.astype(np.float32), dones, info
+
+    def boards(self, states: np.ndarray=None) -> np.ndarray:
+        """ (..., 3, 3) boards of the given states (default: the current ones) """
+        return self._boards[self.states if states is None else states]
+
+    def legal_mask(self, states: np.ndarray=None) -> np.ndarray:
+        """ (..., 9) empty cells """
+        return self.valid[self.states if states is None else states]
+
+    def turn(self, states: np.ndarray=None) -> np.ndarray:
+        """ the player to move (1 or -1) """
+        return self.turn_table[self.states if states is None else states]
+
+    def sample_legal(self, rng: np.random.Generator) -> np.ndarray:
+        """ a uniformly random empty cell of every game """
+        mask = self.legal_mask()
+        # the k-th empty cell, k uniform among the empty cells
+        k = (rng.random(self.num_envs) * mask.sum(axis=1)).astype(int)
+        return (mask.cumsum(axis=1) > k[:, None]).argmax(axis=1)
+
+    def __len__(self):
+        return self.num_envs
+
+if __name__ == '__main__':
+    import time
+    from amusepark.envs.in_a_row import TicTacToeEnv
+
+    rng = np.random.default_rng(0)
+
+    # parity with TicTacToeEnv on random (also invalid) moves
+    vec = TicTacToeVecEnv(64, auto_reset=False)
+    for _ in range(100):
+        envs = [TicTacToeEnv() for _ in range(vec.num_envs)]
+        for env in envs:
+            env.reset()
+        vec.reset()
+        live = np.ones(vec.num_envs, dtype=bool)
+        while live.any():
+            actions = np.where(rng.random(vec.num_envs) < 0.8, vec.sample_legal(rng), rng.integers(9, size=vec.num_envs))
+            states, rewards, dones, _ = vec.step(actions)
+            for k in np.flatnonzero(live):
+                obs, reward, done, _ = envs[k].step(int(actions[k]))
+                assert (obs == vec.boards(states[k])).all() and reward == rewards[k] and done == dones[k]
+            live &= ~dones
+            # keep stepping only the live games: the others replay a harmless valid state
+            vec.states[~live] = 0
+    print("parity with TicTacToeEnv: ok")
+
+    # random legal play
+    vec = TicTacToeVecEnv(1 << 20)
+    vec.reset()
+    steps = 50
+    t0 = time.perf_counter()
+    games = 0
+    for _ in range(steps):
+        _, _, dones, _ = vec.step(vec.sample_legal(rng))
+        games += int(dones.sum())
+    dt = time.perf_counter() - t0
+    print("%i games, %.1f M steps/sec (with random legal moves)" % (games, steps * vec.num_envs / dt / 1e6))
+
+    # the steps alone
+    actions = rng.integers(9, size=vec.num_envs)
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        vec.step(actions)
+    dt = time.perf_counter() - t0
+    print("%.1f M steps/sec (fixed actions)" % (steps * vec.num_envs / dt / 1e6))
@@ -0,0 +1,20 @@
+import importlib
+
+# name -> module; imported on first access (so that `python -m amusepark.wrappers.<module>` runs a fresh module)
+_WRAPPERS = {
+    'ProfileWrapper': 'amusepark.wrappers.profiling',
+    'RecordEpisode': 'amusepark.wrappers.recorder',
+    'EpisodeReader': 'amusepark.wrappers.recorder',
+}
+
+__all__ = list(_WRAPPERS)
+
+def __getattr__(name: str):
+    if name in _WRAPPERS:
+        attr = getattr(importlib.import_module(_WRAPPERS[name]), name)
+        globals()[name] = attr
+        return attr
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(_WRAPPERS))
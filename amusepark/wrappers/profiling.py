@@ -0,0 +1,157 @@
+import io
+import cProfile
+import pstats
+from time import perf_counter_ns
+
+import gym
+
+PHASES = ('reset', 'step', 'validation', 'dynamics', 'done', 'render')
+
+class ProfileWrapper(gym.Wrapper):
+    r""" Opt-in per-phase timing of an env
+
+    Records cumulative time and call counts of reset, step, render and of the phases inside step:
+        validation: env._valid_action (or action_space.contains if the env has no specialized check)
+        dynamics  : the methods listed in env.profile_phases['dynamics']
+        done      : the methods listed in env.profile_phases['done']
+    The phase methods are patched on the env instance, so an unwrapped (or disabled) env pays nothing.
+    Nested and recursive calls of a phase (e.g. MoveArrowEnv._move) are only timed at the outermost level.
+
+    cprofile(bool): additionally run cProfile during reset/step (see dump_stats/print_stats)
+    """
+    def __init__(self, env: gym.Env, cprofile: bool=False):
+        super(ProfileWrapper, self).__init__(env)
+
+        # phase -> [calls, total ns, depth]
+        self._counters = {phase: [0, 0, 0] for phase in PHASES}
+        self._patched = []
+        self._profiler = cProfile.Profile() if cprofile else None
+        self.enabled = False
+        self.enable()
+
+    def _timed(self, phase: str, fn):
+        counter = self._counters[phase]
+        def timed(*args, **kwargs):
+            if counter[2]: # nested call: timed by the outermost one
+                return fn(*args, **kwargs)
+            counter[2] = 1
+            t0 = perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                counter[1] += perf_counter_ns() - t0
+                counter[0] += 1
+                counter[2] = 0
+        return timed
+
+    def _patch(self, obj, name: str, phase: str):
+        # remember instance attributes (e.g. env._valid_action) so that they can be restored
+        original = obj.__dict__.get(name)
+        setattr(obj, name, self._timed(phase, getattr(obj, name)))
+        self._patched.append((obj, name, original))
+
+    def enable(self):
+        if self.enabled:
+            return
+        env = self.env.unwrapped
+        if hasattr(env, '_valid_action'):
+            self._patch(env, '_valid_action', 'validation')
+        else:
+            self._patch(env.action_space, 'contains', 'validation')
+        for phase, names in getattr(env, 'profile_phases', {}).items():
+            for name in names:
+                self._patch(env, name, phase)
+        self.enabled = True
+
+    def disable(self):
+        # restore the instance attributes, or drop them so that the class methods are used again
+        for obj, name, original in self._patched:
+            if original is None:
+                delattr(obj, name)
+            else:
+                setattr(obj, name, original)
+        self._patched = []
+        self.enabled = False
+
+    def _call(self, phase: str, fn, *args, **kwargs):
+        if not self.enabled:
+            return fn(*args, **kwargs)
+        counter = self._counters[phase]
+        if self._profiler is not None:
+            self._profiler.enable()
+        t0 = perf_counter_ns()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            counter[1] += perf_counter_ns() - t0
+            counter[0] += 1
+            if self._profiler is not None:
+                self._profiler.disable()
+
+    def reset(self, **kwargs):
+        return self._call('reset', self.env.reset, **kwargs)
+
+    def step(self, action):
+        return self._call('step', self.env.step, action)
+
+    def render(self, *args, **kwargs):
+        # cProfile only covers reset/step
+        counter = self._counters['render']
+        t0 = perf_counter_ns()
+        try:
+            return self.env.render(*args, **kwargs)
+        finally:
+            if self.enabled:
+                counter[1] += perf_counter_ns() - t0
+                counter[0] += 1
+
+    def stats(self) -> dict:
+        """ phase -> {calls, total_ms, mean_us, step_fraction} """
+        step_ns = self._counters['step'][1]
+        stats = dict()
+        for phase, (calls, total_ns, _) in self._counters.items():
+            stats[phase] = {
+                'calls': calls,
+                'total_ms': total_ns / 1e6,
+                'mean_us': total_ns / calls / 1e3 if calls else 0.,
+                'step_fraction': total_ns / step_ns if step_ns and phase in ('validation', 'dynamics', 'done') else None,
+            }
+        return stats
+
+    def reset_stats(self):
+        for counter in self._counters.values():
+            counter[0] = counter[1] = 0
+        if self._profiler is not None:
+            self._profiler = cProfile.Profile()
+
+    def dump_stats(self, filename: str):
+        """ save the cProfile stats (readable with pstats) """
+        assert self._profiler is not None, "cProfile is disabled!"
+        self._profiler.dump_stats(filename)
+
+    def print_stats(self, limit: int=20, sort: str='cumulative') -> str:
+        assert self._profiler is not None, "cProfile is disabled!"
+        s = io.StringIO()
+        pstats.Stats(self._profiler, stream=s).sort_stats(sort).print_stats(limit)
+        return s.getvalue()
+
+    def summary(self) -> str:
+        lines = ["{:11s}|{:>10s}|{:>12s}|{:>10s}|{:>8s}".format("phase", "calls", "total ms", "mean us", "% step")]
+        lines.append("-"*55)
+        for phase, s in self.stats().items():
+            fraction = "" if s['step_fraction'] is None else "%.1f"%(100 * s['step_fraction'])
+            lines.append("{:11s}|{:>10d}|{:>12.3f}|{:>10.3f}|{:>8s}".format(phase, s['calls'], s['total_ms'], s['mean_us'], fraction))
+        return "\n".join(lines)
+
+if __name__ == '__main__':
+    from amusepark.envs import GobbletEnv
+
+    env = ProfileWrapper(GobbletEnv(mode=1), cprofile=True)
+    actions = [env.action_space.sample() for _ in range(5000)]
+    env.reset()
+    for act in actions:
+        obs, r, done, info = env.step(act)
+        if done:
+            env.reset()
+    print(env.summary())
+    print(env.print_stats(limit=10))
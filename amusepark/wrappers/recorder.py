@@ -0,0 +1,271 @@
+import os
+import glob
+import queue
+import struct
+import zipfile
+import threading
+
+import gym
+import numpy as np
+
+OBS = 'obs'
+STEP_COLUMNS = ('action', 'reward', 'done')
+
+def _fits(low, high, dtype) -> bool:
+    # every integer in [low, high] is representable in dtype
+    dtype = np.dtype(dtype)
+    if dtype.kind not in 'iu':
+        return dtype.kind == 'f'
+    info = np.iinfo(dtype)
+    return bool(np.all(info.min <= low) and np.all(high <= info.max))
+
+def _storage_dtype(space: gym.Space, obs_dtype):
+    r""" (dtype, checked): the dtype of the recorded observations of a (non-Dict) space
+
+    obs_dtype where the bounds of an integer Box fit in it, else the dtype of the space (lossless); other spaces use
+    obs_dtype and every observation is range-checked when cast (checked=True).
+    """
+    if isinstance(space, gym.spaces.Box):
+        if space.dtype.kind in 'iub' and _fits(space.low, space.high, obs_dtype):
+            return np.dtype(obs_dtype), False
+        return space.dtype, False
+    if isinstance(space, gym.spaces.Discrete) and _fits(space.start, space.start + space.n - 1, obs_dtype):
+        return np.dtype(obs_dtype), False
+    return np.dtype(obs_dtype), True
+
+def _cast(value, dtype, checked: bool) -> np.ndarray:
+    # copy (envs may return views of their internal state) and cast without wrapping around
+    value = np.array(value)
+    if checked and value.size and not np.can_cast(value.dtype, dtype, 'safe'):
+        if not _fits(value.min(), value.max(), dtype):
+            raise ValueError(f"Observation values in [{value.min()}, {value.max()}] do not fit in {dtype}!")
+    return value.astype(dtype, copy=False)
+
+def _obs_columns(obs) -> dict:
+    # Dict observations (e.g. Wordle) are stored as one column per key
+    if isinstance(obs, dict):
+        return {f"{OBS}.{k}": v for k, v in obs.items()}
+    return {OBS: obs}
+
+class RecordEpisode(gym.Wrapper):
+    r""" Streams (obs, action, reward, done) of an env into chunked, columnar .npz files
+
+    Episodes are buffered in memory and handed to a background thread which writes a chunk as soon as at least
+    `chunk_size` steps are buffered (episodes never span two chunks), so `step` never waits for the disk.
+
+    Layout of `path`:
+        chunk_000000.npz, ...: columns 'obs' (or 'obs.<key>'), 'action', 'reward', 'done'
+            an episode of T steps has T+1 observations (the first one comes from reset) and T step rows
+        index.npy            : (num_episodes, 4) int64 rows of (chunk, obs start, step start, length)
+
+    obs_dtype(dtype): observations are cast to it when the bounds of the observation space fit in it (int8 fits the
+                      boards of all amusepark envs); otherwise (e.g. the word ids of compact Wordle observations)
+                      they keep the dtype of the space. Observations of spaces without bounds are range-checked.
+    compress(bool)  : zip-deflate the chunks; uncompressed chunks can be memory-mapped by EpisodeReader
+    """
+    def __init__(self, env: gym.Env, path: str, chunk_size: int=10000, obs_dtype=np.int8, action_dtype=np.int16, compress: bool=False):
+        super(RecordEpisode, self).__init__(env)
+        os.makedirs(path, exist_ok=True)
+        assert not glob.glob(os.path.join(path, 'chunk_*.npz')), f"{path} already contains a recording!"
+
+        self.path = path
+        self.chunk_size = chunk_size
+        self.obs_dtype = obs_dtype
+        space = env.observation_space
+        if isinstance(space, gym.spaces.Dict):
+            self._obs_dtypes = {k: _storage_dtype(s, obs_dtype) for k, s in space.spaces.items()}
+        else:
+            self._obs_dtypes = _storage_dtype(space, obs_dtype)
+        self.action_dtype = action_dtype
+        self.compress = compress
+
+        # buffered episodes: list of (obs list, action list, reward list, done list)
+        self._episodes = []
+        self._num_buffered = 0
+        self._episode = None
+        self._num_chunks = 0
+        self._index = []
+
+        # background writer
+        self._queue = queue.Queue()
+        self._error = None
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    ###### recording ######
+
+    def reset(self, **kwargs):
+        self._end_episode()
+        obs = self.env.reset(**kwargs)
+        self._episode = ([self._convert_obs(obs)], [], [], [])
+        return obs
+
+    def step(self, action):
+        obs, reward, done, info = self.env.step(action)
+        if self._episode is not None:
+            obs_list, actions, rewards, dones = self._episode
+            obs_list.append(self._convert_obs(obs))
+            actions.append(np.asarray(action, dtype=self.action_dtype))
+            rewards.append(reward)
+            dones.append(done)
+            if done:
+                self._end_episode()
+        return obs, reward, done, info
+
+    def _convert_obs(self, obs):
+        # copy right away: envs may return views of their internal state
+        if isinstance(obs, dict):
+            return {k: _cast(v, *self._obs_dtypes[k]) for k, v in obs.items()}
+        return _cast(obs, *self._obs_dtypes)
+
+    def _end_episode(self):
+        if self._episode is None:
+            return
+        if len(self._episode[1]) > 0:
+            self._episodes.append(self._episode)
+            self._num_buffered += len(self._episode[1])
+        self._episode = None
+        if self._num_buffered >= self.chunk_size:
+            self._flush()
+
+    def _flush(self):
+        if self._error is not None:
+            raise RuntimeError(f"Recording failed: {self._error}")
+        if not self._episodes:
+            return
+        self._queue.put((self._num_chunks, self._episodes))
+        self._num_chunks += 1
+        self._episodes = []
+        self._num_buffered = 0
+
+    ###### writing (background thread) ######
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._write_chunk(*item)
+            except Exception as e:
+                self._error = e
+
+    def _write_chunk(self, chunk_idx: int, episodes: list):
+        columns = dict()
+        obs_start = step_start = 0
+        for (obs_list, actions, rewards, dones) in episodes:
+            self._index.append((chunk_idx, obs_start, step_start, len(actions)))
+            obs_start += len(obs_list)
+            step_start += len(actions)
+
+        obs_list = [o for episode in episodes for o in episode[0]]
+        if isinstance(obs_list[0], dict):
+            for k in obs_list[0]:
+                columns[f"{OBS}.{k}"] = np.stack([o[k] for o in obs_list])
+        else:
+            columns[OBS] = np.stack(obs_list)
+        columns['action'] = np.stack([a for episode in episodes for a in episode[1]])
+        columns['reward'] = np.array([r for episode in episodes for r in episode[2]], dtype=np.float32)
+        columns['done'] = np.array([d for episode in episodes for d in episode[3]], dtype=bool)
+
+        filename = os.path.join(self.path, "chunk_%06d.npz"%(chunk_idx))
+        save = np.savez_compressed if self.compress else np.savez
+        save(filename, **columns)
+
+    def close(self):
+        if self._writer.is_alive():
+            self._end_episode()
+            self._flush()
+            self._queue.put(None)
+            self._writer.join()
+            if self._error is not None:
+                raise RuntimeError(f"Recording failed: {self._error}")
+            np.save(os.path.join(self.path, 'index.npy'), np.array(self._index, dtype=np.int64).reshape(-1, 4))
+        return self.env.close()
+
+def _mmap_npz(filename: str) -> dict:
+    """ memory-map the members of an .npz file; deflated members are read into memory """
+    arrays = dict()
+    with zipfile.ZipFile(filename) as zf, open(filename, 'rb') as f:
+        for info in zf.infolist():
+            name = info.filename[:-len('.npy')]
+            if info.compress_type != zipfile.ZIP_STORED:
+                with zf.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member)
+                continue
+            # skip the local file header to reach the .npy payload
+            f.seek(info.header_offset)
+            header = f.read(30)
+            name_len, extra_len = struct.unpack('<HH', header[26:30])
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            arrays[name] = np.memmap(filename, dtype=dtype, mode='r', offset=f.tell(), shape=shape, order='F' if fortran_order else 'C')
+    return arrays
+
+class EpisodeReader:
+    r""" Random access to the episodes written by RecordEpisode
+
+    Uncompressed chunks are memory-mapped, so reading an episode only touches its own rows; compressed chunks are
+    decompressed on first access and the `max_cached` most recent ones are kept in memory.
+    reader[i] -> {'obs': (T+1, ...) or {key: (T+1, ...)}, 'action': (T, ...), 'reward': (T,), 'done': (T,)}
+    """
+    def __init__(self, path: str, max_cached: int=4):
+        self.path = path
+        self.max_cached = max_cached
+        self.index = np.load(os.path.join(path, 'index.npy'), mmap_mode='r')
+        self._chunks = dict()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def num_steps(self) -> int:
+        return int(self.index[:, 3].sum())
+
+    def _chunk(self, chunk_idx: int) -> dict:
+        if chunk_idx not in self._chunks:
+            if len(self._chunks) >= self.max_cached:
+                self._chunks.pop(next(iter(self._chunks)))
+            self._chunks[chunk_idx] = _mmap_npz(os.path.join(self.path, "chunk_%06d.npz"%(chunk_idx)))
+        return self._chunks[chunk_idx]
+
+    def __getitem__(self, episode_idx: int) -> dict:
+        chunk_idx, obs_start, step_start, length = (int(v) for v in self.index[episode_idx])
+        chunk = self._chunk(chunk_idx)
+
+        episode = dict()
+        obs_keys = [k for k in chunk if k == OBS or k.startswith(OBS + '.')]
+        if obs_keys == [OBS]:
+            episode[OBS] = chunk[OBS][obs_start:obs_start+length+1]
+        else:
+            episode[OBS] = {k[len(OBS)+1:]: chunk[k][obs_start:obs_start+length+1] for k in obs_keys}
+        for k in STEP_COLUMNS:
+            episode[k] = chunk[k][step_start:step_start+length]
+        return episode
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+if __name__ == '__main__':
+    import tempfile
+    from amusepark.envs import GobbletEnv
+
+    with tempfile.TemporaryDirectory() as path:
+        env = RecordEpisode(GobbletEnv(mode=1), path, chunk_size=1000)
+        for _ in range(500):
+            env.reset()
+            done = False
+            while not done:
+                obs, r, done, info = env.step(env.action_space.sample())
+        env.close()
+
+        reader = EpisodeReader(path)
+        size = sum(os.path.getsize(f) for f in glob.glob(os.path.join(path, '*')))
+        print(f"{len(reader)} episodes, {reader.num_steps} steps, {size} bytes")
+        episode = reader[len(reader) // 2]
+        print(episode['obs'].shape, episode['action'], episode['reward'], episode['done'])